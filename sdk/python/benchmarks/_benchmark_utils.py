@@ -0,0 +1,188 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Shared helpers for the SDK benchmarks: timing, memory tracing and baselines."""
+
+import gc
+import json
+import os
+import platform
+import time
+import tracemalloc
+from collections import OrderedDict
+
+
+def measure(func, trace_memory=True):
+  """Runs func and returns a tuple (result, wall_time_seconds, peak_memory_bytes).
+
+  Tracing the allocations slows the code down considerably, so the wall time is
+  measured on a first, untraced run and the peak memory on a second, traced run.
+  """
+  gc.collect()
+  start_time = time.perf_counter()
+  result = func()
+  wall_time = time.perf_counter() - start_time
+
+  peak_memory = None
+  if trace_memory:
+    del result
+    gc.collect()
+    tracemalloc.start()
+    try:
+      result = func()
+      _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+      tracemalloc.stop()
+  return result, wall_time, peak_memory
+
+
+class PhaseTimer(object):
+  """Accumulates the time spent in the individual phases of Compiler._create_workflow.
+
+  The timer temporarily wraps the compiler methods and module functions that
+  implement each phase. The times are reset every time the timer is entered.
+  """
+
+  def __init__(self, compiler):
+    self._compiler = compiler
+    self.phase_times = OrderedDict()
+    self._restore_actions = []
+
+  def _record(self, phase, func):
+    def _timed(*args, **kwargs):
+      start_time = time.perf_counter()
+      try:
+        return func(*args, **kwargs)
+      finally:
+        self.phase_times[phase] = self.phase_times.get(phase, 0) + time.perf_counter() - start_time
+    return _timed
+
+  def _wrap_attribute(self, owner, name, phase, instance_attribute=False):
+    original = getattr(owner, name)
+    setattr(owner, name, self._record(phase, original))
+    if instance_attribute:
+      self._restore_actions.append(lambda: delattr(owner, name))
+    else:
+      self._restore_actions.append(lambda: setattr(owner, name, original))
+
+  def _wrap_pipeline_context(self):
+    from kfp.dsl import _pipeline
+    original_enter = _pipeline.Pipeline.__enter__
+    original_exit = _pipeline.Pipeline.__exit__
+    start_times = []
+
+    def _enter(pipeline):
+      start_times.append(time.perf_counter())
+      return original_enter(pipeline)
+
+    def _exit(pipeline, *args):
+      self.phase_times['dsl'] = self.phase_times.get('dsl', 0) + time.perf_counter() - start_times.pop()
+      return original_exit(pipeline, *args)
+
+    _pipeline.Pipeline.__enter__ = _enter
+    _pipeline.Pipeline.__exit__ = _exit
+    self._restore_actions.append(lambda: setattr(_pipeline.Pipeline, '__enter__', original_enter))
+    self._restore_actions.append(lambda: setattr(_pipeline.Pipeline, '__exit__', original_exit))
+
+  def __enter__(self):
+    from kfp.compiler import compiler as compiler_module
+    from kfp.compiler import _data_passing_rewriter
+
+    self.phase_times.clear()
+    self._wrap_pipeline_context()
+    self._wrap_attribute(self._compiler, '_sanitize_and_inject_artifact', 'sanitize_and_inject_artifact', instance_attribute=True)
+    self._wrap_attribute(self._compiler, '_create_dag_templates', 'create_dag_templates', instance_attribute=True)
+    self._wrap_attribute(compiler_module, '_op_to_template', 'op_to_template')
+    self._wrap_attribute(_data_passing_rewriter, 'fix_big_data_passing', 'fix_big_data_passing')
+    self._wrap_attribute(self._compiler, '_write_workflow', 'write_workflow', instance_attribute=True)
+    return self
+
+  def __exit__(self, *args):
+    for restore in reversed(self._restore_actions):
+      restore()
+    self._restore_actions = []
+
+
+def _result_key(result):
+  return '{}/{}'.format(result['scenario'], result['size'])
+
+
+def load_baselines(path):
+  if not os.path.exists(path):
+    return {}
+  with open(path, 'r') as f:
+    return json.load(f).get('results', {})
+
+
+def save_baselines(path, results):
+  """Merges the results into the stored baselines. Existing entries for other scenarios are kept."""
+  baselines = load_baselines(path)
+  for result in results:
+    baselines[_result_key(result)] = {
+        'wall_time': round(result['wall_time'], 4),
+        'peak_memory': result['peak_memory'],
+    }
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  with open(path, 'w') as f:
+    json.dump(
+        {
+            'python_version': platform.python_version(),
+            'results': OrderedDict(sorted(baselines.items())),
+        },
+        f,
+        indent=2,
+    )
+    f.write('\n')
+
+
+def check_against_baselines(results, baselines, tolerance):
+  """Returns a list of human-readable regression messages. Results without a baseline are skipped."""
+  regressions = []
+  for result in results:
+    baseline = baselines.get(_result_key(result))
+    if not baseline:
+      continue
+    for metric in ['wall_time', 'peak_memory']:
+      value = result.get(metric)
+      baseline_value = baseline.get(metric)
+      if value is None or not baseline_value:
+        continue
+      if value > baseline_value * tolerance:
+        regressions.append('{} {}: {:.4g} > {:.4g} * {}'.format(
+            _result_key(result), metric, value, baseline_value, tolerance))
+  return regressions
+
+
+def print_results(results):
+  phase_names = []
+  for result in results:
+    for phase in result.get('phases', {}):
+      if phase not in phase_names:
+        phase_names.append(phase)
+
+  header = ['benchmark', 'wall_time(s)', 'peak_memory(MB)'] + [phase + '(s)' for phase in phase_names]
+  rows = [header]
+  for result in results:
+    peak_memory = result.get('peak_memory')
+    row = [
+        _result_key(result),
+        '{:.4g}'.format(result['wall_time']),
+        '{:.1f}'.format(peak_memory / 2**20) if peak_memory is not None else '-',
+    ]
+    phases = result.get('phases', {})
+    row += ['{:.3f}'.format(phases[phase]) if phase in phases else '-' for phase in phase_names]
+    rows.append(row)
+
+  widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+  for row in rows:
+    print('  '.join(cell.ljust(width) for cell, width in zip(row, widths)))
@@ -0,0 +1,221 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the DSL compiler on synthetic pipelines of growing size.
+
+Usage:
+  python benchmarks/compiler_benchmark.py                      # default scenarios and sizes
+  python benchmarks/compiler_benchmark.py --scenario chain --sizes 100,1000,10000
+  python benchmarks/compiler_benchmark.py --check              # compare with the stored baselines
+  python benchmarks/compiler_benchmark.py --update-baselines   # rewrite the stored baselines
+
+Each run reports the wall time, the peak traced memory and the time spent in
+the individual compiler phases. The results are printed as a table and can be
+written as JSON with --output.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+_SDK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SDK_DIR not in sys.path:
+  sys.path.insert(0, _SDK_DIR)
+
+import kfp.dsl as dsl
+from kfp.compiler import Compiler
+
+from _benchmark_utils import measure, PhaseTimer, load_baselines, save_baselines, check_against_baselines, print_results
+
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'compiler_benchmark.json')
+
+
+def _echo_op(name, *inputs, with_output=True):
+  return dsl.ContainerOp(
+      name=name,
+      image='library/bash:4.4.23',
+      command=['sh', '-c'],
+      arguments=['echo ' + ' '.join(str(x) for x in inputs) + ' | tee /tmp/out'],
+      file_outputs={'out': '/tmp/out'} if with_output else None,
+  )
+
+
+def make_fan_out_pipeline(size):
+  """One producer task whose output is consumed by size-1 parallel tasks."""
+  @dsl.pipeline(name='fan-out-{}'.format(size))
+  def fan_out_pipeline(message='hello'):
+    producer = _echo_op('producer', message)
+    for i in range(size - 1):
+      _echo_op('consumer', producer.output, i, with_output=False)
+  return fan_out_pipeline
+
+
+def make_chain_pipeline(size):
+  """A linear chain where every task consumes the output of the previous one."""
+  @dsl.pipeline(name='chain-{}'.format(size))
+  def chain_pipeline(message='hello'):
+    previous = _echo_op('step', message)
+    for _ in range(size - 1):
+      previous = _echo_op('step', previous.output)
+  return chain_pipeline
+
+
+def make_nested_groups_pipeline(size, depth=16):
+  """Tasks spread over deeply nested Condition/ParallelFor groups inside an ExitHandler.
+
+  Every level consumes the output produced at the outermost level and at the
+  previous level, so data has to be passed through the whole group hierarchy.
+  """
+  ops_per_level = max(1, size // depth)
+
+  @dsl.pipeline(name='nested-groups-{}'.format(size))
+  def nested_groups_pipeline(message='hello'):
+    exit_op = _echo_op('exit', message, with_output=False)
+    with dsl.ExitHandler(exit_op), contextlib.ExitStack() as groups:
+      root = _echo_op('root', message)
+      previous = root
+      for level in range(depth):
+        if level % 2 == 0:
+          groups.enter_context(dsl.Condition(previous.output != 'stop'))
+        else:
+          groups.enter_context(dsl.ParallelFor([1, 2]))
+        for _ in range(ops_per_level):
+          previous = _echo_op('level-{}'.format(level), root.output, previous.output)
+  return nested_groups_pipeline
+
+
+def make_with_items_pipeline(size):
+  """A loop over a static list of size items with a few tasks in the loop body."""
+  items = [{'index': i, 'label': 'item-{}'.format(i)} for i in range(size)]
+
+  @dsl.pipeline(name='with-items-{}'.format(size))
+  def with_items_pipeline(message='hello'):
+    with dsl.ParallelFor(items) as item:
+      first = _echo_op('first', item.index, message)
+      _echo_op('second', item.label, first.output, with_output=False)
+  return with_items_pipeline
+
+
+def make_recursive_graph_pipeline(size):
+  """A recursive graph component whose body holds a chain of size-1 tasks."""
+  @dsl.graph_component
+  def recursive_component(flip_result):
+    with dsl.Condition(flip_result == 'heads'):
+      previous = _echo_op('flip', flip_result)
+      for _ in range(size - 2):
+        previous = _echo_op('flip', previous.output)
+      recursive_component(previous.output)
+
+  @dsl.pipeline(name='recursive-graph-{}'.format(size))
+  def recursive_graph_pipeline(message='hello'):
+    flip = _echo_op('flip', message)
+    recursive_component(flip.output)
+  return recursive_graph_pipeline
+
+
+SCENARIOS = {
+    'fan_out': make_fan_out_pipeline,
+    'chain': make_chain_pipeline,
+    'nested_groups': make_nested_groups_pipeline,
+    'with_items': make_with_items_pipeline,
+    'recursive_graph': make_recursive_graph_pipeline,
+}
+
+DEFAULT_SIZES = [100, 1000]
+FULL_SIZES = [100, 1000, 5000, 10000, 50000]
+
+
+def benchmark_compile(scenario, size, package_path=None):
+  """Compiles one synthetic pipeline and returns the measurements."""
+  pipeline_func = SCENARIOS[scenario](size)
+  compiler = Compiler()
+  timer = PhaseTimer(compiler)
+
+  def compile_pipeline():
+    workflow = compiler._create_workflow(pipeline_func)
+    yaml_text = compiler._write_workflow(workflow, package_path)
+    return workflow, yaml_text
+
+  def timed_compile_pipeline():
+    # Only the first, untraced run reports the phase times.
+    if timer.phase_times:
+      return compile_pipeline()
+    with timer:
+      return compile_pipeline()
+
+  (workflow, yaml_text), wall_time, peak_memory = measure(timed_compile_pipeline)
+  return {
+      'scenario': scenario,
+      'size': size,
+      'templates': len(workflow['spec']['templates']),
+      'workflow_bytes': len(yaml_text.encode()) if yaml_text is not None else None,
+      'wall_time': wall_time,
+      'peak_memory': peak_memory,
+      'phases': timer.phase_times,
+  }
+
+
+def parse_arguments(argv=None):
+  parser = argparse.ArgumentParser(description='Benchmarks the KFP DSL compiler on synthetic pipelines.')
+  parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                      help='Scenario to run. Can be repeated. Defaults to all scenarios.')
+  parser.add_argument('--sizes', type=str,
+                      help='Comma-separated list of pipeline sizes (number of tasks). Default: {}.'.format(DEFAULT_SIZES))
+  parser.add_argument('--full', action='store_true',
+                      help='Run all sizes from {} to {} tasks.'.format(FULL_SIZES[0], FULL_SIZES[-1]))
+  parser.add_argument('--output', type=str, help='Path of the JSON file to write the results to.')
+  parser.add_argument('--check', action='store_true',
+                      help='Fail if any result regresses compared to the stored baselines.')
+  parser.add_argument('--tolerance', type=float, default=1.5,
+                      help='Allowed ratio between the measured value and the baseline value. Default: 1.5.')
+  parser.add_argument('--update-baselines', action='store_true', help='Store the results as the new baselines.')
+  return parser.parse_args(argv)
+
+
+def main(argv=None):
+  args = parse_arguments(argv)
+  scenarios = args.scenario or sorted(SCENARIOS)
+  if args.sizes:
+    sizes = [int(size) for size in args.sizes.split(',')]
+  elif args.full:
+    sizes = FULL_SIZES
+  else:
+    sizes = DEFAULT_SIZES
+
+  results = []
+  for scenario in scenarios:
+    for size in sizes:
+      results.append(benchmark_compile(scenario, size))
+  print_results(results)
+
+  if args.output:
+    with open(args.output, 'w') as f:
+      json.dump(results, f, indent=2, sort_keys=True)
+
+  if args.update_baselines:
+    save_baselines(BASELINES_PATH, results)
+
+  if args.check:
+    regressions = check_against_baselines(results, load_baselines(BASELINES_PATH), args.tolerance)
+    for regression in regressions:
+      print('REGRESSION: ' + regression)
+    if regressions:
+      return 1
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,126 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the loading of large graph component specs.
+
+Usage:
+  python benchmarks/component_spec_benchmark.py
+  python benchmarks/component_spec_benchmark.py --sizes 100,1000 --repeats 5
+
+The spec is a graph component with `size` tasks that form a binary tree: every
+task consumes the output of its parent task.
+Every task embeds the spec of a container component that uses all the kinds of
+command-line placeholders. The benchmark reports the time of
+ComponentSpec.from_dict, of ComponentSpec.to_dict and of the comparison of two
+equal specs.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+_SDK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SDK_DIR not in sys.path:
+  sys.path.insert(0, _SDK_DIR)
+
+from kfp.components._structures import ComponentSpec
+
+from _benchmark_utils import measure, print_results
+
+
+DEFAULT_SIZES = [100, 1000]
+
+_CONTAINER_COMPONENT_STRUCT = {
+    'name': 'Echo',
+    'inputs': [
+        {'name': 'text', 'type': 'String'},
+        {'name': 'count', 'type': 'Integer', 'default': '1', 'optional': True},
+    ],
+    'outputs': [{'name': 'out', 'type': 'String'}],
+    'implementation': {'container': {
+        'image': 'library/bash:4.4.23',
+        'command': [
+            'sh', '-c', {'concat': ['echo ', {'inputValue': 'text'}]},
+            {'if': {'cond': {'isPresent': 'count'}, 'then': ['--count', {'inputValue': 'count'}]}},
+            {'outputPath': 'out'},
+        ],
+    }},
+}
+
+
+def make_graph_component_struct(size):
+  """Returns the struct of a graph component with a binary tree of size tasks."""
+  tasks = {}
+  for i in range(size):
+    if i == 0:
+      text_argument = {'graphInput': {'inputName': 'text'}}
+    else:
+      # A tree instead of a chain: GraphSpec sorts the tasks recursively, which fails for very long chains.
+      text_argument = {'taskOutput': {'taskId': 'task-{}'.format((i - 1) // 2), 'outputName': 'out'}}
+    tasks['task-{}'.format(i)] = {
+        'componentRef': {'name': 'echo', 'spec': _CONTAINER_COMPONENT_STRUCT},
+        'arguments': {'text': text_argument},
+    }
+  return {
+      'name': 'Graph',
+      'inputs': [{'name': 'text'}],
+      'outputs': [{'name': 'out'}],
+      'implementation': {'graph': {
+          'tasks': tasks,
+          'outputValues': {'out': {'taskOutput': {'taskId': 'task-{}'.format(size - 1), 'outputName': 'out'}}},
+      }},
+  }
+
+
+def benchmark_component_spec(size, repeats):
+  struct = make_graph_component_struct(size)
+
+  def from_dict():
+    for _ in range(repeats):
+      spec = ComponentSpec.from_dict(struct)
+    return spec
+
+  spec, from_dict_time, peak_memory = measure(from_dict)
+  _, to_dict_time, _ = measure(lambda: [spec.to_dict() for _ in range(repeats)], trace_memory=False)
+  other_spec = ComponentSpec.from_dict(struct)
+  _, eq_time, _ = measure(lambda: [spec == other_spec for _ in range(repeats)], trace_memory=False)
+  return {
+      'scenario': 'graph_component',
+      'size': size,
+      'wall_time': from_dict_time / repeats,
+      'peak_memory': peak_memory,
+      'phases': {
+          'from_dict': from_dict_time / repeats,
+          'to_dict': to_dict_time / repeats,
+          'eq': eq_time / repeats,
+      },
+  }
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Benchmarks ComponentSpec.from_dict on large graph component specs.')
+  parser.add_argument('--sizes', type=str,
+                      help='Comma-separated list of the numbers of graph tasks. Default: {}.'.format(DEFAULT_SIZES))
+  parser.add_argument('--repeats', type=int, default=3, help='Number of loads per size. Default: 3.')
+  args = parser.parse_args(argv)
+  sizes = [int(size) for size in args.sizes.split(',')] if args.sizes else DEFAULT_SIZES
+
+  start_time = time.perf_counter()
+  print_results([benchmark_component_spec(size, args.repeats) for size in sizes])
+  print('Total time: {:.1f}s'.format(time.perf_counter() - start_time))
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
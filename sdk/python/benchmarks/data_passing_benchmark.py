@@ -0,0 +1,155 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks fix_big_data_passing and checks its output against the golden workflows.
+
+Usage:
+  python benchmarks/data_passing_benchmark.py
+  python benchmarks/data_passing_benchmark.py --sizes 1000,10000 --repeats 3
+
+The golden pipelines of tests/compiler/testdata are compiled and the workflow
+passed to fix_big_data_passing is captured. For every golden pipeline the
+benchmark checks that the compiled workflow is identical to the golden one and
+that fix_big_data_passing did not modify its input workflow. It then measures
+fix_big_data_passing on the golden workflows and on the synthetic pipelines
+of compiler_benchmark.py.
+"""
+
+import argparse
+import copy
+import glob
+import os
+import sys
+
+_SDK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SDK_DIR not in sys.path:
+  sys.path.insert(0, _SDK_DIR)
+
+import yaml
+
+from kfp.compiler import Compiler
+from kfp.compiler import _data_passing_rewriter
+from kfp.compiler.main import PipelineCollectorContext
+
+from _benchmark_utils import measure, print_results
+from compiler_benchmark import SCENARIOS
+
+
+TESTDATA_DIR = os.path.join(_SDK_DIR, 'tests', 'compiler', 'testdata')
+DEFAULT_SIZES = [1000, 10000]
+
+
+def _create_workflow_and_capture_rewriter_input(pipeline_func):
+  """Compiles the pipeline and returns a tuple (workflow, workflow passed to fix_big_data_passing)."""
+  original_fix_big_data_passing = _data_passing_rewriter.fix_big_data_passing
+  rewriter_inputs = []
+
+  def _capturing_fix_big_data_passing(workflow):
+    rewriter_inputs.append(workflow)
+    return original_fix_big_data_passing(workflow)
+
+  _data_passing_rewriter.fix_big_data_passing = _capturing_fix_big_data_passing
+  try:
+    workflow = Compiler()._create_workflow(pipeline_func)
+  finally:
+    _data_passing_rewriter.fix_big_data_passing = original_fix_big_data_passing
+  return workflow, rewriter_inputs[0]
+
+
+def _load_golden_pipeline(py_file):
+  sys.path.insert(0, os.path.dirname(py_file))
+  try:
+    with PipelineCollectorContext() as pipeline_funcs:
+      __import__(os.path.splitext(os.path.basename(py_file))[0])
+  finally:
+    del sys.path[0]
+  return pipeline_funcs[0] if len(pipeline_funcs) == 1 else None
+
+
+def _without_pipeline_spec(workflow):
+  workflow = copy.deepcopy(workflow)
+  del workflow['metadata']['annotations']['pipelines.kubeflow.org/pipeline_spec']
+  return workflow
+
+
+def check_golden_workflows():
+  """Returns a tuple (rewriter inputs by golden name, list of error messages)."""
+  rewriter_inputs = {}
+  errors = []
+  for py_file in sorted(glob.glob(os.path.join(TESTDATA_DIR, '*.py'))):
+    name = os.path.splitext(os.path.basename(py_file))[0]
+    yaml_file = os.path.join(TESTDATA_DIR, name + '.yaml')
+    if not os.path.exists(yaml_file):
+      continue
+    pipeline_func = _load_golden_pipeline(py_file)
+    if pipeline_func is None:
+      continue
+
+    workflow, rewriter_input = _create_workflow_and_capture_rewriter_input(pipeline_func)
+    rewriter_input_copy = copy.deepcopy(rewriter_input)
+    _data_passing_rewriter.fix_big_data_passing(rewriter_input)
+    if rewriter_input != rewriter_input_copy:
+      errors.append('{}: fix_big_data_passing modified its input workflow.'.format(name))
+
+    # Round trip through YAML like the compiler tests do.
+    compiled = yaml.safe_load(Compiler._write_workflow(workflow))
+    with open(yaml_file, 'r') as f:
+      golden = yaml.safe_load(f)
+    if _without_pipeline_spec(compiled) != _without_pipeline_spec(golden):
+      errors.append('{}: the compiled workflow differs from the golden workflow.'.format(name))
+    rewriter_inputs[name] = rewriter_input
+  return rewriter_inputs, errors
+
+
+def benchmark_fix_big_data_passing(scenario, size, workflows, repeats):
+  """Measures the time and the peak memory needed to rewrite all the workflows once."""
+  def run_rewriter():
+    for _ in range(repeats):
+      results = [_data_passing_rewriter.fix_big_data_passing(workflow) for workflow in workflows]
+    return results
+
+  _, wall_time, peak_memory = measure(run_rewriter)
+  return {
+      'scenario': scenario,
+      'size': size,
+      'wall_time': wall_time / repeats,
+      'peak_memory': peak_memory,
+  }
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Benchmarks fix_big_data_passing on golden and synthetic workflows.')
+  parser.add_argument('--sizes', type=str,
+                      help='Comma-separated list of synthetic pipeline sizes. Default: {}.'.format(DEFAULT_SIZES))
+  parser.add_argument('--repeats', type=int, default=3, help='Number of rewrites per workflow. Default: 3.')
+  args = parser.parse_args(argv)
+  sizes = [int(size) for size in args.sizes.split(',')] if args.sizes else DEFAULT_SIZES
+
+  rewriter_inputs, errors = check_golden_workflows()
+  # The golden workflows are small, so they are measured all together.
+  results = [benchmark_fix_big_data_passing('golden', len(rewriter_inputs), list(rewriter_inputs.values()), args.repeats)]
+
+  for scenario in sorted(SCENARIOS):
+    for size in sizes:
+      _, workflow = _create_workflow_and_capture_rewriter_input(SCENARIOS[scenario](size))
+      results.append(benchmark_fix_big_data_passing(scenario, size, [workflow], args.repeats))
+  print_results(results)
+
+  print('Checked {} golden workflows.'.format(len(rewriter_inputs)))
+  for error in errors:
+    print('ERROR: ' + error)
+  return 1 if errors else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
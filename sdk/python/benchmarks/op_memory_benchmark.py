@@ -0,0 +1,132 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measures the memory used by the ops of a pipeline built in memory.
+
+Usage:
+  python benchmarks/op_memory_benchmark.py
+  python benchmarks/op_memory_benchmark.py --sizes 1000,50000
+
+For every size the benchmark builds a pipeline of `size` ops and reports the
+memory that is still allocated once the pipeline is built, divided by the
+number of ops. The `plain` scenario uses bare ops, the `component` scenario
+uses ops created from a component with one input and one output.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+_SDK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SDK_DIR not in sys.path:
+  sys.path.insert(0, _SDK_DIR)
+
+import kfp.dsl as dsl
+from kfp.components import load_component_from_text
+
+from _benchmark_utils import print_results
+
+
+DEFAULT_SIZES = [1000, 10000]
+
+_COMPONENT_TEXT = '''\
+name: Echo
+inputs:
+- {name: text, type: String}
+outputs:
+- {name: out, type: String}
+implementation:
+  container:
+    image: library/bash:4.4.23
+    command: [sh, -c, 'echo "$0" | tee "$1"', {inputValue: text}, {outputPath: out}]
+'''
+
+
+def _build_plain_pipeline(size):
+  with dsl.Pipeline('plain-{}'.format(size)) as pipeline:
+    for i in range(size):
+      dsl.ContainerOp(
+          name='echo',
+          image='library/bash:4.4.23',
+          command=['sh', '-c'],
+          arguments=['echo {}'.format(i)],
+          file_outputs={'out': '/tmp/out'},
+      )
+  return pipeline
+
+
+def _build_component_pipeline(size):
+  echo_op = load_component_from_text(_COMPONENT_TEXT)
+  with dsl.Pipeline('component-{}'.format(size)) as pipeline:
+    for i in range(size):
+      echo_op(str(i))
+  return pipeline
+
+
+SCENARIOS = {
+    'plain': _build_plain_pipeline,
+    'component': _build_component_pipeline,
+}
+
+
+def benchmark_memory(scenario, size):
+  build_pipeline = SCENARIOS[scenario]
+  # The first build imports and caches what the ops share, which must not be counted.
+  build_pipeline(1)
+
+  gc.collect()
+  start_time = time.perf_counter()
+  pipeline = build_pipeline(size)
+  wall_time = time.perf_counter() - start_time
+  del pipeline
+
+  gc.collect()
+  tracemalloc.start()
+  try:
+    pipeline = build_pipeline(size)
+    gc.collect()
+    memory, peak_memory = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return {
+      'scenario': scenario,
+      'size': size,
+      'bytes_per_op': memory // size,
+      'wall_time': wall_time,
+      'peak_memory': peak_memory,
+  }
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Measures the memory used by the ops of pipelines built in memory.')
+  parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append',
+                      help='Scenario to run. Can be repeated. Default: all.')
+  parser.add_argument('--sizes', type=str,
+                      help='Comma-separated list of the numbers of ops. Default: {}.'.format(DEFAULT_SIZES))
+  args = parser.parse_args(argv)
+  scenarios = args.scenario or sorted(SCENARIOS)
+  sizes = [int(size) for size in args.sizes.split(',')] if args.sizes else DEFAULT_SIZES
+
+  results = [benchmark_memory(scenario, size) for scenario in scenarios for size in sizes]
+  print_results(results)
+  print()
+  for result in results:
+    print('{}/{}: {} bytes per op'.format(result['scenario'], result['size'], result['bytes_per_op']))
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,104 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Micro-benchmark of the PipelineParam extraction on ops with large k8s specs.
+
+Usage:
+  python benchmarks/pipeline_param_benchmark.py
+  python benchmarks/pipeline_param_benchmark.py --sizes 10,100,1000 --repeats 20
+
+Every op has `size` environment variables, volumes with their mounts and
+sidecars. Half of the strings reference a PipelineParam. The benchmark reports
+the time needed to compute `op.inputs` for one op.
+"""
+
+import argparse
+import os
+import sys
+
+_SDK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SDK_DIR not in sys.path:
+  sys.path.insert(0, _SDK_DIR)
+
+from kubernetes.client import models as k8s
+
+import kfp.dsl as dsl
+
+from _benchmark_utils import measure, print_results
+
+
+DEFAULT_SIZES = [10, 100, 1000]
+
+
+def make_large_op(size):
+  """Creates a ContainerOp with size env variables, volumes and sidecars."""
+  params = [dsl.PipelineParam(name='param-{}'.format(i)) for i in range(10)]
+  with dsl.Pipeline('pipeline-param-benchmark'):
+    op = dsl.ContainerOp(
+        name='large-op',
+        image='library/bash:4.4.23',
+        command=['sh', '-c'],
+        arguments=['echo {}'.format(params[0])],
+    )
+  for i in range(size):
+    value = 'value-{}-{}'.format(i, params[i % len(params)]) if i % 2 else 'value-{}'.format(i)
+    op.container.add_env_variable(k8s.V1EnvVar(name='ENV_{}'.format(i), value=value))
+    op.add_volume(k8s.V1Volume(
+        name='volume-{}'.format(i),
+        config_map=k8s.V1ConfigMapVolumeSource(name='config-map-{}'.format(i))))
+    op.container.add_volume_mount(k8s.V1VolumeMount(name='volume-{}'.format(i), mount_path='/mnt/{}'.format(i)))
+  for i in range(max(1, size // 10)):
+    sidecar = dsl.Sidecar(
+        name='sidecar-{}'.format(i),
+        image='library/bash:4.4.23',
+        args=['echo {}'.format(params[i % len(params)])])
+    for j in range(10):
+      sidecar.add_env_variable(k8s.V1EnvVar(name='SIDECAR_ENV_{}'.format(j), value='value-{}'.format(j)))
+    op.add_sidecar(sidecar)
+  return op
+
+
+def benchmark_extraction(size, repeats):
+  op = make_large_op(size)
+
+  def extract_inputs():
+    for _ in range(repeats):
+      # Reset the cached inputs so that they are extracted again.
+      op.inputs = []
+      inputs = op.inputs
+    return inputs
+
+  inputs, wall_time, peak_memory = measure(extract_inputs)
+  return {
+      'scenario': 'op_inputs',
+      'size': size,
+      'params': len(inputs),
+      'wall_time': wall_time / repeats,
+      'peak_memory': peak_memory,
+  }
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Benchmarks the PipelineParam extraction from large ops.')
+  parser.add_argument('--sizes', type=str,
+                      help='Comma-separated list of the numbers of env variables and volumes. Default: {}.'.format(DEFAULT_SIZES))
+  parser.add_argument('--repeats', type=int, default=10, help='Number of extractions per size. Default: 10.')
+  args = parser.parse_args(argv)
+  sizes = [int(size) for size in args.sizes.split(',')] if args.sizes else DEFAULT_SIZES
+
+  print_results([benchmark_extraction(size, args.repeats) for size in sizes])
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
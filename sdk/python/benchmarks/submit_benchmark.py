@@ -0,0 +1,122 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the submission of large pipelines with kfp.Client.
+
+Usage:
+  python benchmarks/submit_benchmark.py
+  python benchmarks/submit_benchmark.py --sizes 1000,10000
+
+The client talks to a fake run service that only records the runs, so the
+benchmark measures the client-side latency of a submission:
+
+* `in_memory` calls Client.create_run_from_pipeline_func, which serializes the
+  compiled workflow to JSON directly.
+* `package` compiles the pipeline to a .zip package and submits it with
+  Client.create_run_from_pipeline_package, which reads the package, parses the
+  YAML and serializes it to JSON.
+
+The `compile` phase is the time of Compiler._create_workflow and the `submit`
+phase is the rest of the submission.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+_SDK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SDK_DIR not in sys.path:
+  sys.path.insert(0, _SDK_DIR)
+
+import kfp
+import kfp_server_api
+from kfp.compiler import Compiler
+
+from _benchmark_utils import measure, print_results
+from compiler_benchmark import make_chain_pipeline
+
+
+DEFAULT_SIZES = [100, 1000, 5000]
+
+
+class _FakeRunServiceApi(object):
+  def create_run(self, body):
+    return kfp_server_api.models.ApiRunDetail(run=kfp_server_api.models.ApiRun(id='run-id', name=body.name))
+
+
+def _create_client():
+  client = kfp.Client(host='http://127.0.0.1:1')
+  client._run_api = _FakeRunServiceApi()
+  experiment = kfp_server_api.models.ApiExperiment(id='experiment-id', name='Default')
+  client.create_experiment = lambda name, description=None: experiment
+  return client
+
+
+def _submit_in_memory(client, pipeline_func, temp_dir):
+  client.create_run_from_pipeline_func(pipeline_func, {}, run_name='run')
+
+
+def _submit_package(client, pipeline_func, temp_dir):
+  package_path = os.path.join(temp_dir, 'pipeline.zip')
+  Compiler().compile(pipeline_func, package_path)
+  client.create_run_from_pipeline_package(package_path, {}, run_name='run')
+
+
+SCENARIOS = {
+    'in_memory': _submit_in_memory,
+    'package': _submit_package,
+}
+
+
+def benchmark_submit(scenario, size, temp_dir):
+  pipeline_func = make_chain_pipeline(size)
+  client = _create_client()
+  _, wall_time, peak_memory = measure(lambda: SCENARIOS[scenario](client, pipeline_func, temp_dir))
+  _, compile_time, _ = measure(lambda: Compiler()._create_workflow(pipeline_func), trace_memory=False)
+  return {
+      'scenario': scenario,
+      'size': size,
+      'wall_time': wall_time,
+      'peak_memory': peak_memory,
+      'phases': {
+          'compile': compile_time,
+          'submit': max(wall_time - compile_time, 0),
+      },
+  }
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Benchmarks the client-side latency of the pipeline submissions.')
+  parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append',
+                      help='Scenario to run. Can be repeated. Default: all.')
+  parser.add_argument('--sizes', type=str,
+                      help='Comma-separated list of the numbers of pipeline tasks. Default: {}.'.format(DEFAULT_SIZES))
+  args = parser.parse_args(argv)
+  scenarios = args.scenario or sorted(SCENARIOS)
+  sizes = [int(size) for size in args.sizes.split(',')] if args.sizes else DEFAULT_SIZES
+
+  start_time = time.perf_counter()
+  temp_dir = tempfile.mkdtemp()
+  try:
+    print_results([benchmark_submit(scenario, size, temp_dir) for size in sizes for scenario in scenarios])
+  finally:
+    shutil.rmtree(temp_dir)
+  print('Total time: {:.1f}s'.format(time.perf_counter() - start_time))
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
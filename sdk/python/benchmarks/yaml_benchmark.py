@@ -0,0 +1,103 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the YAML loading and dumping of the component files of the repo.
+
+Usage:
+  python benchmarks/yaml_benchmark.py
+  python benchmarks/yaml_benchmark.py --repeats 10
+
+The benchmark reads all the components/**/component.yaml files of the repo and
+reports the time of load_yaml and dump_yaml on all of them, and the time of
+load_component_from_text, which also builds the component specs and the task
+factories. reload_component_from_text loads the same texts again and is served
+by the memoized task factories.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+_SDK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SDK_DIR not in sys.path:
+  sys.path.insert(0, _SDK_DIR)
+
+from kfp.components import _components, load_component_from_text
+from kfp.components._yaml_utils import dump_yaml, load_yaml
+
+from _benchmark_utils import measure, print_results
+
+
+_COMPONENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(_SDK_DIR)), 'components')
+
+
+def _read_component_texts(components_dir):
+  texts = []
+  for path in sorted(glob.glob(os.path.join(components_dir, '**', 'component.yaml'), recursive=True)):
+    with open(path, 'r', encoding='utf-8') as f:
+      texts.append(f.read())
+  return texts
+
+
+def benchmark_yaml(texts, repeats):
+  structs = [load_yaml(text) for text in texts]
+
+  def run(func, items):
+    return lambda: [[func(item) for item in items] for _ in range(repeats)]
+
+  _, load_time, peak_memory = measure(run(load_yaml, texts))
+  _, dump_time, _ = measure(run(dump_yaml, structs), trace_memory=False)
+  # The first load of a component parses it, the next loads of the same text return the memoized task factory.
+  cache_size = _components._max_task_factory_cache_size
+  _components._max_task_factory_cache_size = 0
+  try:
+    _, load_component_time, _ = measure(run(load_component_from_text, texts), trace_memory=False)
+  finally:
+    _components._max_task_factory_cache_size = cache_size
+  _, reload_component_time, _ = measure(run(load_component_from_text, texts), trace_memory=False)
+  return {
+      'scenario': 'component_files',
+      'size': len(texts),
+      'wall_time': load_time / repeats,
+      'peak_memory': peak_memory,
+      'phases': {
+          'load_yaml': load_time / repeats,
+          'dump_yaml': dump_time / repeats,
+          'load_component_from_text': load_component_time / repeats,
+          'reload_component_from_text': reload_component_time / repeats,
+      },
+  }
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description='Benchmarks the YAML loading and dumping of the component files.')
+  parser.add_argument('--components-dir', type=str, default=_COMPONENTS_DIR,
+                      help='Directory searched for component.yaml files. Default: the components directory of the repo.')
+  parser.add_argument('--repeats', type=int, default=5, help='Number of passes over the files. Default: 5.')
+  args = parser.parse_args(argv)
+
+  texts = _read_component_texts(args.components_dir)
+  if not texts:
+    print('No component.yaml files found in {}'.format(args.components_dir))
+    return 1
+
+  start_time = time.perf_counter()
+  print_results([benchmark_yaml(texts, args.repeats)])
+  print('Total time: {:.1f}s'.format(time.perf_counter() - start_time))
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
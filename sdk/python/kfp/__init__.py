@@ -12,11 +12,45 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+
 __version__ = '0.2.3'
 
-from . import components
-from . import containers
-from . import dsl
-from ._client import Client
+import sys as _sys
+
 from ._config import *
-from ._runners import *
+
+# The submodules and the client import kubernetes, kfp_server_api, yaml and requests, which takes seconds.
+# On Python 3.7+ they are imported on the first attribute access (PEP 562), so that `import kfp` stays cheap.
+_lazy_submodules = ['compiler', 'components', 'containers', 'dsl']
+_lazy_attributes = {
+    'AsyncClient': '._async_client',
+    'Client': '._client',
+    'run_pipeline_func_on_cluster': '._runners',
+}
+
+if _sys.version_info >= (3, 7):
+  import importlib as _importlib
+
+  def __getattr__(name):
+    if name in _lazy_attributes:
+      value = getattr(_importlib.import_module(_lazy_attributes[name], __name__), name)
+      globals()[name] = value
+      return value
+    if not name.startswith('__'):
+      # Any submodule (kfp.dsl, kfp._client, ...) is imported on first access, like the ones imported eagerly before.
+      try:
+        return _importlib.import_module('.' + name, __name__)
+      except ModuleNotFoundError as e:
+        if e.name != __name__ + '.' + name:
+          raise
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+  def __dir__():
+    return sorted(set(globals()) | set(_lazy_submodules) | set(_lazy_attributes))
+else:
+  from . import components
+  from . import containers
+  from . import dsl
+  from ._client import Client
+  from ._async_client import AsyncClient
+  from ._runners import *
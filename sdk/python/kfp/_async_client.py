@@ -0,0 +1,503 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+import json
+import logging
+import os
+import ssl
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, List, Mapping
+from urllib.parse import quote
+
+import certifi
+import kfp
+import kfp_server_api
+
+from kfp._client import Client, RunSubmissionResult, KF_PIPELINES_ENDPOINT_ENV, KF_PIPELINES_UI_ENDPOINT_ENV, _add_generated_apis, _create_run_body, _create_workflow_manifest, _get_filter_kwargs, _get_name_filter, _get_run_experiment_ids, _get_run_ids_filter, _is_run_finished, _RateLimiter, _RUN_ID_BATCH_SIZE, _uploadable_package_path
+
+
+def _import_aiohttp():
+  try:
+    import aiohttp
+  except ImportError:
+    raise ImportError('AsyncClient requires the aiohttp package. Install it with "pip install kfp[async]".')
+  return aiohttp
+
+
+class _AsyncResponse(object):
+  """The response of an aiohttp request, in the form expected by ApiClient.deserialize and ApiException."""
+
+  def __init__(self, status, reason, headers, data):
+    self.status = status
+    self.reason = reason
+    self.headers = headers
+    self.data = data
+
+  def getheaders(self):
+    return self.headers
+
+  def getheader(self, name, default=None):
+    return self.headers.get(name, default)
+
+
+class _AsyncApiClient(kfp_server_api.api_client.ApiClient):
+  """ApiClient that sends the requests with aiohttp.
+
+  The methods of the generated service APIs return what call_api returns, so with this client they return coroutines.
+  The requests share one aiohttp session whose connection pool holds at most connection_limit connections.
+  """
+
+  def __init__(self, configuration, connection_limit=100):
+    super(_AsyncApiClient, self).__init__(configuration)
+    self._connection_limit = connection_limit
+    self._session = None
+
+  def _get_session(self):
+    # The session is created on the first request, since it must be created in the running event loop.
+    if self._session is None:
+      aiohttp = _import_aiohttp()
+      config = self.configuration
+      if config.verify_ssl:
+        ssl_context = ssl.create_default_context(cafile=config.ssl_ca_cert or certifi.where())
+        if config.cert_file:
+          ssl_context.load_cert_chain(config.cert_file, keyfile=config.key_file)
+      else:
+        ssl_context = False
+      connector = aiohttp.TCPConnector(limit=self._connection_limit, ssl=ssl_context)
+      self._session = aiohttp.ClientSession(connector=connector)
+    return self._session
+
+  def call_api(self, resource_path, method, path_params=None, query_params=None, header_params=None, body=None, post_params=None, files=None,
+               response_type=None, auth_settings=None, async_req=None, _return_http_data_only=None, collection_formats=None, _preload_content=True, _request_timeout=None):
+    return self._call_api(resource_path, method, path_params, query_params, header_params, body, post_params, files,
+                          response_type, auth_settings, _return_http_data_only, collection_formats, _request_timeout)
+
+  async def _call_api(self, resource_path, method, path_params, query_params, header_params, body, post_params, files,
+                      response_type, auth_settings, _return_http_data_only, collection_formats, _request_timeout):
+    # Mirrors ApiClient.__call_api, which sends the request with urllib3.
+    aiohttp = _import_aiohttp()
+    config = self.configuration
+
+    header_params = dict(header_params or {})
+    header_params.update(self.default_headers)
+    if self.cookie:
+      header_params['Cookie'] = self.cookie
+    header_params = dict(self.parameters_to_tuples(self.sanitize_for_serialization(header_params), collection_formats))
+
+    if path_params:
+      path_params = self.parameters_to_tuples(self.sanitize_for_serialization(path_params), collection_formats)
+      for k, v in path_params:
+        resource_path = resource_path.replace('{%s}' % k, quote(str(v), safe=config.safe_chars_for_path_param))
+
+    query_params = self.parameters_to_tuples(self.sanitize_for_serialization(query_params or []), collection_formats)
+    self.update_params_for_auth(header_params, query_params, auth_settings)
+
+    data = None
+    if post_params or files:
+      data = aiohttp.FormData()
+      for name, value in self.prepare_post_parameters(post_params, files):
+        if isinstance(value, tuple):
+          file_name, file_data, mime_type = value
+          data.add_field(name, file_data, filename=file_name, content_type=mime_type)
+        else:
+          data.add_field(name, str(value))
+      # aiohttp sets the multipart Content-Type with the boundary.
+      header_params.pop('Content-Type', None)
+    elif body is not None:
+      data = json.dumps(self.sanitize_for_serialization(body))
+
+    request_args = {}
+    if _request_timeout is not None:
+      request_args['timeout'] = aiohttp.ClientTimeout(total=_request_timeout)
+    if config.proxy:
+      request_args['proxy'] = config.proxy
+    async with self._get_session().request(
+        method, config.host + resource_path,
+        params=[(k, str(v)) for k, v in query_params],
+        headers=header_params, data=data, **request_args) as http_response:
+      response = _AsyncResponse(http_response.status, http_response.reason, dict(http_response.headers), (await http_response.read()).decode('utf8'))
+
+    if not 200 <= response.status <= 299:
+      raise kfp_server_api.rest.ApiException(http_resp=response)
+    self.last_response = response
+    return_data = self.deserialize(response, response_type) if response_type else None
+    if _return_http_data_only:
+      return return_data
+    return return_data, response.status, response.headers
+
+  async def close(self):
+    if self._session is not None:
+      await self._session.close()
+      self._session = None
+
+
+class AsyncClient(object):
+  """Asyncio API client for Kubeflow Pipelines.
+
+  Has the same methods as kfp.Client, as coroutines. The requests are sent with aiohttp (install it with "pip install kfp[async]")
+  and share one connection pool, so one event loop can drive many runs concurrently without threads.
+  Close the client when it is no longer needed, or use it as an async context manager:
+
+    async with kfp.AsyncClient(host) as client:
+      result = await client.create_run_from_pipeline_func(my_pipeline, arguments={})
+      await result.wait_for_run_completion(timeout=3600)
+
+  The generated service APIs are available as well, e.g. await client.runs.list_runs().
+  """
+
+  # The helpers that do not send requests are shared with Client.
+  _load_config = Client._load_config
+  _is_inverse_proxy_host = Client._is_inverse_proxy_host
+  _is_ipython = Client._is_ipython
+  _get_url_prefix = Client._get_url_prefix
+  _display_run_link = Client._display_run_link
+  _extract_pipeline_yaml = Client._extract_pipeline_yaml
+  _get_experiment_name = Client._get_experiment_name
+  _prepare_runs = Client._prepare_runs
+
+  def __init__(self, host=None, client_id=None, namespace='kubeflow', other_client_id=None, other_client_secret=None, connection_limit=100):
+    """Create a new instance of the asyncio kfp client.
+
+    Args:
+      host, client_id, namespace, other_client_id, other_client_secret: See kfp.Client.
+      connection_limit: The maximum number of simultaneous connections to the server.
+    """
+    host = host or os.environ.get(KF_PIPELINES_ENDPOINT_ENV)
+    self._uihost = os.environ.get(KF_PIPELINES_UI_ENDPOINT_ENV, host)
+    config = self._load_config(host, client_id, namespace, other_client_id, other_client_secret)
+    self._api_client = _AsyncApiClient(config, connection_limit=connection_limit)
+    _add_generated_apis(self, kfp_server_api, self._api_client)
+    self._experiment_ids_by_name = {}
+    self._run_api = kfp_server_api.api.run_service_api.RunServiceApi(self._api_client)
+    self._experiment_api = kfp_server_api.api.experiment_service_api.ExperimentServiceApi(self._api_client)
+    self._pipelines_api = kfp_server_api.api.pipeline_service_api.PipelineServiceApi(self._api_client)
+    self._upload_api = kfp_server_api.api.PipelineUploadServiceApi(self._api_client)
+
+  async def close(self):
+    """Closes the connections of the client."""
+    await self._api_client.close()
+
+  async def __aenter__(self):
+    return self
+
+  async def __aexit__(self, exc_type, exc_value, traceback):
+    await self.close()
+
+  async def create_experiment(self, name, description=None):
+    """Gets the experiment with the name or creates it. See Client.create_experiment."""
+    experiment = None
+    try:
+      experiment = await self.get_experiment(experiment_name=name)
+    except Exception:
+      # Ignore error if the experiment does not exist.
+      pass
+
+    if not experiment:
+      logging.info('Creating experiment {}.'.format(name))
+      experiment = kfp_server_api.models.ApiExperiment(name=name, description=description)
+      experiment = await self._experiment_api.create_experiment(body=experiment)
+      self._experiment_ids_by_name[name] = experiment.id
+    return experiment
+
+  async def list_experiments(self, page_token='', page_size=10, sort_by='', filter=None):
+    """List experiments. See Client.list_experiments."""
+    return await self._experiment_api.list_experiment(page_token=page_token, page_size=page_size, sort_by=sort_by, **_get_filter_kwargs(filter))
+
+  def iter_experiments(self, page_size=100, sort_by='', filter=None, prefetch=True) -> '_AsyncPageIterator':
+    """Returns an async iterator over all the experiments. See Client.iter_experiments."""
+    return _AsyncPageIterator(lambda page_token: self.list_experiments(page_token=page_token, page_size=page_size, sort_by=sort_by, filter=filter), 'experiments', prefetch)
+
+  async def get_experiment(self, experiment_id=None, experiment_name=None):
+    """Get details of an experiment. See Client.get_experiment."""
+    if experiment_id is None and experiment_name is None:
+      raise ValueError('Either experiment_id or experiment_name is required')
+    if experiment_id is not None:
+      return await self._experiment_api.get_experiment(id=experiment_id)
+    experiment_id = self._experiment_ids_by_name.get(experiment_name)
+    if experiment_id is not None:
+      try:
+        return await self._experiment_api.get_experiment(id=experiment_id)
+      except kfp_server_api.rest.ApiException as e:
+        if e.status != 404:
+          raise
+        # The experiment was deleted.
+        self._experiment_ids_by_name.pop(experiment_name, None)
+    async for experiment in self.iter_experiments(filter=_get_name_filter(experiment_name), prefetch=False):
+      if experiment.name == experiment_name:
+        self._experiment_ids_by_name[experiment_name] = experiment.id
+        return experiment
+    raise ValueError('No experiment is found with name {}.'.format(experiment_name))
+
+  async def list_pipelines(self, page_token='', page_size=10, sort_by='', filter=None):
+    """List pipelines. See Client.list_pipelines."""
+    return await self._pipelines_api.list_pipelines(page_token=page_token, page_size=page_size, sort_by=sort_by, **_get_filter_kwargs(filter))
+
+  def iter_pipelines(self, page_size=100, sort_by='', filter=None, prefetch=True) -> '_AsyncPageIterator':
+    """Returns an async iterator over all the pipelines. See Client.iter_pipelines."""
+    return _AsyncPageIterator(lambda page_token: self.list_pipelines(page_token=page_token, page_size=page_size, sort_by=sort_by, filter=filter), 'pipelines', prefetch)
+
+  async def get_pipeline(self, pipeline_id):
+    """Get pipeline details. See Client.get_pipeline."""
+    return await self._pipelines_api.get_pipeline(id=pipeline_id)
+
+  async def upload_pipeline(self, pipeline_package_path, pipeline_name=None):
+    """Uploads the pipeline to the Kubeflow Pipelines cluster. See Client.upload_pipeline."""
+    with _uploadable_package_path(pipeline_package_path) as package_path:
+      return await self._upload_api.upload_pipeline(package_path, name=pipeline_name)
+
+  async def run_pipeline(self, experiment_id, job_name, pipeline_package_path=None, params={}, pipeline_id=None, namespace=None):
+    """Run a specified pipeline. See Client.run_pipeline."""
+    pipeline_json_string = None
+    if pipeline_package_path:
+      pipeline_json_string = json.dumps(self._extract_pipeline_yaml(pipeline_package_path))
+    run_info = await self._create_run(experiment_id, job_name, pipeline_json_string, params, pipeline_id, namespace)
+    self._display_run_link(run_info)
+    return run_info
+
+  async def _create_run(self, experiment_id, job_name, workflow_manifest=None, params={}, pipeline_id=None, namespace=None):
+    run_body = _create_run_body(experiment_id, job_name, workflow_manifest, params, pipeline_id, namespace)
+    response = await self._run_api.create_run(body=run_body)
+    return response.run
+
+  async def create_run_from_pipeline_func(self, pipeline_func: Callable, arguments: Mapping[str, str], run_name=None, experiment_name=None, pipeline_conf: kfp.dsl.PipelineConf = None, namespace=None) -> RunSubmissionResult:
+    """Compiles the pipeline function, creates or gets an experiment and submits the pipeline for execution. See Client.create_run_from_pipeline_func.
+
+    Returns:
+      A RunSubmissionResult. Its wait_for_run_completion method returns a coroutine.
+    """
+    run_name = run_name or pipeline_func.__name__ + ' ' + datetime.now().strftime('%Y-%m-%d %H-%M-%S')
+    workflow_manifest = _create_workflow_manifest(pipeline_func, pipeline_conf)
+    return await self._create_run_from_workflow_manifest(workflow_manifest, arguments, run_name, experiment_name, namespace)
+
+  async def create_run_from_pipeline_package(self, pipeline_file: str, arguments: Mapping[str, str], run_name=None, experiment_name=None, namespace=None) -> RunSubmissionResult:
+    """Creates or gets an experiment and submits the pipeline package for execution. See Client.create_run_from_pipeline_package.
+
+    Returns:
+      A RunSubmissionResult. Its wait_for_run_completion method returns a coroutine.
+    """
+    run_name = run_name or os.path.basename(pipeline_file) + ' ' + datetime.now().strftime('%Y-%m-%d %H-%M-%S')
+    workflow_manifest = json.dumps(self._extract_pipeline_yaml(pipeline_file))
+    return await self._create_run_from_workflow_manifest(workflow_manifest, arguments, run_name, experiment_name, namespace)
+
+  async def _create_run_from_workflow_manifest(self, workflow_manifest, arguments, run_name, experiment_name=None, namespace=None):
+    experiment = await self.create_experiment(name=self._get_experiment_name(experiment_name))
+    run_info = await self._create_run(experiment.id, run_name, workflow_manifest, arguments, namespace=namespace)
+    self._display_run_link(run_info)
+    return RunSubmissionResult(self, run_name, arguments, run_info=run_info)
+
+  async def create_runs(self, arguments_list: List[Mapping[str, str]], pipeline_func: Callable = None, pipeline_package_path: str = None, pipeline_id: str = None, run_names: List[str] = None, experiment_name: str = None, pipeline_conf: kfp.dsl.PipelineConf = None, namespace: str = None, max_concurrent_runs: int = 100, max_runs_per_second: float = None) -> List[RunSubmissionResult]:
+    """Submits one run of the pipeline for every set of arguments. See Client.create_runs.
+
+    The run creations are concurrent requests on the event loop instead of threads.
+
+    Returns:
+      A list of RunSubmissionResult objects in the order of arguments_list.
+    """
+    workflow_manifest, run_names = self._prepare_runs(arguments_list, pipeline_func, pipeline_package_path, pipeline_id, run_names, pipeline_conf)
+    experiment = await self.create_experiment(name=self._get_experiment_name(experiment_name))
+    rate_limiter = _RateLimiter(max_runs_per_second)
+    semaphore = asyncio.Semaphore(max_concurrent_runs)
+
+    async def submit_run(run_name, arguments):
+      async with semaphore:
+        await asyncio.sleep(rate_limiter.reserve())
+        try:
+          run_info = await self._create_run(experiment.id, run_name, workflow_manifest, arguments, pipeline_id, namespace)
+        except Exception as error:
+          logging.warning('Failed to create the run {}: {}'.format(run_name, error))
+          return RunSubmissionResult(self, run_name, arguments, error=error)
+        return RunSubmissionResult(self, run_name, arguments, run_info=run_info)
+
+    return list(await asyncio.gather(*[submit_run(run_name, arguments) for run_name, arguments in zip(run_names, arguments_list)]))
+
+  async def list_runs(self, page_token='', page_size=10, sort_by='', experiment_id=None, filter=None):
+    """List runs. See Client.list_runs."""
+    if experiment_id is not None:
+      return await self._run_api.list_runs(page_token=page_token, page_size=page_size, sort_by=sort_by, resource_reference_key_type=kfp_server_api.models.api_resource_type.ApiResourceType.EXPERIMENT, resource_reference_key_id=experiment_id, **_get_filter_kwargs(filter))
+    return await self._run_api.list_runs(page_token=page_token, page_size=page_size, sort_by=sort_by, **_get_filter_kwargs(filter))
+
+  def iter_runs(self, experiment_id=None, page_size=100, sort_by='', filter=None, prefetch=True) -> '_AsyncPageIterator':
+    """Returns an async iterator over all the runs. See Client.iter_runs."""
+    return _AsyncPageIterator(lambda page_token: self.list_runs(page_token=page_token, page_size=page_size, sort_by=sort_by, experiment_id=experiment_id, filter=filter), 'runs', prefetch)
+
+  async def get_run(self, run_id):
+    """Get run details. See Client.get_run."""
+    return await self._run_api.get_run(run_id=run_id)
+
+  async def wait_for_run_completion(self, run_id, timeout):
+    """Wait for a run to complete. See Client.wait_for_run_completion."""
+    deadline = time.monotonic() + timeout
+    while True:
+      get_run_response = await self._run_api.get_run(run_id=run_id)
+      if _is_run_finished(get_run_response.run.status):
+        return get_run_response
+      logging.info('Waiting for the job to complete...')
+      if time.monotonic() > deadline:
+        raise TimeoutError('Run timeout')
+      await asyncio.sleep(5)
+
+  def wait_for_runs(self, run_ids: List[str], experiment_id: str = None, timeout: float = None, min_poll_interval: float = 5, max_poll_interval: float = 60, backoff_factor: float = 2, fetch_run_details: bool = True) -> '_RunWaiter':
+    """Waits for many runs to complete. See Client.wait_for_runs.
+
+    Returns:
+      An async iterator of the run detail objects (or the run objects if fetch_run_details is False) in the order the runs finish:
+
+        async for run_detail in client.wait_for_runs(run_ids):
+          ...
+    """
+    return _RunWaiter(self, run_ids, experiment_id, timeout, min_poll_interval, max_poll_interval, backoff_factor, fetch_run_details)
+
+  async def _get_run_experiment_ids(self, run_ids):
+    """Returns the dict from the run IDs to the IDs of their experiments. See Client._get_run_experiment_ids. The batches are listed concurrently."""
+    async def list_runs(run_ids_batch):
+      runs = []
+      async for run in self.iter_runs(page_size=len(run_ids_batch), filter=_get_run_ids_filter(run_ids_batch), prefetch=False):
+        runs.append(run)
+      return runs
+
+    run_ids = list(run_ids)
+    runs_list = await asyncio.gather(*[
+        list_runs(run_ids[start:start + _RUN_ID_BATCH_SIZE])
+        for start in range(0, len(run_ids), _RUN_ID_BATCH_SIZE)
+    ])
+    return _get_run_experiment_ids(run_ids, [run for runs in runs_list for run in runs])
+
+  async def _list_finished_runs(self, experiment_id, run_ids):
+    """Returns the finished runs among the runs of the experiment. Stops paging once all the runs were seen.
+
+    Raises:
+      ValueError: Some runs were not found in the experiment.
+    """
+    finished_runs = []
+    unseen_run_ids = set(run_ids)
+    page_token = ''
+    while unseen_run_ids:
+      response = await self.list_runs(page_token=page_token, page_size=100, sort_by='created_at desc', experiment_id=experiment_id)
+      for run in response.runs or []:
+        if run.id in unseen_run_ids:
+          unseen_run_ids.remove(run.id)
+          if _is_run_finished(run.status):
+            finished_runs.append(run)
+      page_token = response.next_page_token
+      if not page_token:
+        break
+    if unseen_run_ids:
+      raise ValueError('Runs {} were not found in experiment {}.'.format(', '.join(sorted(unseen_run_ids)), experiment_id))
+    return finished_runs
+
+
+class _AsyncPageIterator(object):
+  """The async iterator returned by the AsyncClient.iter_* methods. Requests the next page while the current one is consumed."""
+
+  def __init__(self, list_page, items_name, prefetch=True):
+    self._list_page = list_page
+    self._items_name = items_name
+    self._prefetch = prefetch
+    self._items = deque()
+    self._next_page_token = ''
+    self._next_response_future = None
+
+  def __aiter__(self):
+    return self
+
+  async def __anext__(self):
+    while not self._items:
+      if self._next_page_token is None:
+        raise StopAsyncIteration
+      if self._next_response_future is not None:
+        response = await self._next_response_future
+        self._next_response_future = None
+      else:
+        response = await self._list_page(self._next_page_token)
+      self._items.extend(getattr(response, self._items_name) or [])
+      self._next_page_token = response.next_page_token or None
+      if self._prefetch and self._next_page_token is not None:
+        self._next_response_future = asyncio.ensure_future(self._list_page(self._next_page_token))
+    return self._items.popleft()
+
+
+class _RunWaiter(object):
+  """The async iterator returned by AsyncClient.wait_for_runs. Polls the experiments of the runs concurrently."""
+
+  def __init__(self, client, run_ids, experiment_id, timeout, min_poll_interval, max_poll_interval, backoff_factor, fetch_run_details):
+    self._client = client
+    self._run_ids = run_ids
+    self._experiment_id = experiment_id
+    self._deadline = time.monotonic() + timeout if timeout is not None else None
+    self._min_poll_interval = min_poll_interval
+    self._max_poll_interval = max_poll_interval
+    self._backoff_factor = backoff_factor
+    self._fetch_run_details = fetch_run_details
+    self._pending_run_ids_by_experiment = None
+    self._finished_runs = deque()
+    self._poll_interval = min_poll_interval
+
+  def __aiter__(self):
+    return self
+
+  async def __anext__(self):
+    if self._pending_run_ids_by_experiment is None:
+      await self._find_experiments()
+      await self._poll()
+    while not self._finished_runs:
+      if not self._pending_run_ids_by_experiment:
+        raise StopAsyncIteration
+      await self._sleep()
+      await self._poll()
+    run = self._finished_runs.popleft()
+    if self._fetch_run_details:
+      return await self._client._run_api.get_run(run_id=run.id)
+    return run
+
+  async def _find_experiments(self):
+    if self._experiment_id:
+      experiment_ids = {run_id: self._experiment_id for run_id in self._run_ids}
+    else:
+      experiment_ids = await self._client._get_run_experiment_ids(self._run_ids)
+    self._pending_run_ids_by_experiment = {}
+    for run_id in self._run_ids:
+      self._pending_run_ids_by_experiment.setdefault(experiment_ids[run_id], set()).add(run_id)
+
+  async def _poll(self):
+    experiment_ids = list(self._pending_run_ids_by_experiment)
+    finished_runs_list = await asyncio.gather(*[
+        self._client._list_finished_runs(experiment_id, self._pending_run_ids_by_experiment[experiment_id])
+        for experiment_id in experiment_ids
+    ])
+    for experiment_id, finished_runs in zip(experiment_ids, finished_runs_list):
+      pending_run_ids = self._pending_run_ids_by_experiment[experiment_id]
+      for run in finished_runs:
+        pending_run_ids.remove(run.id)
+        self._finished_runs.append(run)
+      if not pending_run_ids:
+        del self._pending_run_ids_by_experiment[experiment_id]
+
+    if self._finished_runs:
+      self._poll_interval = self._min_poll_interval
+    else:
+      self._poll_interval = min(self._poll_interval * self._backoff_factor, self._max_poll_interval)
+
+  async def _sleep(self):
+    sleep_time = self._poll_interval
+    if self._deadline is not None:
+      remaining_time = self._deadline - time.monotonic()
+      if remaining_time <= 0:
+        raise TimeoutError('Runs timeout: {} runs did not finish'.format(sum(len(ids) for ids in self._pending_run_ids_by_experiment.values())))
+      sleep_time = min(sleep_time, remaining_time)
+    logging.info('Waiting for the runs to complete...')
+    await asyncio.sleep(sleep_time)
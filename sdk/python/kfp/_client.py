@@ -18,18 +18,25 @@ import logging
 import json
 import os
 import re
+import shutil
 import tarfile
 import tempfile
+import threading
 import warnings
 import yaml
 import zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Mapping, Callable
+from typing import Callable, Iterator, List, Mapping
 
 import kfp
 import kfp_server_api
 
 from kfp.compiler import compiler
+from kfp.compiler._workflow_size import check_workflow_size
+from kfp.compiler._workflow_writer import dump_json
 from kfp.compiler._k8s_helper import sanitize_k8s_name
 
 from kfp._auth import get_auth_token, get_gcp_access_token
@@ -68,11 +75,198 @@ def _add_generated_apis(target_struct, api_module, api_client):
   target_struct.api_models = models_struct
 
 
+class RunSubmissionResult(object):
+  """The result of one of the run submissions of Client.create_runs or AsyncClient.create_runs.
+
+  Attributes:
+    run_name: The name of the run.
+    arguments: The arguments of the run.
+    run_info: The created run object or None if the submission failed.
+    run_id: The ID of the created run or None if the submission failed.
+    error: The exception raised by the submission or None if the run was created.
+  """
+
+  def __init__(self, client, run_name, arguments, run_info=None, error=None):
+    self._client = client
+    self.run_name = run_name
+    self.arguments = arguments
+    self.run_info = run_info
+    self.run_id = run_info.id if run_info is not None else None
+    self.error = error
+
+  @property
+  def succeeded(self):
+    return self.error is None
+
+  def wait_for_run_completion(self, timeout):
+    """Waits for the run to complete. Returns a coroutine when the run was created by an AsyncClient."""
+    if self.error is not None:
+      raise self.error
+    return self._client.wait_for_run_completion(self.run_id, timeout)
+
+  def __repr__(self):
+    if self.error is not None:
+      return 'RunSubmissionResult(run_name={!r}, error={!r})'.format(self.run_name, self.error)
+    return 'RunSubmissionResult(run_name={!r}, run_id={})'.format(self.run_name, self.run_id)
+
+
+def _is_run_finished(status):
+  return status is not None and status.lower() in ['succeeded', 'failed', 'skipped', 'error']
+
+
+def _create_workflow_manifest(pipeline_func, pipeline_conf=None):
+  """Compiles the pipeline function with type checking, like Compiler.compile(type_check=True), and returns the JSON workflow manifest.
+
+  The workflow is serialized to JSON directly, without writing a package file and parsing it back.
+  """
+  type_check_old_value = kfp.TYPE_CHECK
+  try:
+    kfp.TYPE_CHECK = True
+    workflow = compiler.Compiler()._create_workflow(pipeline_func, pipeline_conf=pipeline_conf)
+  finally:
+    kfp.TYPE_CHECK = type_check_old_value
+  workflow_manifest = dump_json(workflow)
+  check_workflow_size(workflow, json_size=len(workflow_manifest))
+  return workflow_manifest
+
+
+@contextmanager
+def _uploadable_package_path(pipeline_package_path):
+  """Yields the path of the package file to upload.
+
+  The API server only accepts .yaml, .yml, .zip and .tar.gz packages. JSON is valid YAML, so a .json package is uploaded as a .yaml copy.
+  """
+  if not pipeline_package_path.endswith('.json'):
+    yield pipeline_package_path
+    return
+  temp_dir = tempfile.mkdtemp()
+  try:
+    yaml_package_path = os.path.join(temp_dir, os.path.basename(pipeline_package_path)[:-len('.json')] + '.yaml')
+    shutil.copyfile(pipeline_package_path, yaml_package_path)
+    yield yaml_package_path
+  finally:
+    shutil.rmtree(temp_dir)
+
+
+def _create_run_body(experiment_id, job_name, workflow_manifest=None, params={}, pipeline_id=None, namespace=None):
+  """Returns the ApiRun of a run creation request. Shared by Client and AsyncClient."""
+  api_params = [kfp_server_api.ApiParameter(
+      name=sanitize_k8s_name(name=k, allow_capital_underscore=True),
+      value=str(v)) for k,v in params.items()]
+  resource_references = []
+
+  key = kfp_server_api.models.ApiResourceKey(id=experiment_id,
+                                      type=kfp_server_api.models.ApiResourceType.EXPERIMENT)
+  reference = kfp_server_api.models.ApiResourceReference(key=key,
+                                                         relationship=kfp_server_api.models.ApiRelationship.OWNER)
+  resource_references.append(reference)
+  if namespace is not None:
+    key = kfp_server_api.models.ApiResourceKey(id=namespace,
+                                               type=kfp_server_api.models.ApiResourceType.NAMESPACE)
+    reference = kfp_server_api.models.ApiResourceReference(key=key,
+                                                           name=namespace,
+                                                           relationship=kfp_server_api.models.ApiRelationship.OWNER)
+    resource_references.append(reference)
+  spec = kfp_server_api.models.ApiPipelineSpec(
+      pipeline_id=pipeline_id,
+      workflow_manifest=workflow_manifest,
+      parameters=api_params)
+  run_body = kfp_server_api.models.ApiRun(
+      pipeline_spec=spec, resource_references=resource_references, name=job_name)
+  return run_body
+
+
+def _get_run_ids_filter(run_ids):
+  """Returns the filter of the runs with the IDs."""
+  return {'predicates': [{'key': 'id', 'op': 'IN', 'string_values': {'values': list(run_ids)}}]}
+
+
+def _get_run_experiment_ids(run_ids, runs):
+  """Returns the dict from the run IDs to the IDs of the experiments of the runs, given the listed runs."""
+  runs_by_id = {run.id: run for run in runs}
+  experiment_ids = {}
+  for run_id in run_ids:
+    if run_id not in runs_by_id:
+      raise ValueError('Run {} was not found.'.format(run_id))
+    for reference in runs_by_id[run_id].resource_references or []:
+      if reference.key.type == kfp_server_api.models.ApiResourceType.EXPERIMENT:
+        experiment_ids[run_id] = reference.key.id
+        break
+    else:
+      raise ValueError('Run {} does not belong to an experiment.'.format(run_id))
+  return experiment_ids
+
+
+def _get_filter_kwargs(filter):
+  """Returns the filter keyword argument of the generated list methods.
+
+  The filter is a Filter protocol buffer as a dict or as its JSON text.
+  """
+  if filter is None:
+    return {}
+  if not isinstance(filter, str):
+    filter = json.dumps(filter)
+  return {'filter': filter}
+
+
+def _get_name_filter(name):
+  """Returns the filter of the resources with the name."""
+  return {'predicates': [{'key': 'name', 'op': 'EQUALS', 'string_value': name}]}
+
+
+def _iter_pages(list_page, items_name, prefetch=True):
+  """Yields the items of all the pages returned by list_page(page_token).
+
+  When prefetch is True, the next page is requested in a background thread while the items of the current page are consumed.
+  """
+  executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+  try:
+    response = list_page('')
+    while True:
+      next_page_token = response.next_page_token
+      next_response_future = executor.submit(list_page, next_page_token) if executor and next_page_token else None
+      for item in getattr(response, items_name) or []:
+        yield item
+      if not next_page_token:
+        return
+      response = next_response_future.result() if next_response_future else list_page(next_page_token)
+  finally:
+    if executor:
+      executor.shutdown(wait=False)
+
+
+class _RateLimiter(object):
+  """Spaces the calls of acquire so that there are at most rate calls per second. Thread-safe."""
+
+  def __init__(self, rate=None):
+    self._interval = 1.0 / rate if rate else 0
+    self._next_time = 0
+    self._lock = threading.Lock()
+
+  def reserve(self):
+    """Reserves the next call slot and returns the number of seconds to wait before it."""
+    if not self._interval:
+      return 0
+    with self._lock:
+      now = time.monotonic()
+      wait_time = self._next_time - now
+      self._next_time = max(now, self._next_time) + self._interval
+    return max(wait_time, 0)
+
+  def acquire(self):
+    wait_time = self.reserve()
+    if wait_time > 0:
+      time.sleep(wait_time)
+
+
 KF_PIPELINES_ENDPOINT_ENV = 'KF_PIPELINES_ENDPOINT'
 KF_PIPELINES_UI_ENDPOINT_ENV = 'KF_PIPELINES_UI_ENDPOINT'
 KF_PIPELINES_DEFAULT_EXPERIMENT_NAME = 'KF_PIPELINES_DEFAULT_EXPERIMENT_NAME'
 KF_PIPELINES_OVERRIDE_EXPERIMENT_NAME = 'KF_PIPELINES_OVERRIDE_EXPERIMENT_NAME'
 
+# The maximum number of run IDs in one list_runs filter.
+_RUN_ID_BATCH_SIZE = 100
+
 class Client(object):
   """ API Client for KubeFlow Pipeline.
   """
@@ -104,6 +298,7 @@ class Client(object):
     config = self._load_config(host, client_id, namespace, other_client_id, other_client_secret)
     api_client = kfp_server_api.api_client.ApiClient(config)
     _add_generated_apis(self, kfp_server_api, api_client)
+    self._experiment_ids_by_name = {}
     self._run_api = kfp_server_api.api.run_service_api.RunServiceApi(api_client)
     self._experiment_api = kfp_server_api.api.experiment_service_api.ExperimentServiceApi(api_client)
     self._pipelines_api = kfp_server_api.api.pipeline_service_api.PipelineServiceApi(api_client)
@@ -202,6 +397,7 @@ class Client(object):
       logging.info('Creating experiment {}.'.format(name))
       experiment = kfp_server_api.models.ApiExperiment(name=name, description=description)
       experiment = self._experiment_api.create_experiment(body=experiment)
+      self._experiment_ids_by_name[name] = experiment.id
 
     if self._is_ipython():
       import IPython
@@ -211,19 +407,33 @@ class Client(object):
       IPython.display.display(IPython.display.HTML(html))
     return experiment
 
-  def list_experiments(self, page_token='', page_size=10, sort_by=''):
+  def list_experiments(self, page_token='', page_size=10, sort_by='', filter=None):
     """List experiments.
     Args:
       page_token: token for starting of the page.
       page_size: size of the page.
       sort_by: can be '[field_name]', '[field_name] des'. For example, 'name des'.
+      filter: Optional. A server-side filter: a Filter protocol buffer as a dict or as its JSON text.
+        For example, {'predicates': [{'key': 'name', 'op': 'EQUALS', 'string_value': 'my-experiment'}]}.
     Returns:
       A response object including a list of experiments and next page token.
     """
     response = self._experiment_api.list_experiment(
-        page_token=page_token, page_size=page_size, sort_by=sort_by)
+        page_token=page_token, page_size=page_size, sort_by=sort_by, **_get_filter_kwargs(filter))
     return response
 
+  def iter_experiments(self, page_size=100, sort_by='', filter=None, prefetch=True) -> Iterator:
+    """Iterates over all the experiments, requesting the pages as they are needed.
+    Args:
+      page_size: The number of experiments requested at a time.
+      sort_by: can be '[field_name]', '[field_name] des'. For example, 'name des'.
+      filter: Optional. A server-side filter. See list_experiments.
+      prefetch: Whether to request the next page in the background while the current one is consumed.
+    Returns:
+      An iterator of experiment objects.
+    """
+    return _iter_pages(lambda page_token: self.list_experiments(page_token=page_token, page_size=page_size, sort_by=sort_by, filter=filter), 'experiments', prefetch)
+
   def get_experiment(self, experiment_id=None, experiment_name=None):
     """Get details of an experiment
     Either experiment_id or experiment_name is required
@@ -239,13 +449,20 @@ class Client(object):
       raise ValueError('Either experiment_id or experiment_name is required')
     if experiment_id is not None:
       return self._experiment_api.get_experiment(id=experiment_id)
-    next_page_token = ''
-    while next_page_token is not None:
-      list_experiments_response = self.list_experiments(page_size=100, page_token=next_page_token)
-      next_page_token = list_experiments_response.next_page_token
-      for experiment in list_experiments_response.experiments:
-        if experiment.name == experiment_name:
-          return self._experiment_api.get_experiment(id=experiment.id)
+    # The IDs of the experiments found by name are cached, so that the experiments are not listed again.
+    experiment_id = self._experiment_ids_by_name.get(experiment_name)
+    if experiment_id is not None:
+      try:
+        return self._experiment_api.get_experiment(id=experiment_id)
+      except kfp_server_api.rest.ApiException as e:
+        if e.status != 404:
+          raise
+        # The experiment was deleted.
+        self._experiment_ids_by_name.pop(experiment_name, None)
+    for experiment in self.iter_experiments(filter=_get_name_filter(experiment_name), prefetch=False):
+      if experiment.name == experiment_name:
+        self._experiment_ids_by_name[experiment_name] = experiment.id
+        return experiment
     raise ValueError('No experiment is found with name {}.'.format(experiment_name))
 
   def _extract_pipeline_yaml(self, package_file):
@@ -272,22 +489,35 @@ class Client(object):
         pipeline_yaml_file = _choose_pipeline_yaml_file(zip.namelist())
         with zip.open(pipeline_yaml_file) as f:
           return yaml.safe_load(f)
-    elif package_file.endswith('.yaml') or package_file.endswith('.yml'):
+    elif package_file.endswith('.yaml') or package_file.endswith('.yml') or package_file.endswith('.json'):
       with open(package_file, 'r') as f:
         return yaml.safe_load(f)
     else:
-      raise ValueError('The package_file '+ package_file + ' should ends with one of the following formats: [.tar.gz, .tgz, .zip, .yaml, .yml]')
+      raise ValueError('The package_file '+ package_file + ' should ends with one of the following formats: [.tar.gz, .tgz, .zip, .yaml, .yml, .json]')
 
-  def list_pipelines(self, page_token='', page_size=10, sort_by=''):
+  def list_pipelines(self, page_token='', page_size=10, sort_by='', filter=None):
     """List pipelines.
     Args:
       page_token: token for starting of the page.
       page_size: size of the page.
       sort_by: one of 'field_name', 'field_name des'. For example, 'name des'.
+      filter: Optional. A server-side filter. See list_experiments.
     Returns:
       A response object including a list of pipelines and next page token.
     """
-    return self._pipelines_api.list_pipelines(page_token=page_token, page_size=page_size, sort_by=sort_by)
+    return self._pipelines_api.list_pipelines(page_token=page_token, page_size=page_size, sort_by=sort_by, **_get_filter_kwargs(filter))
+
+  def iter_pipelines(self, page_size=100, sort_by='', filter=None, prefetch=True) -> Iterator:
+    """Iterates over all the pipelines, requesting the pages as they are needed.
+    Args:
+      page_size: The number of pipelines requested at a time.
+      sort_by: one of 'field_name', 'field_name des'. For example, 'name des'.
+      filter: Optional. A server-side filter. See list_experiments.
+      prefetch: Whether to request the next page in the background while the current one is consumed.
+    Returns:
+      An iterator of pipeline objects.
+    """
+    return _iter_pages(lambda page_token: self.list_pipelines(page_token=page_token, page_size=page_size, sort_by=sort_by, filter=filter), 'pipelines', prefetch)
 
   # TODO: provide default namespace, similar to kubectl default namespaces.
   def run_pipeline(self, experiment_id, job_name, pipeline_package_path=None, params={}, pipeline_id=None, namespace=None):
@@ -296,7 +526,7 @@ class Client(object):
     Args:
       experiment_id: The string id of an experiment.
       job_name: name of the job.
-      pipeline_package_path: local path of the pipeline package(the filename should end with one of the following .tar.gz, .tgz, .zip, .yaml, .yml).
+      pipeline_package_path: local path of the pipeline package(the filename should end with one of the following .tar.gz, .tgz, .zip, .yaml, .yml, .json).
       params: a dictionary with key (string) as param name and value (string) as as param value.
       pipeline_id: the string ID of a pipeline.
       namespace: kubernetes namespace where the pipeline runs are created.
@@ -311,38 +541,34 @@ class Client(object):
     if pipeline_package_path:
       pipeline_obj = self._extract_pipeline_yaml(pipeline_package_path)
       pipeline_json_string = json.dumps(pipeline_obj)
-    api_params = [kfp_server_api.ApiParameter(
-        name=sanitize_k8s_name(name=k, allow_capital_underscore=True),
-        value=str(v)) for k,v in params.items()]
-    resource_references = []
+    run_info = self._create_run(experiment_id, job_name, pipeline_json_string, params, pipeline_id, namespace)
+    self._display_run_link(run_info)
+    return run_info
 
-    key = kfp_server_api.models.ApiResourceKey(id=experiment_id,
-                                        type=kfp_server_api.models.ApiResourceType.EXPERIMENT)
-    reference = kfp_server_api.models.ApiResourceReference(key=key,
-                                                           relationship=kfp_server_api.models.ApiRelationship.OWNER)
-    resource_references.append(reference)
-    if namespace is not None:
-      key = kfp_server_api.models.ApiResourceKey(id=namespace,
-                                                 type=kfp_server_api.models.ApiResourceType.NAMESPACE)
-      reference = kfp_server_api.models.ApiResourceReference(key=key,
-                                                             name=namespace,
-                                                             relationship=kfp_server_api.models.ApiRelationship.OWNER)
-      resource_references.append(reference)
-    spec = kfp_server_api.models.ApiPipelineSpec(
-        pipeline_id=pipeline_id,
-        workflow_manifest=pipeline_json_string,
-        parameters=api_params)
-    run_body = kfp_server_api.models.ApiRun(
-        pipeline_spec=spec, resource_references=resource_references, name=job_name)
+  def _create_run(self, experiment_id, job_name, workflow_manifest=None, params={}, pipeline_id=None, namespace=None):
+    """Creates a run from the JSON workflow manifest or from the pipeline ID.
+
+    Args:
+      experiment_id: The string id of an experiment.
+      job_name: name of the job.
+      workflow_manifest: The JSON text of the workflow.
+      params: a dictionary with key (string) as param name and value (string) as as param value.
+      pipeline_id: the string ID of a pipeline.
+      namespace: kubernetes namespace where the pipeline runs are created.
 
+    Returns:
+      A run object. Most important field is id.
+    """
+    run_body = _create_run_body(experiment_id, job_name, workflow_manifest, params, pipeline_id, namespace)
     response = self._run_api.create_run(body=run_body)
+    return response.run
 
+  def _display_run_link(self, run_info):
     if self._is_ipython():
       import IPython
       html = ('Run link <a href="%s/#/runs/details/%s" target="_blank" >here</a>'
-              % (self._get_url_prefix(), response.run.id))
+              % (self._get_url_prefix(), run_info.id))
       IPython.display.display(IPython.display.HTML(html))
-    return response.run
 
   def create_run_from_pipeline_func(self, pipeline_func: Callable, arguments: Mapping[str, str], run_name=None, experiment_name=None, pipeline_conf: kfp.dsl.PipelineConf = None, namespace=None):
     '''Runs pipeline on KFP-enabled Kubernetes cluster.
@@ -360,12 +586,8 @@ class Client(object):
     #TODO: Check arguments against the pipeline function
     pipeline_name = pipeline_func.__name__
     run_name = run_name or pipeline_name + ' ' + datetime.now().strftime('%Y-%m-%d %H-%M-%S')
-    try:
-      (_, pipeline_package_path) = tempfile.mkstemp(suffix='.zip')
-      compiler.Compiler().compile(pipeline_func, pipeline_package_path, pipeline_conf=pipeline_conf)
-      return self.create_run_from_pipeline_package(pipeline_package_path, arguments, run_name, experiment_name, namespace)
-    finally:
-      os.remove(pipeline_package_path)
+    workflow_manifest = _create_workflow_manifest(pipeline_func, pipeline_conf)
+    return self._create_run_from_workflow_manifest(workflow_manifest, arguments, run_name, experiment_name, namespace)
 
   def create_run_from_pipeline_package(self, pipeline_file: str, arguments: Mapping[str, str], run_name=None, experiment_name=None, namespace=None):
     '''Runs pipeline on KFP-enabled Kubernetes cluster.
@@ -381,6 +603,15 @@ class Client(object):
         For multi user, input a namespace where the user is authorized
     '''
 
+    #TODO: Check arguments against the pipeline function
+    pipeline_name = os.path.basename(pipeline_file)
+    run_name = run_name or pipeline_name + ' ' + datetime.now().strftime('%Y-%m-%d %H-%M-%S')
+    workflow_manifest = json.dumps(self._extract_pipeline_yaml(pipeline_file))
+    return self._create_run_from_workflow_manifest(workflow_manifest, arguments, run_name, experiment_name, namespace)
+
+  def _create_run_from_workflow_manifest(self, workflow_manifest: str, arguments: Mapping[str, str], run_name: str, experiment_name=None, namespace=None):
+    """Creates or gets the experiment and creates a run from the JSON workflow manifest."""
+
     class RunPipelineResult:
       def __init__(self, client, run_info):
         self._client = client
@@ -394,35 +625,113 @@ class Client(object):
       def __repr__(self):
         return 'RunPipelineResult(run_id={})'.format(self.run_id)
 
-    #TODO: Check arguments against the pipeline function
-    pipeline_name = os.path.basename(pipeline_file)
+    experiment = self.create_experiment(name=self._get_experiment_name(experiment_name))
+    run_info = self._create_run(experiment.id, run_name, workflow_manifest, arguments, namespace=namespace)
+    self._display_run_link(run_info)
+    return RunPipelineResult(self, run_info)
+
+  def _get_experiment_name(self, experiment_name=None):
+    """Returns the experiment name, taking the default and the override environment variables into account."""
     experiment_name = experiment_name or os.environ.get(KF_PIPELINES_DEFAULT_EXPERIMENT_NAME, None)
     overridden_experiment_name = os.environ.get(KF_PIPELINES_OVERRIDE_EXPERIMENT_NAME, experiment_name)
     if overridden_experiment_name != experiment_name:
       import warnings
       warnings.warn('Changing experiment name from "{}" to "{}".'.format(experiment_name, overridden_experiment_name))
-    experiment_name = overridden_experiment_name or 'Default'
-    run_name = run_name or pipeline_name + ' ' + datetime.now().strftime('%Y-%m-%d %H-%M-%S')
-    experiment = self.create_experiment(name=experiment_name)
-    run_info = self.run_pipeline(experiment.id, run_name, pipeline_file, arguments, namespace=namespace)
-    return RunPipelineResult(self, run_info)
+    return overridden_experiment_name or 'Default'
+
+  def create_runs(self, arguments_list: List[Mapping[str, str]], pipeline_func: Callable = None, pipeline_package_path: str = None, pipeline_id: str = None, run_names: List[str] = None, experiment_name: str = None, pipeline_conf: kfp.dsl.PipelineConf = None, namespace: str = None, max_concurrent_runs: int = 10, max_runs_per_second: float = None) -> List['RunSubmissionResult']:
+    """Submits one run of the pipeline for every set of arguments. Useful for the hyperparameter sweeps.
+
+    The pipeline is compiled or read once, the experiment is created or found once, and the runs are created concurrently.
+    The runs share the HTTP connection pool of the client, so max_concurrent_runs should not exceed the connection_pool_maxsize of the client configuration.
+    A failed submission does not stop the other ones: its error is reported in the result of the run.
+
+    Args:
+      arguments_list: The arguments of the runs. Every item is a dict of pipeline arguments.
+      pipeline_func: A function that describes a pipeline by calling components and composing them into execution graph.
+      pipeline_package_path: A compiled pipeline package file.
+      pipeline_id: The string ID of a pipeline that was uploaded to the cluster.
+        Exactly one of pipeline_func, pipeline_package_path and pipeline_id must be specified.
+      run_names: Optional. The names of the runs. Defaults to the pipeline name, the submission time and the index of the run.
+      experiment_name: Optional. Name of the experiment to add the runs to.
+      pipeline_conf: Optional. kfp.dsl.PipelineConf instance used to compile pipeline_func.
+      namespace: kubernetes namespace where the pipeline runs are created.
+        For single user deployment, leave it as None;
+        For multi user, input a namespace where the user is authorized
+      max_concurrent_runs: The maximum number of runs that are created at the same time.
+      max_runs_per_second: Optional. The maximum rate of the run creations.
 
-  def list_runs(self, page_token='', page_size=10, sort_by='', experiment_id=None):
+    Returns:
+      A list of RunSubmissionResult objects in the order of arguments_list.
+    """
+    workflow_manifest, run_names = self._prepare_runs(arguments_list, pipeline_func, pipeline_package_path, pipeline_id, run_names, pipeline_conf)
+    experiment = self.create_experiment(name=self._get_experiment_name(experiment_name))
+    rate_limiter = _RateLimiter(max_runs_per_second)
+
+    def submit_run(run_name, arguments):
+      rate_limiter.acquire()
+      try:
+        run_info = self._create_run(experiment.id, run_name, workflow_manifest, arguments, pipeline_id, namespace)
+      except Exception as error:
+        logging.warning('Failed to create the run {}: {}'.format(run_name, error))
+        return RunSubmissionResult(self, run_name, arguments, error=error)
+      return RunSubmissionResult(self, run_name, arguments, run_info=run_info)
+
+    with ThreadPoolExecutor(max_workers=max_concurrent_runs) as executor:
+      futures = [executor.submit(submit_run, run_name, arguments) for run_name, arguments in zip(run_names, arguments_list)]
+      return [future.result() for future in futures]
+
+  def _prepare_runs(self, arguments_list, pipeline_func=None, pipeline_package_path=None, pipeline_id=None, run_names=None, pipeline_conf=None):
+    """Validates the arguments of create_runs and returns the JSON workflow manifest (None for pipeline_id) and the run names."""
+    if len([source for source in [pipeline_func, pipeline_package_path, pipeline_id] if source is not None]) != 1:
+      raise ValueError('Exactly one of pipeline_func, pipeline_package_path and pipeline_id must be specified.')
+    if run_names is not None and len(run_names) != len(arguments_list):
+      raise ValueError('run_names must have the same length as arguments_list.')
+
+    workflow_manifest = None
+    if pipeline_func is not None:
+      pipeline_name = pipeline_func.__name__
+      workflow_manifest = _create_workflow_manifest(pipeline_func, pipeline_conf)
+    elif pipeline_package_path is not None:
+      pipeline_name = os.path.basename(pipeline_package_path)
+      workflow_manifest = json.dumps(self._extract_pipeline_yaml(pipeline_package_path))
+    else:
+      pipeline_name = pipeline_id
+    if run_names is None:
+      submission_time = datetime.now().strftime('%Y-%m-%d %H-%M-%S')
+      run_names = ['{} {} {}'.format(pipeline_name, submission_time, index) for index in range(len(arguments_list))]
+    return workflow_manifest, run_names
+
+  def list_runs(self, page_token='', page_size=10, sort_by='', experiment_id=None, filter=None):
     """List runs.
     Args:
       page_token: token for starting of the page.
       page_size: size of the page.
       sort_by: one of 'field_name', 'field_name des'. For example, 'name des'.
       experiment_id: experiment id to filter upon
+      filter: Optional. A server-side filter. See list_experiments.
     Returns:
       A response object including a list of experiments and next page token.
     """
     if experiment_id is not None:
-      response = self._run_api.list_runs(page_token=page_token, page_size=page_size, sort_by=sort_by, resource_reference_key_type=kfp_server_api.models.api_resource_type.ApiResourceType.EXPERIMENT, resource_reference_key_id=experiment_id)
+      response = self._run_api.list_runs(page_token=page_token, page_size=page_size, sort_by=sort_by, resource_reference_key_type=kfp_server_api.models.api_resource_type.ApiResourceType.EXPERIMENT, resource_reference_key_id=experiment_id, **_get_filter_kwargs(filter))
     else:
-      response = self._run_api.list_runs(page_token=page_token, page_size=page_size, sort_by=sort_by)
+      response = self._run_api.list_runs(page_token=page_token, page_size=page_size, sort_by=sort_by, **_get_filter_kwargs(filter))
     return response
 
+  def iter_runs(self, experiment_id=None, page_size=100, sort_by='', filter=None, prefetch=True) -> Iterator:
+    """Iterates over all the runs, requesting the pages as they are needed.
+    Args:
+      experiment_id: experiment id to filter upon
+      page_size: The number of runs requested at a time.
+      sort_by: one of 'field_name', 'field_name des'. For example, 'name des'.
+      filter: Optional. A server-side filter. See list_experiments.
+      prefetch: Whether to request the next page in the background while the current one is consumed.
+    Returns:
+      An iterator of run objects.
+    """
+    return _iter_pages(lambda page_token: self.list_runs(page_token=page_token, page_size=page_size, sort_by=sort_by, experiment_id=experiment_id, filter=filter), 'runs', prefetch)
+
   def get_run(self, run_id):
     """Get run details.
     Args:
@@ -444,7 +753,7 @@ class Client(object):
     """
     status = 'Running:'
     start_time = datetime.now()
-    while status is None or status.lower() not in ['succeeded', 'failed', 'skipped', 'error']:
+    while not _is_run_finished(status):
       get_run_response = self._run_api.get_run(run_id=run_id)
       status = get_run_response.run.status
       elapsed_time = (datetime.now() - start_time).seconds
@@ -454,6 +763,121 @@ class Client(object):
       time.sleep(5)
     return get_run_response
 
+  def wait_for_runs(self, run_ids: List[str], experiment_id: str = None, timeout: float = None, min_poll_interval: float = 5, max_poll_interval: float = 60, backoff_factor: float = 2, fetch_run_details: bool = True) -> Iterator:
+    """Waits for many runs to complete and yields them as they finish.
+
+    The statuses are polled in batches with list_runs filtered by experiment, which does not return the workflows.
+    The poll interval starts at min_poll_interval and is multiplied by backoff_factor after every poll where no run finished, up to max_poll_interval.
+
+    Args:
+      run_ids: The IDs of the runs.
+      experiment_id: Optional. The ID of the experiment of the runs. If not specified, the experiments of the runs are found by listing the runs
+        filtered by their IDs, in batches of 100 runs.
+      timeout: Optional. The maximum number of seconds to wait for all the runs.
+      min_poll_interval: The initial number of seconds between two polls.
+      max_poll_interval: The maximum number of seconds between two polls.
+      backoff_factor: The factor applied to the poll interval when no run finished.
+      fetch_run_details: Whether to get the run details (including the pipeline_runtime workflow) of the finished runs.
+        If False, the run objects returned by list_runs are yielded.
+
+    Yields:
+      The run detail objects (or the run objects if fetch_run_details is False) of the runs in the order they finish.
+
+    Raises:
+      TimeoutError: Some runs did not finish before the timeout.
+      ValueError: Some runs were not found in their experiment.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    run_experiment_ids = {run_id: experiment_id for run_id in run_ids} if experiment_id else self._get_run_experiment_ids(run_ids)
+    pending_run_ids_by_experiment = {}
+    for run_id in run_ids:
+      pending_run_ids_by_experiment.setdefault(run_experiment_ids[run_id], set()).add(run_id)
+
+    poll_interval = min_poll_interval
+    while pending_run_ids_by_experiment:
+      any_run_finished = False
+      for run_experiment_id, pending_run_ids in list(pending_run_ids_by_experiment.items()):
+        for run in self._list_finished_runs(run_experiment_id, pending_run_ids):
+          pending_run_ids.remove(run.id)
+          any_run_finished = True
+          yield self._run_api.get_run(run_id=run.id) if fetch_run_details else run
+        if not pending_run_ids:
+          del pending_run_ids_by_experiment[run_experiment_id]
+      if not pending_run_ids_by_experiment:
+        break
+
+      poll_interval = min_poll_interval if any_run_finished else min(poll_interval * backoff_factor, max_poll_interval)
+      sleep_time = poll_interval
+      if deadline is not None:
+        remaining_time = deadline - time.monotonic()
+        if remaining_time <= 0:
+          raise TimeoutError('Runs timeout: {} runs did not finish'.format(sum(len(ids) for ids in pending_run_ids_by_experiment.values())))
+        sleep_time = min(sleep_time, remaining_time)
+      logging.info('Waiting for the runs to complete...')
+      time.sleep(sleep_time)
+
+  def wait_for_runs_in_background(self, run_ids: List[str], **kwargs) -> Future:
+    """Waits for many runs to complete in a background thread.
+
+    Takes the same arguments as wait_for_runs.
+
+    Returns:
+      A concurrent.futures.Future of the dict from the run IDs to the run detail objects, in the order the runs finished.
+    """
+    future = Future()
+    fetch_run_details = kwargs.get('fetch_run_details', True)
+
+    def wait():
+      if not future.set_running_or_notify_cancel():
+        return
+      try:
+        finished_runs = OrderedDict()
+        for run_detail in self.wait_for_runs(run_ids, **kwargs):
+          run = run_detail.run if fetch_run_details else run_detail
+          finished_runs[run.id] = run_detail
+      except BaseException as error:
+        future.set_exception(error)
+      else:
+        future.set_result(finished_runs)
+
+    threading.Thread(target=wait, daemon=True).start()
+    return future
+
+  def _get_run_experiment_ids(self, run_ids):
+    """Returns the dict from the run IDs to the IDs of their experiments.
+
+    The runs are listed in batches filtered by their IDs. Unlike get_run, list_runs does not return the workflows.
+    """
+    run_ids = list(run_ids)
+    runs = []
+    for start in range(0, len(run_ids), _RUN_ID_BATCH_SIZE):
+      run_ids_batch = run_ids[start:start + _RUN_ID_BATCH_SIZE]
+      runs.extend(self.iter_runs(page_size=len(run_ids_batch), filter=_get_run_ids_filter(run_ids_batch), prefetch=False))
+    return _get_run_experiment_ids(run_ids, runs)
+
+  def _list_finished_runs(self, experiment_id, run_ids):
+    """Returns the finished runs among the runs of the experiment. Stops paging once all the runs were seen.
+
+    Raises:
+      ValueError: Some runs were not found in the experiment.
+    """
+    finished_runs = []
+    unseen_run_ids = set(run_ids)
+    page_token = ''
+    while unseen_run_ids:
+      response = self.list_runs(page_token=page_token, page_size=100, sort_by='created_at desc', experiment_id=experiment_id)
+      for run in response.runs or []:
+        if run.id in unseen_run_ids:
+          unseen_run_ids.remove(run.id)
+          if _is_run_finished(run.status):
+            finished_runs.append(run)
+      page_token = response.next_page_token
+      if not page_token:
+        break
+    if unseen_run_ids:
+      raise ValueError('Runs {} were not found in experiment {}.'.format(', '.join(sorted(unseen_run_ids)), experiment_id))
+    return finished_runs
+
   def _get_workflow_json(self, run_id):
     """Get the workflow json.
     Args:
@@ -469,13 +893,14 @@ class Client(object):
   def upload_pipeline(self, pipeline_package_path, pipeline_name=None):
     """Uploads the pipeline to the Kubeflow Pipelines cluster.
     Args:
-      pipeline_package_path: Local path to the pipeline package.
+      pipeline_package_path: Local path to the pipeline package. A .json package is uploaded as YAML.
       pipeline_name: Optional. Name of the pipeline to be shown in the UI.
     Returns:
       Server response object containing pipleine id and other information.
     """
 
-    response = self._upload_api.upload_pipeline(pipeline_package_path, name=pipeline_name)
+    with _uploadable_package_path(pipeline_package_path) as package_path:
+      response = self._upload_api.upload_pipeline(package_path, name=pipeline_name)
     if self._is_ipython():
       import IPython
       html = 'Pipeline link <a href=%s/#/pipelines/details/%s>here</a>' % (self._get_url_prefix(), response.id)
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import click
+import itertools
 import logging
 from tabulate import tabulate
 
@@ -53,12 +54,16 @@ def list(ctx, max_size):
     """List uploaded KFP pipelines"""
     client = ctx.obj["client"]
 
-    response = client.list_pipelines(
-        page_size=max_size,
-        sort_by="created_at desc"
-    )
-    if response.pipelines:
-        _print_pipelines(response.pipelines)
+    pipelines = [*itertools.islice(
+        client.iter_pipelines(
+            page_size=min(max_size, 100),
+            sort_by="created_at desc",
+            prefetch=max_size > 100
+        ),
+        max_size
+    )]
+    if pipelines:
+        _print_pipelines(pipelines)
     else:
         logging.info("No pipelines found")
 
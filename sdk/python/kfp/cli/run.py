@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from .._client import Client
+import itertools
 import sys
 import subprocess
 import pprint
@@ -34,9 +35,9 @@ def run():
 def list(ctx, experiment_id, max_size):
     """list recent KFP runs"""
     client = ctx.obj['client']
-    response = client.list_runs(experiment_id=experiment_id, page_size=max_size, sort_by='created_at desc')
-    if response and response.runs:
-        _print_runs(response.runs)
+    runs = [*itertools.islice(client.iter_runs(experiment_id=experiment_id, page_size=min(max_size, 100), sort_by='created_at desc', prefetch=max_size > 100), max_size)]
+    if runs:
+        _print_runs(runs)
     else:
         print('No runs found.')
 
@@ -14,4 +14,6 @@
 
 
 from .compiler import Compiler
+from ._compile_cache import CompileCache
+from ._profiler import CompileProfiler
 from ..containers._component_builder import build_python_component, build_docker_image, VersionedDependency
\ No newline at end of file
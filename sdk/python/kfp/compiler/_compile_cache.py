@@ -0,0 +1,333 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import builtins
+import hashlib
+import inspect
+import json
+import os
+import sys
+import sysconfig
+import tempfile
+import types
+from typing import Any, Callable, Dict, List, Optional, Text
+
+from ._k8s_helper import convert_k8s_obj_to_json
+from ..components.modelbase import ModelBase
+from ..dsl._pipeline_param import PipelineParam
+
+# Change it when the cached workflows or the cache keys are no longer compatible.
+_CACHE_FORMAT_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'kfp', 'compile')
+DEFAULT_MAX_SIZE = 100 * 2**20
+
+
+_LIBRARY_DIRS = tuple(sorted(set(
+    os.path.normcase(os.path.realpath(sysconfig.get_paths()[name])) + os.sep for name in ['stdlib', 'platstdlib', 'purelib', 'platlib']
+)))
+
+
+def _is_library_object(obj) -> bool:
+    '''Returns whether the module, class or function belongs to kfp, to the standard library or to an installed package.'''
+    module_name = obj.__name__ if isinstance(obj, types.ModuleType) else getattr(obj, '__module__', None) or ''
+    if module_name == 'kfp' or module_name.startswith('kfp.'):
+        return True
+    module = sys.modules.get(module_name)
+    module_file = getattr(module, '__file__', None)
+    if module is None or module_name == '__main__':
+        return False
+    if module_file is None:
+        # Built-in module
+        return True
+    return os.path.normcase(os.path.realpath(module_file)).startswith(_LIBRARY_DIRS)
+
+
+class _Fingerprinter(object):
+    '''Converts the inputs of a compilation to JSON-serializable structures that change when the inputs change.
+
+    The functions are represented by their source code and by the values of the global and closure variables they reference.
+    The referenced user functions, classes and module attributes are followed recursively.
+    The task factories of the components are represented by their component specs.
+    The modules, classes and functions of kfp, of the standard library and of the installed packages are represented by their name only.
+    '''
+
+    def __init__(self):
+        self._visited = set()
+
+    def fingerprint(self, obj):
+        if obj is None or isinstance(obj, (bool, int, float, str)):
+            return obj
+        if isinstance(obj, (list, tuple, set, frozenset)):
+            items = [self.fingerprint(item) for item in obj]
+            if isinstance(obj, (set, frozenset)):
+                items.sort(key=repr)
+            return [type(obj).__name__, items]
+        if isinstance(obj, dict):
+            return ['dict', sorted(([repr(key), self.fingerprint(value)] for key, value in obj.items()), key=lambda item: item[0])]
+        if isinstance(obj, PipelineParam):
+            return ['PipelineParam', obj.name, obj.op_name, self.fingerprint(obj.value), self.fingerprint(obj.param_type), obj.pattern]
+        if isinstance(obj, ModelBase):
+            return [type(obj).__name__, obj.to_dict()]
+        if isinstance(obj, types.FunctionType) and getattr(obj, 'component_spec', None) is not None:
+            # The task factories created by kfp.components
+            return ['component', obj.component_spec.to_dict()]
+        if isinstance(obj, types.ModuleType):
+            return ['module', obj.__name__]
+        if isinstance(obj, (types.BuiltinFunctionType, types.BuiltinMethodType)) or (
+                isinstance(obj, (types.FunctionType, type)) and _is_library_object(obj)):
+            return ['object', getattr(obj, '__module__', None), obj.__qualname__]
+        if not isinstance(obj, type) and hasattr(obj, 'swagger_types'):
+            return [type(obj).__name__, convert_k8s_obj_to_json(obj)]
+
+        if id(obj) in self._visited:
+            return ['visited', getattr(obj, '__qualname__', type(obj).__qualname__)]
+        self._visited.add(id(obj))
+        if isinstance(obj, types.MethodType):
+            return ['method', self.fingerprint(obj.__func__), self.fingerprint(obj.__self__)]
+        if isinstance(obj, types.FunctionType):
+            return self._fingerprint_function(obj)
+        if isinstance(obj, type):
+            return self._fingerprint_class(obj)
+        if hasattr(obj, '__dict__'):
+            return ['instance', self.fingerprint(type(obj)), self.fingerprint(vars(obj))]
+        return ['repr', type(obj).__qualname__, repr(obj)]
+
+    def _fingerprint_function(self, func: types.FunctionType):
+        code = func.__code__
+        try:
+            source = inspect.getsource(func)
+        except (OSError, TypeError):
+            source = code.co_code.hex()
+
+        referenced_names = _get_referenced_names(code)
+        referenced_values = {}
+        for name in referenced_names:
+            if name in func.__globals__:
+                value = func.__globals__[name]
+                referenced_values[name] = self.fingerprint(value)
+                if isinstance(value, types.ModuleType) and not _is_library_object(value):
+                    # The names include the attributes, for example train_op for my_components.train_op(...).
+                    referenced_values[name] = [referenced_values[name], self.fingerprint({
+                        attribute: getattr(value, attribute) for attribute in referenced_names if hasattr(value, attribute)})]
+            elif not hasattr(builtins, name):
+                referenced_values[name] = None
+        for name, cell in zip(code.co_freevars, func.__closure__ or []):
+            try:
+                referenced_values[name] = self.fingerprint(cell.cell_contents)
+            except ValueError:
+                # The variable is not assigned yet.
+                referenced_values[name] = None
+
+        return [
+            'function',
+            func.__module__,
+            func.__qualname__,
+            source,
+            self.fingerprint(func.__defaults__),
+            self.fingerprint(func.__kwdefaults__),
+            self.fingerprint(referenced_values),
+        ]
+
+    def _fingerprint_class(self, cls: type):
+        try:
+            source = inspect.getsource(cls)
+        except (OSError, TypeError):
+            source = None
+        members = {name: value for name, value in vars(cls).items() if not name.startswith('__')}
+        return [
+            'class',
+            cls.__module__,
+            cls.__qualname__,
+            source,
+            [self.fingerprint(base) for base in cls.__bases__],
+            self.fingerprint(members),
+        ]
+
+
+def _get_referenced_names(code: types.CodeType) -> List[Text]:
+    '''Returns the global (and attribute) names used by the code and by the nested functions, lambdas and comprehensions.'''
+    names = []
+    code_objects = [code]
+    while code_objects:
+        code = code_objects.pop()
+        names.extend(code.co_names)
+        code_objects.extend(const for const in code.co_consts if isinstance(const, types.CodeType))
+    return sorted(set(names))
+
+
+def compute_cache_key(
+    pipeline_func: Callable,
+    pipeline_name: Text = None,
+    pipeline_description: Text = None,
+    params_list: List[PipelineParam] = None,
+    pipeline_conf=None,
+) -> Text:
+    '''Returns the hash of everything the compiled workflow depends on.
+
+    The key covers the source of the pipeline function and of the user functions and classes it references, the specs of the components it uses,
+    the argument defaults, the pipeline configuration and the SDK and Python versions.
+    It does not cover the component files that the pipeline function loads while it is compiled. CompileCache checks them separately.
+    Pipelines that read other files, environment variables or other external state to build the workflow should not be compiled with a cache.
+    '''
+    import kfp
+    key_structure = [
+        _CACHE_FORMAT_VERSION,
+        kfp.__version__,
+        list(sys.version_info[:2]),
+        kfp.TYPE_CHECK,
+        pipeline_name,
+        pipeline_description,
+    ]
+    fingerprinter = _Fingerprinter()
+    key_structure.append(fingerprinter.fingerprint(pipeline_func))
+    key_structure.append(fingerprinter.fingerprint(params_list))
+    key_structure.append(fingerprinter.fingerprint(vars(pipeline_conf) if pipeline_conf is not None else None))
+    serialized_key_structure = json.dumps(key_structure, sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.sha256(serialized_key_structure.encode('utf-8')).hexdigest()
+
+
+def _get_file_digest(path: Text) -> Optional[Text]:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class _ComponentLoadRecorder(object):
+    '''Records the component files and URLs that are loaded while a pipeline is compiled.
+
+    The digests of the component files are stored with the cached workflow and checked when it is read.
+    The components loaded from URLs cannot be checked without downloading them again, so these workflows are not cached.
+    '''
+
+    def __init__(self):
+        self.component_file_digests = {}
+        self.loads_urls = False
+
+    @property
+    def cacheable(self) -> bool:
+        return not self.loads_urls and None not in self.component_file_digests.values()
+
+    def _record(self, component_filename, component_ref):
+        if component_ref is not None and component_ref.url:
+            self.loads_urls = True
+        elif component_filename:
+            self.component_file_digests[component_filename] = _get_file_digest(component_filename)
+
+    def __enter__(self):
+        from ..components import _components
+        _components._component_text_load_observers.append(self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        from ..components import _components
+        _components._component_text_load_observers.remove(self._record)
+
+
+class CompileCache(object):
+    '''On-disk cache of the compiled workflows.
+
+    Pass an instance to Compiler.compile to skip the compilation of the pipelines that did not change::
+
+        cache = CompileCache()
+        Compiler().compile(my_pipeline, 'my_pipeline.yaml', cache=cache)
+        print(cache.hits, cache.misses)
+
+    The workflows are stored as JSON files named after their cache key (see compute_cache_key), with the digests of the component files
+    that the pipeline loaded while it was compiled. A cached workflow is not used when one of these files changed.
+    The workflows of the pipelines that load components from URLs while they are compiled are not cached.
+    When the total size of the files exceeds max_size, the least recently used workflows are removed.
+
+    Args:
+        cache_dir: The directory of the cache files. Defaults to the KFP_COMPILE_CACHE_DIR environment variable or ~/.cache/kfp/compile.
+        max_size: The maximum total size of the cache files in bytes.
+    '''
+
+    def __init__(self, cache_dir: Text = None, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir or os.environ.get('KFP_COMPILE_CACHE_DIR') or DEFAULT_CACHE_DIR
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: Text) -> Text:
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def get(self, key: Text) -> Optional[Dict[Text, Any]]:
+        '''Returns the cached workflow or None.'''
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            if any(_get_file_digest(component_file) != digest for component_file, digest in entry['component_files'].items()):
+                # A component file changed since the workflow was compiled.
+                self.misses += 1
+                return None
+            # The modification time records the last use.
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['workflow']
+
+    def put(self, key: Text, workflow: Dict[Text, Any], component_file_digests: Dict[Text, Text] = None):
+        '''Stores the workflow and removes the least recently used workflows if the cache is too big.
+
+        Args:
+            key: The cache key of the workflow.
+            workflow: The compiled workflow.
+            component_file_digests: Optional. The SHA256 digests of the component files that the pipeline loaded while it was compiled.
+        '''
+        entry = {'component_files': component_file_digests or {}, 'workflow': workflow}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # The file is written under a temporary name and then renamed, so that concurrent compilations never read a partial file.
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f, separators=(',', ':'))
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith('.json'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, file_name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_name))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, file_name in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, file_name))
+            except OSError:
+                pass
+            total_size -= size
+
+    def clear(self):
+        '''Removes all the cached workflows.'''
+        if not os.path.isdir(self.cache_dir):
+            return
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith('.json'):
+                os.remove(os.path.join(self.cache_dir, file_name))
@@ -1,4 +1,3 @@
-import copy
 import json
 import re
 from typing import List, Optional, Set
@@ -24,9 +23,11 @@ def fix_big_data_passing(workflow: dict) -> dict:
     2. Search for direct data consumers in container/resource templates and some DAG task attributes (e.g. conditions and loops) to find out which inputs are directly consumed as parameters/artifacts.
     3. Propagate the consumption information upstream to all inputs/outputs all the way up to the data producers.
     4. Convert the inputs, outputs and arguments based on how they're consumed downstream.
+
+    The input workflow is not modified. Instead of deep-copying the whole workflow, only the structures that are rewritten are copied and the returned workflow shares all the other structures (e.g. the container specs) with the input workflow.
     '''
 
-    workflow = copy.deepcopy(workflow)
+    workflow = _copy_rewritten_structures(workflow)
     templates = workflow['spec']['templates']
 
     container_templates = [template for template in workflow['spec']['templates'] if 'container' in template]
@@ -35,10 +36,10 @@ def fix_big_data_passing(workflow: dict) -> dict:
     resource_template_names = set(template['name'] for template in resource_templates)
 
     # 1. Index the DAGs to understand how data is being passed and which inputs/outputs are connected to each other.
-    template_input_to_parent_dag_inputs = {} # (task_template_name, task_input_name) -> Set[(dag_template_name, dag_input_name)]
-    template_input_to_parent_task_outputs = {} # (task_template_name, task_input_name) -> Set[(upstream_template_name, upstream_output_name)]
+    # The inputs and outputs are the nodes of a single graph. A node is a tuple ('inputs' or 'outputs', template_name, input_or_output_name).
+    # The edges go from every input to the DAG inputs and task outputs passed to it and from every DAG output to the task output it comes from.
+    upstream_ports = {} # (port_type, template_name, port_name) -> Set[(upstream_port_type, upstream_template_name, upstream_port_name)]
     template_input_to_parent_constant_arguments = {} #(task_template_name, task_input_name) -> Set[argument_value] # Unused
-    dag_output_to_parent_template_outputs = {} # (dag_template_name, output_name) -> Set[(upstream_template_name, upstream_output_name)]
 
     for template in dag_templates:
         dag_template_name = template['name']
@@ -63,14 +64,14 @@ def fix_big_data_passing(workflow: dict) -> dict:
                 if placeholder_type == 'inputs':
                     assert argument_placeholder_parts[1] == 'parameters'
                     dag_input_name = argument_placeholder_parts[2]
-                    template_input_to_parent_dag_inputs.setdefault((task_template_name, task_input_name), set()).add((dag_template_name, dag_input_name))
+                    upstream_ports.setdefault(('inputs', task_template_name, task_input_name), set()).add(('inputs', dag_template_name, dag_input_name))
                 elif placeholder_type == 'tasks':
                     upstream_task_name = argument_placeholder_parts[1]
                     assert argument_placeholder_parts[2] == 'outputs'
                     assert argument_placeholder_parts[3] == 'parameters'
                     upstream_output_name = argument_placeholder_parts[4]
                     upstream_template_name = task_name_to_template_name[upstream_task_name]
-                    template_input_to_parent_task_outputs.setdefault((task_template_name, task_input_name), set()).add((upstream_template_name, upstream_output_name))
+                    upstream_ports.setdefault(('inputs', task_template_name, task_input_name), set()).add(('outputs', upstream_template_name, upstream_output_name))
                 elif placeholder_type == 'item' or placeholder_type == 'workflow' or placeholder_type == 'pod':
                     # Treat loop variables as constant values
                     # workflow.parameters.* placeholders are not supported, but the DSL compiler does not produce those.
@@ -80,7 +81,7 @@ def fix_big_data_passing(workflow: dict) -> dict:
 
                 dag_input_name = extract_input_parameter_name(argument_value)
                 if dag_input_name:
-                    template_input_to_parent_dag_inputs.setdefault((task_template_name, task_input_name), set()).add((dag_template_name, dag_input_name))
+                    upstream_ports.setdefault(('inputs', task_template_name, task_input_name), set()).add(('inputs', dag_template_name, dag_input_name))
                 else:
                     template_input_to_parent_constant_arguments.setdefault((task_template_name, task_input_name), set()).add(argument_value)
 
@@ -100,7 +101,7 @@ def fix_big_data_passing(workflow: dict) -> dict:
                     assert argument_placeholder_parts[3] == 'parameters'
                     upstream_output_name = argument_placeholder_parts[4]
                     upstream_template_name = task_name_to_template_name[upstream_task_name]
-                    dag_output_to_parent_template_outputs.setdefault((dag_template_name, dag_output_name), set()).add((upstream_template_name, upstream_output_name))
+                    upstream_ports.setdefault(('outputs', dag_template_name, dag_output_name), set()).add(('outputs', upstream_template_name, upstream_output_name))
                 elif placeholder_type == 'item' or placeholder_type == 'workflow' or placeholder_type == 'pod':
                     raise RuntimeError('DAG output value "{}" is not supported.'.format(output_value))
                 else:
@@ -188,42 +189,19 @@ def fix_big_data_passing(workflow: dict) -> dict:
     # Finished indexing data consumers
 
     # 3. Propagate the consumption information upstream to all inputs/outputs all the way up to the data producers.
-    inputs_consumed_as_parameters = set()
-    inputs_consumed_as_artifacts = set()
-
-    outputs_consumed_as_parameters = set()
-    outputs_consumed_as_artifacts = set()
-
-    def mark_upstream_ios_of_input(template_input, marked_inputs, marked_outputs):
-        # Stopping if the input has already been visited to save time and handle recursive calls
-        if template_input in marked_inputs:
-            return
-        marked_inputs.add(template_input)
-
-        upstream_inputs = template_input_to_parent_dag_inputs.get(template_input, [])
-        for upstream_input in upstream_inputs:
-            mark_upstream_ios_of_input(upstream_input, marked_inputs, marked_outputs)
-
-        upstream_outputs = template_input_to_parent_task_outputs.get(template_input, [])
-        for upstream_output in upstream_outputs:
-            mark_upstream_ios_of_output(upstream_output, marked_inputs, marked_outputs)
-
-    def mark_upstream_ios_of_output(template_output, marked_inputs, marked_outputs):
-        # Stopping if the output has already been visited to save time and handle recursive calls
-        if template_output in marked_outputs:
-            return
-        marked_outputs.add(template_output)
-
-        upstream_outputs = dag_output_to_parent_template_outputs.get(template_output, [])
-        for upstream_output in upstream_outputs:
-            mark_upstream_ios_of_output(upstream_output, marked_inputs, marked_outputs)
-
-    for input in inputs_directly_consumed_as_parameters:
-        mark_upstream_ios_of_input(input, inputs_consumed_as_parameters, outputs_consumed_as_parameters)
-    for input in inputs_directly_consumed_as_artifacts:
-        mark_upstream_ios_of_input(input, inputs_consumed_as_artifacts, outputs_consumed_as_artifacts)
-    for output in outputs_directly_consumed_as_parameters:
-        mark_upstream_ios_of_output(output, inputs_consumed_as_parameters, outputs_consumed_as_parameters)
+    ports_consumed_as_parameters = mark_upstream_ports(
+        [('inputs',) + input for input in inputs_directly_consumed_as_parameters] +
+        [('outputs',) + output for output in outputs_directly_consumed_as_parameters],
+        upstream_ports,
+    )
+    ports_consumed_as_artifacts = mark_upstream_ports(
+        [('inputs',) + input for input in inputs_directly_consumed_as_artifacts],
+        upstream_ports,
+    )
+    inputs_consumed_as_parameters = set(port[1:] for port in ports_consumed_as_parameters if port[0] == 'inputs')
+    outputs_consumed_as_parameters = set(port[1:] for port in ports_consumed_as_parameters if port[0] == 'outputs')
+    inputs_consumed_as_artifacts = set(port[1:] for port in ports_consumed_as_artifacts if port[0] == 'inputs')
+    outputs_consumed_as_artifacts = set(port[1:] for port in ports_consumed_as_artifacts if port[0] == 'outputs')
 
 
     # 4. Convert the inputs, outputs and arguments based on how they're consumed downstream.
@@ -283,8 +261,8 @@ def fix_big_data_passing(workflow: dict) -> dict:
                             },
                         })
 
-    # Remove input parameters unless they're used downstream. This also removes unused container template inputs if any.
     for template in container_templates + dag_templates:
+        # Remove input parameters unless they're used downstream. This also removes unused container template inputs if any.
         inputs = template.get('inputs', {})
         inputs['parameters'] = [
             input_parameter
@@ -292,8 +270,7 @@ def fix_big_data_passing(workflow: dict) -> dict:
             if (template['name'], input_parameter['name']) in inputs_consumed_as_parameters
         ]
 
-    # Remove output parameters unless they're used downstream
-    for template in container_templates + dag_templates:
+        # Remove output parameters unless they're used downstream
         outputs = template.get('outputs', {})
         outputs['parameters'] = [
             output_parameter
@@ -335,6 +312,53 @@ def fix_big_data_passing(workflow: dict) -> dict:
     return workflow
 
 
+def _copy_rewritten_structures(workflow: dict) -> dict:
+    '''Shallow-copies the parts of the workflow that are modified by fix_big_data_passing.
+
+    Those are the workflow arguments and, for every template, the template itself, its inputs and outputs, its input/output artifacts and its DAG tasks with their arguments.
+    '''
+    workflow = dict(workflow)
+    workflow_spec = workflow['spec'] = dict(workflow['spec'])
+    if 'arguments' in workflow_spec:
+        workflow_arguments = workflow_spec['arguments'] = dict(workflow_spec['arguments'])
+        if 'artifacts' in workflow_arguments:
+            workflow_arguments['artifacts'] = list(workflow_arguments['artifacts'])
+
+    templates = workflow_spec['templates'] = [dict(template) for template in workflow_spec['templates']]
+    for template in templates:
+        for ios_key in ['inputs', 'outputs']:
+            if ios_key in template:
+                ios = template[ios_key] = dict(template[ios_key])
+                if 'artifacts' in ios:
+                    ios['artifacts'] = [dict(artifact) for artifact in ios['artifacts']]
+        if 'dag' in template:
+            dag = template['dag'] = dict(template['dag'])
+            if 'tasks' in dag:
+                dag['tasks'] = [dict(task) for task in dag['tasks']]
+                for task in dag['tasks']:
+                    if 'arguments' in task:
+                        task_arguments = task['arguments'] = dict(task['arguments'])
+                        if 'artifacts' in task_arguments:
+                            task_arguments['artifacts'] = list(task_arguments['artifacts'])
+    return workflow
+
+
+def mark_upstream_ports(ports, upstream_ports: dict) -> Set[tuple]:
+    '''Returns the given inputs/outputs and all the inputs/outputs upstream of them.
+
+    The graph is traversed iteratively and every input/output is visited at most once, which also handles the recursive graph components.
+    '''
+    marked_ports = set()
+    ports_to_visit = list(ports)
+    while ports_to_visit:
+        port = ports_to_visit.pop()
+        if port in marked_ports:
+            continue
+        marked_ports.add(port)
+        ports_to_visit.extend(upstream_ports.get(port, ()))
+    return marked_ports
+
+
 def clean_up_empty_workflow_structures(workflow: dict):
     templates = workflow['spec']['templates']
     for template in templates:
@@ -363,14 +387,18 @@ def clean_up_empty_workflow_structures(workflow: dict):
                     del task['arguments']
 
 
+_PLACEHOLDER_PATTERN = re.compile('{{([-._a-zA-Z0-9]+)}}')
+_INPUT_PARAMETER_PLACEHOLDER_PATTERN = re.compile('{{inputs.parameters.([-_a-zA-Z0-9]+)}}')
+
+
 def extract_all_placeholders(template: dict) -> Set[str]:
     template_str = json.dumps(template)
-    placeholders = set(re.findall('{{([-._a-zA-Z0-9]+)}}', template_str))
+    placeholders = set(_PLACEHOLDER_PATTERN.findall(template_str))
     return placeholders
 
 
 def extract_input_parameter_name(s: str) -> Optional[str]:
-    match = re.fullmatch('{{inputs.parameters.([-_a-zA-Z0-9]+)}}', s) 
+    match = _INPUT_PARAMETER_PLACEHOLDER_PATTERN.fullmatch(s)
     if not match:
         return None
     (input_name,) = match.groups()
@@ -378,6 +406,6 @@ def extract_input_parameter_name(s: str) -> Optional[str]:
 
 
 def deconstruct_single_placeholder(s: str) -> List[str]:
-    if not re.fullmatch('{{[-._a-zA-Z0-9]+}}', s):
+    if not _PLACEHOLDER_PATTERN.fullmatch(s):
         return None
     return s.lstrip('{').rstrip('}').split('.')
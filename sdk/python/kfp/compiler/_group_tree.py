@@ -0,0 +1,134 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Iterator, List, Text, Tuple
+
+
+class GroupTree(object):
+  """Index of the ancestry of all the groups and ops in a pipeline.
+
+  The tree is built once from the root group. Every node (an opsgroup, an op or
+  a recursive opsgroup reference) is identified by its name and stores its
+  parent, its depth and the jump pointers to its 2^k-th ancestors. Ancestor
+  queries then cost O(log(depth)) instead of comparing the full ancestor lists.
+
+  Recursive opsgroups are leaves of the tree like the ops, since no templates
+  are generated for them and their content belongs to the referenced group.
+  """
+
+  def __init__(self, root_group):
+    self.root = root_group.name
+    self._parent = {root_group.name: None}
+    self._depth = {root_group.name: 0}
+    # _jumps[name][k] is the 2^k-th ancestor of the node.
+    self._jumps = {root_group.name: []}
+
+    # The nodes are visited in pre-order so that the jump pointers of the ancestors
+    # are known before the ones of their descendants.
+    to_visit = [root_group]
+    while to_visit:
+      group = to_visit.pop()
+      for subgroup in group.groups:
+        self._add_node(subgroup.name, group.name)
+        if not subgroup.recursive_ref:
+          to_visit.append(subgroup)
+      for op in group.ops:
+        self._add_node(op.name, group.name)
+
+  def _add_node(self, name, parent):
+    self._parent[name] = parent
+    self._depth[name] = self._depth[parent] + 1
+    jumps = [parent]
+    while len(self._jumps[jumps[-1]]) >= len(jumps):
+      jumps.append(self._jumps[jumps[-1]][len(jumps) - 1])
+    self._jumps[name] = jumps
+
+  def __contains__(self, name):
+    return name in self._parent
+
+  def _check_exists(self, name):
+    if name not in self._parent:
+      raise ValueError(name + ' does not exist.')
+
+  def parent(self, name: Text) -> Text:
+    self._check_exists(name)
+    return self._parent[name]
+
+  def depth(self, name: Text) -> int:
+    self._check_exists(name)
+    return self._depth[name]
+
+  def iter_ancestors(self, name: Text) -> Iterator[Text]:
+    """Yields the node itself and then its ancestors, up to the root group."""
+    self._check_exists(name)
+    while name is not None:
+      yield name
+      name = self._parent[name]
+
+  def ancestors(self, name: Text) -> List[Text]:
+    """Returns the ancestor groups of the node, from the root group down to the node itself."""
+    return list(self.iter_ancestors(name))[::-1]
+
+  def ancestor_at_depth(self, name: Text, depth: int) -> Text:
+    """Returns the ancestor of the node (or the node itself) at the given depth."""
+    self._check_exists(name)
+    if depth < 0 or depth > self._depth[name]:
+      raise ValueError('{} has no ancestor at depth {}.'.format(name, depth))
+    distance = self._depth[name] - depth
+    k = 0
+    while distance:
+      if distance & 1:
+        name = self._jumps[name][k]
+      distance >>= 1
+      k += 1
+    return name
+
+  def lowest_common_ancestor(self, name1: Text, name2: Text) -> Text:
+    depth = min(self.depth(name1), self.depth(name2))
+    name1 = self.ancestor_at_depth(name1, depth)
+    name2 = self.ancestor_at_depth(name2, depth)
+    if name1 == name2:
+      return name1
+    for k in reversed(range(len(self._jumps[name1]))):
+      # Both nodes stay at the same depth, so they always have the same number of jump pointers.
+      if k < len(self._jumps[name1]) and self._jumps[name1][k] != self._jumps[name2][k]:
+        name1 = self._jumps[name1][k]
+        name2 = self._jumps[name2][k]
+    return self._parent[name1]
+
+  def first_uncommon_ancestors(self, name1: Text, name2: Text) -> Tuple[Text, Text]:
+    """Returns the children of the lowest common ancestor that contain each of the nodes.
+
+    Those are the first elements of the lists returned by uncommon_ancestors.
+    """
+    depth = self._depth[self.lowest_common_ancestor(name1, name2)] + 1
+    return (self.ancestor_at_depth(name1, depth), self.ancestor_at_depth(name2, depth))
+
+  def uncommon_ancestors(self, name1: Text, name2: Text) -> Tuple[List[Text], List[Text]]:
+    """Returns the unique ancestors of two nodes.
+
+    For example, if the ancestors of op1 are [root, G1, G2, G3, op1] and the
+    ancestors of op2 are [root, G1, G4, op2], then it returns a tuple
+    ([G2, G3, op1], [G4, op2]).
+    """
+    lca_depth = self._depth[self.lowest_common_ancestor(name1, name2)]
+
+    def _path_below_lca(name):
+      path = []
+      for _ in range(self._depth[name] - lca_depth):
+        path.append(name)
+        name = self._parent[name]
+      return path[::-1]
+
+    return (_path_below_lca(name1), _path_below_lca(name2))
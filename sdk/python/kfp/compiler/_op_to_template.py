@@ -27,64 +27,78 @@ from ..dsl._artifact_location import ArtifactLocation
 T = TypeVar('T')
 
 
+# Matches the serialized PipelineParams, e.g. '{{pipelineparam:op=op1;name=param1}}'.
+# It is the same pattern as the one used by dsl.match_serialized_pipelineparam.
+_SERIALIZED_PIPELINEPARAM_PATTERN = re.compile(r'{{pipelineparam:op=[\w\s_-]*;name=[\w\s_-]+}}')
+
+
 def _process_obj(obj: Any, map_to_tmpl_var: dict):
     """Recursively sanitize and replace any PipelineParam (instances and serialized strings)
     in the object with the corresponding template variables
     (i.e. '{{inputs.parameters.<PipelineParam.full_name>}}').
-    
+
+    The k8s objects are converted to their JSON representation in the same pass.
+    They are not modified.
+
     Args:
       obj: any obj that may have PipelineParam
       map_to_tmpl_var: a dict that maps an unsanitized pipeline
                        params signature into a template var
     """
-    # serialized str might be unsanitized
-    if isinstance(obj, str):
-        # get signature
-        param_tuples = dsl.match_serialized_pipelineparam(obj)
-        if not param_tuples:
-            return obj
-        # replace all unsanitized signature with template var
-        for param_tuple in param_tuples:
-            obj = re.sub(param_tuple.pattern, map_to_tmpl_var[param_tuple.pattern], obj)
-
-    # list
-    if isinstance(obj, list):
-        return [_process_obj(item, map_to_tmpl_var) for item in obj]
-
-    # tuple
-    if isinstance(obj, tuple):
-        return tuple((_process_obj(item, map_to_tmpl_var) for item in obj))
-
-    # dict
-    if isinstance(obj, dict):
-        return {
-            key: _process_obj(value, map_to_tmpl_var)
-            for key, value in obj.items()
-        }
-
-    # pipelineparam
-    if isinstance(obj, dsl.PipelineParam):
-        # if not found in unsanitized map, then likely to be sanitized
-        return map_to_tmpl_var.get(str(obj), '{{inputs.parameters.%s}}' % obj.full_name)
-
-    # k8s objects (generated from swaggercodegen)
-    if hasattr(obj, 'swagger_types') and isinstance(obj.swagger_types, dict):
-        # process everything inside recursively
-        for key in obj.swagger_types.keys():
-            setattr(obj, key, _process_obj(getattr(obj, key), map_to_tmpl_var))
-        # return json representation of the k8s obj
-        return convert_k8s_obj_to_json(obj)
-
-    # k8s objects (generated from openapi)
-    if hasattr(obj, 'openapi_types') and isinstance(obj.openapi_types, dict):
-        # process everything inside recursively
-        for key in obj.openapi_types.keys():
-            setattr(obj, key, _process_obj(getattr(obj, key), map_to_tmpl_var))
-        # return json representation of the k8s obj
-        return convert_k8s_obj_to_json(obj)
+    replace_match = lambda match: map_to_tmpl_var[match.group(0)]
+
+    def _process(obj, inside_k8s_obj):
+        # serialized str might be unsanitized
+        if isinstance(obj, str):
+            if '{{pipelineparam:' not in obj:
+                return obj
+            # replace all unsanitized signatures with template vars in one pass
+            return _SERIALIZED_PIPELINEPARAM_PATTERN.sub(replace_match, obj)
+
+        # list
+        if isinstance(obj, list):
+            return [_process(item, inside_k8s_obj) for item in obj]
+
+        # tuple
+        if isinstance(obj, tuple):
+            return tuple((_process(item, inside_k8s_obj) for item in obj))
+
+        # dict
+        if isinstance(obj, dict):
+            return {
+                key: _process(value, inside_k8s_obj)
+                for key, value in obj.items()
+            }
 
-    # do nothing
-    return obj
+        # pipelineparam
+        if isinstance(obj, dsl.PipelineParam):
+            # if not found in unsanitized map, then likely to be sanitized
+            return map_to_tmpl_var.get(str(obj), '{{inputs.parameters.%s}}' % obj.full_name)
+
+        # k8s objects (generated from swaggercodegen or openapi)
+        if hasattr(obj, 'swagger_types') and isinstance(obj.swagger_types, dict):
+            attr_types = obj.swagger_types
+        elif hasattr(obj, 'openapi_types') and isinstance(obj.openapi_types, dict):
+            attr_types = obj.openapi_types
+        else:
+            attr_types = None
+        if attr_types is not None:
+            # process everything inside recursively and return the json representation of the k8s obj
+            obj_dict = {}
+            for attr in attr_types.keys():
+                value = getattr(obj, attr)
+                if value is not None:
+                    obj_dict[obj.attribute_map[attr]] = _process(value, True)
+            return obj_dict
+
+        # the other values inside k8s objects (e.g. dates) are serialized
+        if inside_k8s_obj:
+            return convert_k8s_obj_to_json(obj)
+
+        # do nothing
+        return obj
+
+    return _process(obj, False)
 
 
 def _process_base_ops(op: BaseOp):
@@ -112,7 +126,7 @@ def _process_base_ops(op: BaseOp):
 
     # process all attr with pipelineParams except inputs and outputs parameters
     for key in op.attrs_with_pipelineparams:
-        setattr(op, key, _process_obj(getattr(op, key), map_to_tmpl_var))
+        setattr(op, key, _process_obj(op._get_attr_value(key), map_to_tmpl_var))
 
     return op
 
@@ -189,7 +203,7 @@ def _op_to_template(op: BaseOp):
 
     if isinstance(op, dsl.ContainerOp):
         # default output artifacts
-        output_artifact_paths = OrderedDict(op.output_artifact_paths)
+        output_artifact_paths = OrderedDict(op._get_attr_value('output_artifact_paths') or {})
         # This should have been as easy as output_artifact_paths.update(op.file_outputs), but the _outputs_to_json function changes the output names and we must do the same here, so that the names are the same
         output_artifact_paths.update(sorted(((param.full_name, processed_op.file_outputs[param.name]) for param in processed_op.outputs.values()), key=lambda x: x[0]))
 
@@ -206,9 +220,8 @@ def _op_to_template(op: BaseOp):
         # workflow template
         template = {
             'name': processed_op.name,
-            'container': convert_k8s_obj_to_json(
-                processed_op.container
-            )
+            # the container has already been converted to json by _process_base_ops
+            'container': processed_op.container
         }
     elif isinstance(op, dsl.ResourceOp):
         # no output artifacts
@@ -227,8 +240,8 @@ def _op_to_template(op: BaseOp):
         }
 
     # inputs
-    input_artifact_paths = processed_op.input_artifact_paths if isinstance(processed_op, dsl.ContainerOp) else None
-    artifact_arguments = processed_op.artifact_arguments if isinstance(processed_op, dsl.ContainerOp) else None
+    input_artifact_paths = processed_op._get_attr_value('input_artifact_paths') if isinstance(processed_op, dsl.ContainerOp) else None
+    artifact_arguments = processed_op._get_attr_value('artifact_arguments') if isinstance(processed_op, dsl.ContainerOp) else None
     inputs = _inputs_to_json(processed_op.inputs, input_artifact_paths, artifact_arguments)
     if inputs:
         template['inputs'] = inputs
@@ -242,25 +255,35 @@ def _op_to_template(op: BaseOp):
     if outputs_dict:
         template['outputs'] = outputs_dict
 
+    # The optional collections are read without creating the ones that were never set.
+    node_selector = processed_op._get_attr_value('node_selector')
+    tolerations = processed_op._get_attr_value('tolerations')
+    affinity = processed_op._get_attr_value('affinity')
+    pod_annotations = processed_op._get_attr_value('pod_annotations')
+    pod_labels = processed_op._get_attr_value('pod_labels')
+    init_containers = processed_op._get_attr_value('init_containers')
+    sidecars = processed_op._get_attr_value('sidecars')
+    volumes = processed_op._get_attr_value('volumes')
+
     # node selector
-    if processed_op.node_selector:
-        template['nodeSelector'] = processed_op.node_selector
+    if node_selector:
+        template['nodeSelector'] = node_selector
 
     # tolerations
-    if processed_op.tolerations:
-        template['tolerations'] = processed_op.tolerations
+    if tolerations:
+        template['tolerations'] = tolerations
 
     # affinity
-    if processed_op.affinity:
-        template['affinity'] = convert_k8s_obj_to_json(processed_op.affinity)
+    if affinity:
+        template['affinity'] = convert_k8s_obj_to_json(affinity)
 
     # metadata
-    if processed_op.pod_annotations or processed_op.pod_labels:
+    if pod_annotations or pod_labels:
         template['metadata'] = {}
-        if processed_op.pod_annotations:
-            template['metadata']['annotations'] = processed_op.pod_annotations
-        if processed_op.pod_labels:
-            template['metadata']['labels'] = processed_op.pod_labels
+        if pod_annotations:
+            template['metadata']['annotations'] = pod_annotations
+        if pod_labels:
+            template['metadata']['labels'] = pod_labels
     # retries
     if processed_op.num_retries:
         template['retryStrategy'] = {'limit': processed_op.num_retries}
@@ -270,16 +293,16 @@ def _op_to_template(op: BaseOp):
         template['activeDeadlineSeconds'] = processed_op.timeout
 
     # initContainers
-    if processed_op.init_containers:
-        template['initContainers'] = processed_op.init_containers
+    if init_containers:
+        template['initContainers'] = init_containers
 
     # sidecars
-    if processed_op.sidecars:
-        template['sidecars'] = processed_op.sidecars
+    if sidecars:
+        template['sidecars'] = sidecars
 
     # volumes
-    if processed_op.volumes:
-        template['volumes'] = [convert_k8s_obj_to_json(volume) for volume in processed_op.volumes]
+    if volumes:
+        template['volumes'] = [convert_k8s_obj_to_json(volume) for volume in volumes]
         template['volumes'].sort(key=lambda x: x['name'])
 
     # Display name
@@ -0,0 +1,173 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import json
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Text
+
+
+class _NullContext(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_CONTEXT = _NullContext()
+
+
+class _NullProfiler(object):
+    '''The profiler used by the compiler when profiling is not requested. It records nothing.'''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def phase(self, name: Text):
+        return _NULL_CONTEXT
+
+    def op(self, op_name: Text, phase: Text):
+        return _NULL_CONTEXT
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+class _Measurement(object):
+    '''Adds the measurements of the code run in the context to the measurements dict.'''
+
+    def __init__(self, profiler, measurements: dict, count_objects: bool):
+        self._profiler = profiler
+        self._measurements = measurements
+        self._count_objects = count_objects
+
+    def __enter__(self):
+        self._start_objects = self._profiler._object_count() if self._count_objects else 0
+        self._start_memory = self._profiler._traced_memory()
+        self._start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        wall_time = time.perf_counter() - self._start_time
+        measurements = self._measurements
+        measurements['calls'] = measurements.get('calls', 0) + 1
+        measurements['wall_time'] = measurements.get('wall_time', 0) + wall_time
+        if self._profiler.trace_memory:
+            memory_allocated = self._profiler._traced_memory() - self._start_memory
+            measurements['memory_allocated'] = measurements.get('memory_allocated', 0) + memory_allocated
+        if self._count_objects:
+            objects_created = self._profiler._object_count() - self._start_objects
+            measurements['objects_created'] = measurements.get('objects_created', 0) + objects_created
+
+
+class CompileProfiler(object):
+    '''Records the wall time, the allocated memory and the created objects of every compilation phase and of every op.
+
+    Pass an instance to Compiler.compile and read the report after the compilation::
+
+        profiler = CompileProfiler()
+        Compiler().compile(my_pipeline, 'my_pipeline.yaml', profile=profiler)
+        print(profiler.to_json())
+
+    The phases are recorded in the order they start. Some phases contain other phases, for example
+    create_dag_templates contains op_transformers and op_to_template.
+    A phase that runs several times accumulates its measurements and counts its calls.
+    The per-op measurements only contain the wall time and the allocated memory, since counting the
+    objects for every op would take longer than compiling the op.
+
+    The allocated memory is the net size of the memory blocks allocated by a phase that are still alive when it ends.
+    The created objects are the net number of objects tracked by the garbage collector.
+    The memory is measured with tracemalloc, which slows the compilation down.
+    Use trace_memory=False to only measure the wall time and the object counts.
+    The profiler can be reused: the measurements are reset every time a compilation starts.
+
+    Args:
+        trace_memory: Whether to record the memory allocated by every phase and op.
+        count_objects: Whether to record the number of objects created by every phase.
+    '''
+
+    def __init__(self, trace_memory: bool = True, count_objects: bool = True):
+        self.trace_memory = trace_memory
+        self.count_objects = count_objects
+        self.total = OrderedDict()
+        self.phases = OrderedDict()
+        self.ops = OrderedDict()
+        self._started_tracemalloc = False
+        self._total_start = None
+
+    def _traced_memory(self) -> int:
+        if not self.trace_memory:
+            return 0
+        return tracemalloc.get_traced_memory()[0]
+
+    def _object_count(self) -> int:
+        if not self.count_objects:
+            return 0
+        return len(gc.get_objects())
+
+    def __enter__(self):
+        self.total.clear()
+        self.phases.clear()
+        self.ops.clear()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._total_start = (time.perf_counter(), self._traced_memory(), self._object_count())
+        return self
+
+    def __exit__(self, *args):
+        start_time, start_memory, start_objects = self._total_start
+        self.total['wall_time'] = time.perf_counter() - start_time
+        if self.trace_memory:
+            current_memory, peak_memory = tracemalloc.get_traced_memory()
+            self.total['memory_allocated'] = current_memory - start_memory
+            self.total['peak_memory'] = peak_memory
+        if self.count_objects:
+            self.total['objects_created'] = self._object_count() - start_objects
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def phase(self, name: Text):
+        '''Returns a context manager that measures a compilation phase.'''
+        # The phase is added when it starts so that the phases are listed in their start order.
+        return _Measurement(self, self.phases.setdefault(name, OrderedDict()), self.count_objects)
+
+    def op(self, op_name: Text, phase: Text):
+        '''Returns a context manager that measures the processing of one op during a compilation phase.'''
+        measurements = self.ops.setdefault(op_name, OrderedDict()).setdefault(phase, OrderedDict())
+        return _Measurement(self, measurements, False)
+
+    def to_dict(self):
+        '''Returns the report. The times are in seconds and the memory sizes in bytes.'''
+        return OrderedDict([
+            ('total', self.total),
+            ('phases', self.phases),
+            ('ops', self.ops),
+        ])
+
+    def to_json(self, indent: int = 2) -> Text:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def write(self, path: Text):
+        '''Writes the JSON report to a file.'''
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+            f.write('\n')
@@ -0,0 +1,87 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+from typing import Dict
+
+
+def deduplicate_templates(workflow: dict) -> dict:
+    '''deduplicate_templates replaces the templates that only differ by their name with a single shared template.
+
+    Args:
+        workflow: The workflow to deduplicate
+    Returns:
+        The deduplicated workflow
+
+    Every template except the entrypoint is identified by the hash of its content without its name.
+    The first template (in the template order) with a given hash is kept and the DAG tasks and the exit handler that use the other templates with the same hash are pointed to it.
+    Deduplicating some templates can make the DAG templates that use them identical, so the deduplication is repeated until no more templates can be removed.
+
+    The input workflow is not modified. Only the template list and the DAG tasks are copied.
+    '''
+    workflow = dict(workflow)
+    workflow_spec = workflow['spec'] = dict(workflow['spec'])
+    templates = workflow_spec['templates'] = [_copy_dag_tasks(template) for template in workflow_spec['templates']]
+    entrypoint_template_name = workflow_spec['entrypoint']
+
+    size_before = workflow_size(workflow)
+    template_count_before = len(templates)
+    while True:
+        template_name_to_shared_template_name = {}
+        hash_to_shared_template_name = {}
+        for template in templates:
+            if template['name'] == entrypoint_template_name:
+                continue
+            template_hash = template_content_hash(template)
+            shared_template_name = hash_to_shared_template_name.setdefault(template_hash, template['name'])
+            if shared_template_name != template['name']:
+                template_name_to_shared_template_name[template['name']] = shared_template_name
+        if not template_name_to_shared_template_name:
+            break
+
+        templates = [template for template in templates if template['name'] not in template_name_to_shared_template_name]
+        for template in templates:
+            for task in template.get('dag', {}).get('tasks', []):
+                task['template'] = template_name_to_shared_template_name.get(task['template'], task['template'])
+        if 'onExit' in workflow_spec:
+            workflow_spec['onExit'] = template_name_to_shared_template_name.get(workflow_spec['onExit'], workflow_spec['onExit'])
+    workflow_spec['templates'] = templates
+
+    logging.info('Template deduplication reduced the workflow from {} templates ({} bytes) to {} templates ({} bytes).'.format(
+        template_count_before, size_before, len(templates), workflow_size(workflow)))
+    return workflow
+
+
+def template_content_hash(template: dict) -> str:
+    '''Returns the hash of the normalized content of the template, without its name.'''
+    template_without_name = {key: value for key, value in template.items() if key != 'name'}
+    normalized_template = json.dumps(template_without_name, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(normalized_template.encode('utf-8')).hexdigest()
+
+
+def workflow_size(workflow: dict) -> int:
+    '''Returns the size in bytes of the compact JSON representation of the workflow.'''
+    return len(json.dumps(workflow, separators=(',', ':')).encode('utf-8'))
+
+
+def _copy_dag_tasks(template: dict) -> Dict:
+    if 'dag' not in template:
+        return template
+    template = dict(template)
+    dag = template['dag'] = dict(template['dag'])
+    if 'tasks' in dag:
+        dag['tasks'] = [dict(task) for task in dag['tasks']]
+    return template
@@ -0,0 +1,186 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+import warnings
+from collections import OrderedDict
+from typing import Callable, Dict
+
+from ._k8s_helper import convert_k8s_obj_to_json
+from ..dsl._artifact_location import ArtifactLocation
+
+# The default maximum size of a request to etcd. Bigger workflows are rejected by the cluster.
+MAX_WORKFLOW_SIZE = 1536 * 1024
+
+# The bucket key prefix of the raw artifact data moved to the artifact location.
+OFFLOADED_DATA_KEY_PREFIX = 'kfp-offloaded-data/'
+
+
+def _json_size(obj) -> int:
+    return len(json.dumps(obj, separators=(',', ':')).encode('utf-8'))
+
+
+class WorkflowSizeReport(object):
+    '''The size of a workflow and of its biggest parts.
+
+    All the sizes are in bytes of compact JSON, which is how the workflow is sent to and stored by the Kubernetes API server.
+
+    Attributes:
+        total: The size of the whole workflow.
+        templates: Template name -> size of the template.
+        annotations: Annotation name -> size of the annotation value. The template annotation names are prefixed by the template name.
+        arguments: Argument name -> size of the argument value. The workflow arguments are prefixed by "workflow" and the DAG task arguments by the DAG template and task names.
+    '''
+
+    def __init__(self, total: int, templates: Dict[str, int], annotations: Dict[str, int], arguments: Dict[str, int]):
+        self.total = total
+        self.templates = templates
+        self.annotations = annotations
+        self.arguments = arguments
+
+    def to_dict(self):
+        return OrderedDict([
+            ('total', self.total),
+            ('templates', self.templates),
+            ('annotations', self.annotations),
+            ('arguments', self.arguments),
+        ])
+
+    def format(self, max_items: int = 5) -> str:
+        '''Returns a human-readable summary listing the biggest templates, annotations and arguments.'''
+        lines = ['Workflow size: {} bytes.'.format(self.total)]
+        for category, sizes in [('templates', self.templates), ('annotations', self.annotations), ('arguments', self.arguments)]:
+            biggest = sorted(sizes.items(), key=lambda item: item[1], reverse=True)[:max_items]
+            if biggest:
+                lines.append('Biggest {}:'.format(category))
+                lines.extend('  {}: {} bytes'.format(name, size) for name, size in biggest)
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.format()
+
+
+def _add_argument_sizes(arguments: dict, prefix: str, argument_sizes: Dict[str, int]):
+    for parameter in arguments.get('parameters', []):
+        argument_sizes[prefix + parameter['name']] = _json_size(parameter.get('value', ''))
+    for artifact in arguments.get('artifacts', []):
+        argument_sizes[prefix + artifact['name']] = _json_size(artifact)
+
+
+def analyze_workflow_size(workflow: dict) -> WorkflowSizeReport:
+    '''Computes the size of the workflow, of every template, annotation and argument.'''
+    workflow_spec = workflow['spec']
+    template_sizes = OrderedDict()
+    annotation_sizes = OrderedDict()
+    argument_sizes = OrderedDict()
+
+    for name, value in workflow.get('metadata', {}).get('annotations', {}).items():
+        annotation_sizes[name] = _json_size(value)
+    _add_argument_sizes(workflow_spec.get('arguments', {}), 'workflow/', argument_sizes)
+
+    for template in workflow_spec['templates']:
+        template_name = template['name']
+        template_sizes[template_name] = _json_size(template)
+        for name, value in template.get('metadata', {}).get('annotations', {}).items():
+            annotation_sizes[template_name + '/' + name] = _json_size(value)
+        for task in template.get('dag', {}).get('tasks', []):
+            _add_argument_sizes(task.get('arguments', {}), template_name + '/' + task['name'] + '/', argument_sizes)
+
+    return WorkflowSizeReport(_json_size(workflow), template_sizes, annotation_sizes, argument_sizes)
+
+
+def check_workflow_size(workflow: dict, max_size: int = MAX_WORKFLOW_SIZE, json_size: int = None, yaml_size: int = None):
+    '''Logs the size report of the workflow and warns when the workflow is too big to be submitted.
+
+    The callers that already serialized the workflow pass its size, so that it is not serialized again just to be measured.
+
+    Args:
+        workflow: The workflow to check.
+        max_size: The maximum size in bytes of the compact JSON of the workflow.
+        json_size: Optional. The size of the compact JSON of the workflow.
+        yaml_size: Optional. The size of the YAML of the workflow. The compact JSON of a workflow is at most about twice as big
+            (for strings full of quotes), so the workflow is only measured when it is not far below the limit.
+    '''
+    report_enabled = logging.getLogger().isEnabledFor(logging.INFO)
+    if not report_enabled and json_size is None and yaml_size is not None and yaml_size * 2 <= max_size:
+        return
+    total = json_size if json_size is not None else _json_size(workflow)
+    too_big = total > max_size
+    if not too_big and not report_enabled:
+        return
+    report = analyze_workflow_size(workflow)
+    logging.info(report.format())
+    if too_big:
+        warnings.warn(
+            'The compiled workflow is {} bytes, which exceeds the {} bytes that the cluster accepts. '
+            'Consider moving the big inline data to an artifact location (PipelineConf.set_data_offloading).\n{}'.format(
+                total, max_size, report.format()))
+
+
+def offload_large_raw_artifacts(
+    workflow: dict,
+    artifact_location,
+    size_threshold: int,
+    upload_func: Callable[[str, str], None],
+) -> dict:
+    '''Moves the raw artifact data bigger than size_threshold bytes to the artifact location.
+
+    The raw data of the template input artifacts, the DAG task artifact arguments and the workflow artifact arguments is uploaded with upload_func(key, data) and the artifacts are changed to reference the S3 key instead.
+    The keys are derived from the hash of the data, so identical data is only uploaded once.
+    Data that contains "{{" is left inline since it can contain placeholders that Argo replaces at runtime.
+
+    The workflow is modified in place.
+
+    Args:
+        workflow: The workflow to modify.
+        artifact_location: The V1alpha1ArtifactLocation (or its dict representation) of the bucket where the data is uploaded.
+        size_threshold: The size in bytes above which the raw data is moved.
+        upload_func: A function that uploads the data (str) to the given key of the artifact location bucket.
+    Returns:
+        The modified workflow.
+    '''
+    if not artifact_location:
+        raise ValueError('Offloading the raw artifact data requires an artifact location. Please use PipelineConf.set_artifact_location.')
+    uploaded_keys = set()
+
+    def _offload_artifact(artifact: dict) -> dict:
+        data = artifact.get('raw', {}).get('data')
+        if data is None or '{{' in data:
+            return artifact
+        encoded_data = data.encode('utf-8')
+        if len(encoded_data) <= size_threshold:
+            return artifact
+        key = OFFLOADED_DATA_KEY_PREFIX + hashlib.sha256(encoded_data).hexdigest()
+        if key not in uploaded_keys:
+            upload_func(key, data)
+            uploaded_keys.add(key)
+        s3_artifact = convert_k8s_obj_to_json(ArtifactLocation.create_artifact_for_s3(
+            artifact_location, name=artifact['name'], path=artifact.get('path'), key=key))
+        offloaded_artifact = {field: value for field, value in artifact.items() if field != 'raw'}
+        offloaded_artifact['s3'] = s3_artifact['s3']
+        return offloaded_artifact
+
+    def _offload_artifacts(parent: dict):
+        if parent.get('artifacts'):
+            parent['artifacts'] = [_offload_artifact(artifact) for artifact in parent['artifacts']]
+
+    workflow_spec = workflow['spec']
+    _offload_artifacts(workflow_spec.get('arguments', {}))
+    for template in workflow_spec['templates']:
+        _offload_artifacts(template.get('inputs', {}))
+        for task in template.get('dag', {}).get('tasks', []):
+            _offload_artifacts(task.get('arguments', {}))
+    return workflow
@@ -0,0 +1,172 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import json
+import os
+import sys
+import tarfile
+import tempfile
+import zipfile
+from typing import Any, Dict, Text
+
+import yaml
+
+from ._workflow_size import check_workflow_size
+
+# libyaml is an optional dependency of PyYAML. Its emitter is several times faster than the pure-Python one.
+_BaseDumper = getattr(yaml, 'CDumper', yaml.Dumper)
+
+PACKAGE_FORMATS = ['.tar.gz', '.tgz', '.zip', '.yaml', '.yml', '.json']
+
+# The name of the workflow file inside the .tar.gz and .zip packages.
+_PACKAGED_WORKFLOW_FILE_NAME = 'pipeline.yaml'
+
+_UNRESOLVED_PIPELINEPARAM_MARKER = '{{pipelineparam'
+
+
+def _raise_unresolved_pipelineparam_error():
+    raise RuntimeError(
+        'Internal compiler error: Found unresolved PipelineParam. '
+        'Please create a new issue at https://github.com/kubeflow/pipelines/issues '
+        'attaching the pipeline code and the pipeline package.')
+
+
+class _WorkflowDumper(_BaseDumper):
+    '''Dumps the workflows in block style with all the strings in the literal style.
+
+    The workflow dicts share some of their objects, which must be written in full instead of as YAML aliases.
+    Only the strings are written in the literal style (other scalars keep their plain style), so that the C and the pure-Python emitters produce the same documents.
+    The strings are checked for unresolved PipelineParam placeholders while they are serialized.
+    '''
+
+    def ignore_aliases(self, data):
+        return True
+
+
+def _represent_str(dumper, data):
+    if _UNRESOLVED_PIPELINEPARAM_MARKER in data:
+        _raise_unresolved_pipelineparam_error()
+    return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
+
+
+_WorkflowDumper.add_representer(str, _represent_str)
+
+
+def dump_yaml(workflow: Dict[Text, Any], stream=None):
+    '''Serializes the workflow to YAML and writes it to the text stream.
+
+    Returns:
+        The YAML text if stream is None.
+    Raises:
+        RuntimeError: The workflow contains an unresolved PipelineParam placeholder.
+    '''
+    return yaml.dump(workflow, stream, Dumper=_WorkflowDumper, default_flow_style=False)
+
+
+def dump_json(workflow: Dict[Text, Any]) -> Text:
+    '''Serializes the workflow to compact JSON.
+
+    Raises:
+        RuntimeError: The workflow contains an unresolved PipelineParam placeholder.
+    '''
+    json_text = json.dumps(workflow, separators=(',', ':'))
+    if _UNRESOLVED_PIPELINEPARAM_MARKER in json_text:
+        _raise_unresolved_pipelineparam_error()
+    return json_text
+
+
+# The package writers return the size of the YAML they wrote.
+
+
+def _write_tar_package(workflow, package_path):
+    # The size of a tar member is written before its content, so the YAML is streamed to a temporary file first.
+    with tempfile.TemporaryFile() as yaml_file:
+        yaml_text_file = io.TextIOWrapper(yaml_file, encoding='utf-8')
+        dump_yaml(workflow, yaml_text_file)
+        yaml_text_file.flush()
+        yaml_text_file.detach()
+        tarinfo = tarfile.TarInfo(_PACKAGED_WORKFLOW_FILE_NAME)
+        tarinfo.size = yaml_file.tell()
+        yaml_file.seek(0)
+        with tarfile.open(package_path, 'w:gz') as tar:
+            tar.addfile(tarinfo, fileobj=yaml_file)
+    return tarinfo.size
+
+
+def _write_zip_package(workflow, package_path):
+    with zipfile.ZipFile(package_path, 'w') as zip:
+        zipinfo = zipfile.ZipInfo(_PACKAGED_WORKFLOW_FILE_NAME)
+        zipinfo.compress_type = zipfile.ZIP_DEFLATED
+        if sys.version_info < (3, 6):
+            # ZipFile.open does not support writing before Python 3.6.
+            yaml_data = dump_yaml(workflow).encode('utf-8')
+            zip.writestr(zipinfo, yaml_data)
+            return len(yaml_data)
+        with zip.open(zipinfo, 'w') as yaml_file:
+            with io.TextIOWrapper(yaml_file, encoding='utf-8') as yaml_text_file:
+                dump_yaml(workflow, yaml_text_file)
+    return zipinfo.file_size
+
+
+def write_workflow(workflow: Dict[Text, Any], package_path: Text = None):
+    '''Serializes the workflow and writes it in the format given by the extension of package_path.
+
+    The YAML is streamed to the file or to the package member instead of being built in memory.
+    The size of the serialized workflow is then checked with check_workflow_size, without serializing it again when it is far below the limit.
+
+    Args:
+        workflow: The workflow to write.
+        package_path: The path of the output file. One of PACKAGE_FORMATS.
+            If not specified, the YAML text is returned.
+    Raises:
+        ValueError: The package_path extension is not supported.
+        RuntimeError: The workflow contains an unresolved PipelineParam placeholder. No output file is left behind.
+    '''
+    if package_path is None:
+        yaml_text = dump_yaml(workflow)
+        check_workflow_size(workflow, yaml_size=len(yaml_text.encode('utf-8')))
+        return yaml_text
+
+    if package_path.endswith('.json'):
+        # The workflow is serialized before the output file is opened.
+        json_text = dump_json(workflow)
+        with open(package_path, 'w') as json_file:
+            json_file.write(json_text)
+        check_workflow_size(workflow, json_size=len(json_text))
+        return
+
+    if package_path.endswith('.tar.gz') or package_path.endswith('.tgz'):
+        write_package = _write_tar_package
+    elif package_path.endswith('.zip'):
+        write_package = _write_zip_package
+    elif package_path.endswith('.yaml') or package_path.endswith('.yml'):
+        def write_package(workflow, package_path):
+            with open(package_path, 'w') as yaml_file:
+                dump_yaml(workflow, yaml_file)
+            return os.path.getsize(package_path)
+    else:
+        raise ValueError(
+            'The output path ' + package_path +
+            ' should ends with one of the following formats: '
+            '[' + ', '.join(PACKAGE_FORMATS) + ']')
+
+    try:
+        yaml_size = write_package(workflow, package_path)
+    except Exception:
+        # Do not leave a truncated package behind.
+        if os.path.exists(package_path):
+            os.remove(package_path)
+        raise
+    check_workflow_size(workflow, yaml_size=yaml_size)
@@ -12,20 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import json
-from collections import defaultdict
+from collections import defaultdict, deque
 from deprecated import deprecated
 import inspect
-import tarfile
 import uuid
-import zipfile
 from typing import Callable, Set, List, Text, Dict, Tuple, Any, Union, Optional
 
-import yaml
 from kfp.dsl import _for_loop
 
 from .. import dsl
 from ._k8s_helper import convert_k8s_obj_to_json, sanitize_k8s_name
+from ._group_tree import GroupTree
 from ._op_to_template import _op_to_template
+from ._compile_cache import CompileCache, _ComponentLoadRecorder, compute_cache_key
+from ._profiler import CompileProfiler, NULL_PROFILER
 from ._default_transformers import add_pod_env
 
 from ..components.structures import InputSpec
@@ -49,6 +49,9 @@ class Compiler(object):
   ```
   """
 
+  # The profiler of the ongoing compilation. See compile(profile=...).
+  _profiler = NULL_PROFILER
+
   def _pipelineparam_full_name(self, param):
     """_pipelineparam_full_name converts the names of pipeline parameters
       to unique names in the argo yaml
@@ -60,65 +63,6 @@ class Compiler(object):
       return param.op_name + '-' + param.name
     return param.name
 
-  def _get_groups_for_ops(self, root_group):
-    """Helper function to get belonging groups for each op.
-
-    Each pipeline has a root group. Each group has a list of operators (leaf) and groups.
-    This function traverse the tree and get all ancestor groups for all operators.
-
-    Returns:
-      A dict. Key is the operator's name. Value is a list of ancestor groups including the
-              op itself. The list of a given operator is sorted in a way that the farthest
-              group is the first and operator itself is the last.
-    """
-    def _get_op_groups_helper(current_groups, ops_to_groups):
-      root_group = current_groups[-1]
-      for g in root_group.groups:
-        # Add recursive opsgroup in the ops_to_groups
-        # such that the i/o dependency can be propagated to the ancester opsgroups
-        if g.recursive_ref:
-          ops_to_groups[g.name] = [x.name for x in current_groups] + [g.name]
-          continue
-        current_groups.append(g)
-        _get_op_groups_helper(current_groups, ops_to_groups)
-        del current_groups[-1]
-      for op in root_group.ops:
-        ops_to_groups[op.name] = [x.name for x in current_groups] + [op.name]
-
-    ops_to_groups = {}
-    current_groups = [root_group]
-    _get_op_groups_helper(current_groups, ops_to_groups)
-    return ops_to_groups
-
-  #TODO: combine with the _get_groups_for_ops
-  def _get_groups_for_opsgroups(self, root_group):
-    """Helper function to get belonging groups for each opsgroup.
-
-    Each pipeline has a root group. Each group has a list of operators (leaf) and groups.
-    This function traverse the tree and get all ancestor groups for all opsgroups.
-
-    Returns:
-      A dict. Key is the opsgroup's name. Value is a list of ancestor groups including the
-              opsgroup itself. The list of a given opsgroup is sorted in a way that the farthest
-              group is the first and opsgroup itself is the last.
-    """
-    def _get_opsgroup_groups_helper(current_groups, opsgroups_to_groups):
-      root_group = current_groups[-1]
-      for g in root_group.groups:
-        # Add recursive opsgroup in the ops_to_groups
-        # such that the i/o dependency can be propagated to the ancester opsgroups
-        if g.recursive_ref:
-          continue
-        opsgroups_to_groups[g.name] = [x.name for x in current_groups] + [g.name]
-        current_groups.append(g)
-        _get_opsgroup_groups_helper(current_groups, opsgroups_to_groups)
-        del current_groups[-1]
-
-    opsgroups_to_groups = {}
-    current_groups = [root_group]
-    _get_opsgroup_groups_helper(current_groups, opsgroups_to_groups)
-    return opsgroups_to_groups
-
   def _get_groups(self, root_group):
     """Helper function to get all groups (not including ops) in a pipeline."""
 
@@ -133,32 +77,13 @@ class Compiler(object):
 
     return _get_groups_helper(root_group)
 
-  def _get_uncommon_ancestors(self, op_groups, opsgroup_groups, op1, op2):
+  def _get_uncommon_ancestors(self, group_tree, op1, op2):
     """Helper function to get unique ancestors between two ops.
 
     For example, op1's ancestor groups are [root, G1, G2, G3, op1], op2's ancestor groups are
     [root, G1, G4, op2], then it returns a tuple ([G2, G3, op1], [G4, op2]).
     """
-    #TODO: extract a function for the following two code module
-    if op1.name in op_groups:
-      op1_groups = op_groups[op1.name]
-    elif op1.name in opsgroup_groups:
-      op1_groups = opsgroup_groups[op1.name]
-    else:
-      raise ValueError(op1.name + ' does not exist.')
-
-    if op2.name in op_groups:
-      op2_groups = op_groups[op2.name]
-    elif op2.name in opsgroup_groups:
-      op2_groups = opsgroup_groups[op2.name]
-    else:
-      raise ValueError(op1.name + ' does not exist.')
-
-    both_groups = [op1_groups, op2_groups]
-    common_groups_len = sum(1 for x in zip(*both_groups) if x==(x[0],)*len(x))
-    group1 = op1_groups[common_groups_len:]
-    group2 = op2_groups[common_groups_len:]
-    return (group1, group2)
+    return group_tree.uncommon_ancestors(op1.name, op2.name)
 
   def _get_condition_params_for_ops(self, root_group):
     """Get parameters referenced in conditions of ops."""
@@ -186,18 +111,17 @@ class Compiler(object):
     _get_condition_params_for_ops_helper(root_group, [])
     return conditions
 
-  def _get_next_group_or_op(cls, to_visit: List, already_visited: Set):
+  def _get_next_group_or_op(cls, to_visit: deque, already_visited: Set):
     """Get next group or op to visit."""
-    if len(to_visit) == 0:
-      return None
-    next = to_visit.pop(0)
-    while next in already_visited:
-      next = to_visit.pop(0)
-    already_visited.add(next)
-    return next
+    while to_visit:
+      next = to_visit.popleft()
+      if next not in already_visited:
+        already_visited.add(next)
+        return next
+    return None
 
   def _get_for_loop_ops(self, new_root) -> Dict[Text, dsl.ParallelFor]:
-    to_visit = self._get_all_subgroups_and_ops(new_root)
+    to_visit = deque(self._get_all_subgroups_and_ops(new_root))
     op_name_to_op = {}
     already_visited = set()
 
@@ -224,8 +148,7 @@ class Compiler(object):
           self,
           pipeline,
           root_group,
-          op_groups,
-          opsgroup_groups,
+          group_tree: GroupTree,
           condition_params,
           op_name_to_for_loop_op: Dict[Text, dsl.ParallelFor],
   ):
@@ -251,7 +174,7 @@ class Compiler(object):
         if param.op_name:
           upstream_op = pipeline.ops[param.op_name]
           upstream_groups, downstream_groups = \
-            self._get_uncommon_ancestors(op_groups, opsgroup_groups, upstream_op, op)
+            self._get_uncommon_ancestors(group_tree, upstream_op, op)
           for i, group_name in enumerate(downstream_groups):
             if i == 0:
               # If it is the first uncommon downstream group, then the input comes from
@@ -270,7 +193,7 @@ class Compiler(object):
               outputs[group_name].add((param.full_name, upstream_groups[i+1]))
         else:
           if not op.is_exit_handler:
-            for group_name in op_groups[op.name][::-1]:
+            for group_name in group_tree.iter_ancestors(op.name):
               # if group is for loop group and param is that loop's param, then the param
               # is created by that for loop ops_group and it shouldn't be an input to
               # any of its parent groups.
@@ -298,7 +221,7 @@ class Compiler(object):
           if param.op_name:
             upstream_op = pipeline.ops[param.op_name]
             upstream_groups, downstream_groups = \
-              self._get_uncommon_ancestors(op_groups, opsgroup_groups, upstream_op, group)
+              self._get_uncommon_ancestors(group_tree, upstream_op, group)
             for i, g in enumerate(downstream_groups):
               if i == 0:
                 inputs[g].add((full_name, upstream_groups[0]))
@@ -314,7 +237,7 @@ class Compiler(object):
               else:
                 outputs[g].add((full_name, upstream_groups[i+1]))
           elif not is_condition_param:
-            for g in op_groups[group.name]:
+            for g in group_tree.iter_ancestors(group.name):
               inputs[g].add((full_name, None))
       for subgroup in group.groups:
         _get_inputs_outputs_recursive_opsgroup(subgroup)
@@ -323,7 +246,7 @@ class Compiler(object):
 
     return inputs, outputs
 
-  def _get_dependencies(self, pipeline, root_group, op_groups, opsgroups_groups, opsgroups, condition_params):
+  def _get_dependencies(self, pipeline, root_group, group_tree, opsgroups, condition_params):
     """Get dependent groups and ops for all ops and groups.
 
     Returns:
@@ -350,8 +273,8 @@ class Compiler(object):
         else:
           raise ValueError('compiler cannot find the ' + upstream_op_name)
 
-        upstream_groups, downstream_groups = self._get_uncommon_ancestors(op_groups, opsgroups_groups, upstream_op, op)
-        dependencies[downstream_groups[0]].add(upstream_groups[0])
+        upstream_group, downstream_group = group_tree.first_uncommon_ancestors(upstream_op.name, op.name)
+        dependencies[downstream_group].add(upstream_group)
 
     # Generate dependencies based on the recursive opsgroups
     #TODO: refactor the following codes with the above
@@ -365,13 +288,12 @@ class Compiler(object):
       for op_name in upstream_op_names:
         if op_name in pipeline.ops:
           upstream_op = pipeline.ops[op_name]
-        elif op_name in opsgroups_groups:
-          upstream_op = opsgroups_groups[op_name]
+        elif op_name in opsgroups:
+          upstream_op = opsgroups[op_name]
         else:
           raise ValueError('compiler cannot find the ' + op_name)
-        upstream_groups, downstream_groups = \
-          self._get_uncommon_ancestors(op_groups, opsgroups_groups, upstream_op, group)
-        dependencies[downstream_groups[0]].add(upstream_groups[0])
+        upstream_group, downstream_group = group_tree.first_uncommon_ancestors(upstream_op.name, group.name)
+        dependencies[downstream_group].add(upstream_group)
 
       for subgroup in group.groups:
         _get_dependency_opsgroup(subgroup, dependencies)
@@ -494,9 +416,12 @@ class Compiler(object):
           task['withParam'] = withparam_value
         else:
           # Need to sanitize the dict keys for consistency.
-          loop_tasks = sub_group.loop_args.to_list_for_task_yaml()
+          if sub_group.loop_args.shard_size:
+            loop_tasks = self._get_sharded_loop_items(sub_group, inputs)
+          else:
+            loop_tasks = sub_group.loop_args.to_list_for_task_yaml()
           sanitized_tasks = []
-          if isinstance(loop_tasks[0], dict):
+          if sub_group.loop_args.items_are_dicts:
             for argument_set in loop_tasks:
               c_dict = {}
               for k, v in argument_set.items():
@@ -511,6 +436,25 @@ class Compiler(object):
     template['dag'] = {'tasks': tasks}
     return template
 
+  def _get_sharded_loop_items(self, sub_group: dsl.ParallelFor, inputs: Dict[Text, Tuple[Text, Text]]):
+    """Groups the static items of a sharded loop. Only the item attributes that the loop uses are passed."""
+    loop_args = sub_group.loop_args
+    sanitized_loop_arg_full_name = sanitize_k8s_name(self._pipelineparam_full_name(loop_args))
+    subvar_names = set()
+    include_shard_items = False
+    for param_name, _ in inputs.get(sub_group.name, []):
+      if not sanitize_k8s_name(param_name).startswith(sanitized_loop_arg_full_name):
+        continue
+      if sanitize_k8s_name(param_name) == sanitized_loop_arg_full_name:
+        include_shard_items = True
+      elif _for_loop.LoopArgumentVariable.name_is_loop_arguments_variable(param_name):
+        subvar_names.add(_for_loop.LoopArgumentVariable.get_subvar_name(param_name))
+    item_keys = []
+    if loop_args.items_are_dicts:
+      item_keys = [key for key in loop_args.to_list_for_task_yaml()[0].keys()
+                   if {key, sanitize_k8s_name(key), sanitize_k8s_name(key, True)} & subvar_names]
+    return loop_args.to_sharded_list_for_task_yaml(item_keys, include_shard_items or not item_keys)
+
   def get_arguments_for_sub_group(
           self,
           sub_group: Union[OpsGroup, dsl._container_op.BaseOp],
@@ -536,7 +480,10 @@ class Compiler(object):
       # We only care about the reference to the current loop item, not the outer loops
       if isinstance(sub_group, dsl.ParallelFor) and arg_ref_full_name.startswith(sanitized_loop_arg_full_name):
         if arg_ref_full_name == sanitized_loop_arg_full_name:
-          argument_value = '{{item}}'
+          if sub_group.loop_args.shard_size and sub_group.loop_args.items_are_dicts:
+            argument_value = '{{item.%s}}' % _for_loop.LoopArguments.SHARD_ITEMS_KEY
+          else:
+            argument_value = '{{item}}'
         elif _for_loop.LoopArgumentVariable.name_is_loop_arguments_variable(param_name):
           subvar_name = _for_loop.LoopArgumentVariable.get_subvar_name(param_name)
           argument_value = '{{item.%s}}' % subvar_name
@@ -571,49 +518,52 @@ class Compiler(object):
     # Call the transformation functions before determining the inputs/outputs, otherwise
     # the user would not be able to use pipeline parameters in the container definition
     # (for example as pod labels) - the generated template is invalid.
-    for op in pipeline.ops.values():
-      for transformer in op_transformers or []:
-        transformer(op)
+    with self._profiler.phase('op_transformers'):
+      for op in pipeline.ops.values():
+        with self._profiler.op(op.name, 'op_transformers'):
+          for transformer in op_transformers or []:
+            transformer(op)
 
     # Generate core data structures to prepare for argo yaml generation
-    #   op_name_to_parent_groups: op name -> list of ancestor groups including the current op
+    #   group_tree: index of the parent groups of all the groups and ops
     #   opsgroups: a dictionary of ospgroup.name -> opsgroup
     #   inputs, outputs: group/op names -> list of tuples (full_param_name, producing_op_name)
     #   condition_params: recursive_group/op names -> list of pipelineparam
     #   dependencies: group/op name -> list of dependent groups/ops.
     # Special Handling for the recursive opsgroup
-    #   op_name_to_parent_groups also contains the recursive opsgroups
+    #   group_tree also contains the recursive opsgroups, as leaves
     #   condition_params from _get_condition_params_for_ops also contains the recursive opsgroups
     #   groups does not include the recursive opsgroups
-    opsgroups = self._get_groups(root_group)
-    op_name_to_parent_groups = self._get_groups_for_ops(root_group)
-    opgroup_name_to_parent_groups = self._get_groups_for_opsgroups(root_group)
-    condition_params = self._get_condition_params_for_ops(root_group)
-    op_name_to_for_loop_op = self._get_for_loop_ops(root_group)
-    inputs, outputs = self._get_inputs_outputs(
-      pipeline,
-      root_group,
-      op_name_to_parent_groups,
-      opgroup_name_to_parent_groups,
-      condition_params,
-      op_name_to_for_loop_op,
-    )
-    dependencies = self._get_dependencies(
-      pipeline,
-      root_group,
-      op_name_to_parent_groups,
-      opgroup_name_to_parent_groups,
-      opsgroups,
-      condition_params,
-    )
+    with self._profiler.phase('analyze_groups'):
+      opsgroups = self._get_groups(root_group)
+      group_tree = GroupTree(root_group)
+      condition_params = self._get_condition_params_for_ops(root_group)
+      op_name_to_for_loop_op = self._get_for_loop_ops(root_group)
+      inputs, outputs = self._get_inputs_outputs(
+        pipeline,
+        root_group,
+        group_tree,
+        condition_params,
+        op_name_to_for_loop_op,
+      )
+      dependencies = self._get_dependencies(
+        pipeline,
+        root_group,
+        group_tree,
+        opsgroups,
+        condition_params,
+      )
 
     templates = []
-    for opsgroup in opsgroups.keys():
-      template = self._group_to_dag_template(opsgroups[opsgroup], inputs, outputs, dependencies)
-      templates.append(template)
+    with self._profiler.phase('group_to_dag_template'):
+      for opsgroup in opsgroups.keys():
+        template = self._group_to_dag_template(opsgroups[opsgroup], inputs, outputs, dependencies)
+        templates.append(template)
 
-    for op in pipeline.ops.values():
-      templates.extend(op_to_templates_handler(op))
+    with self._profiler.phase('op_to_template'):
+      for op in pipeline.ops.values():
+        with self._profiler.op(op.name, 'op_to_template'):
+          templates.extend(op_to_templates_handler(op))
 
     return templates
 
@@ -637,7 +587,8 @@ class Compiler(object):
     pipeline_group.name = temp_pipeline_group_name
 
     # Templates
-    templates = self._create_dag_templates(pipeline, op_transformers)
+    with self._profiler.phase('create_dag_templates'):
+      templates = self._create_dag_templates(pipeline, op_transformers)
 
     # Exit Handler
     exit_handler = None
@@ -754,8 +705,20 @@ class Compiler(object):
       pipeline_description: Text=None,
       params_list: List[dsl.PipelineParam]=None,
       pipeline_conf: dsl.PipelineConf = None,
+      cache: CompileCache = None,
       ) -> Dict[Text, Any]:
     """ Internal implementation of create_workflow."""
+    if cache is not None:
+      cache_key = compute_cache_key(pipeline_func, pipeline_name, pipeline_description, params_list, pipeline_conf)
+      workflow = cache.get(cache_key)
+      if workflow is None:
+        # The key does not cover the component files that the pipeline function loads, so they are recorded with the workflow.
+        with _ComponentLoadRecorder() as component_loads:
+          workflow = self._create_workflow(pipeline_func, pipeline_name, pipeline_description, params_list, pipeline_conf)
+        if component_loads.cacheable:
+          cache.put(cache_key, workflow, component_loads.component_file_digests)
+      return workflow
+
     params_list = params_list or []
     argspec = inspect.getfullargspec(pipeline_func)
 
@@ -787,13 +750,15 @@ class Compiler(object):
           break
       args_list.append(dsl.PipelineParam(sanitize_k8s_name(arg_name, True), param_type=arg_type))
 
-    with dsl.Pipeline(pipeline_name) as dsl_pipeline:
-      pipeline_func(*args_list)
+    with self._profiler.phase('pipeline_func'):
+      with dsl.Pipeline(pipeline_name) as dsl_pipeline:
+        pipeline_func(*args_list)
 
     pipeline_conf = pipeline_conf or dsl_pipeline.conf # Configuration passed to the compiler is overriding. Unfortunately, it's not trivial to detect whether the dsl_pipeline.conf was ever modified.
 
     self._validate_exit_handler(dsl_pipeline)
-    self._sanitize_and_inject_artifact(dsl_pipeline, pipeline_conf)
+    with self._profiler.phase('sanitize_and_inject_artifact'):
+      self._sanitize_and_inject_artifact(dsl_pipeline, pipeline_conf)
 
     # Fill in the default values.
     args_list_with_defaults = []
@@ -818,19 +783,35 @@ class Compiler(object):
     op_transformers = [add_pod_env]
     op_transformers.extend(pipeline_conf.op_transformers)
 
-    workflow = self._create_pipeline_workflow(
-        args_list_with_defaults,
-        dsl_pipeline,
-        op_transformers,
-        pipeline_conf,
-    )
+    with self._profiler.phase('create_pipeline_workflow'):
+      workflow = self._create_pipeline_workflow(
+          args_list_with_defaults,
+          dsl_pipeline,
+          op_transformers,
+          pipeline_conf,
+      )
 
     from ._data_passing_rewriter import fix_big_data_passing
-    workflow = fix_big_data_passing(workflow)
+    with self._profiler.phase('fix_big_data_passing'):
+      workflow = fix_big_data_passing(workflow)
+
+    if pipeline_conf.deduplicate_templates:
+      from ._template_deduplication import deduplicate_templates
+      with self._profiler.phase('deduplicate_templates'):
+        workflow = deduplicate_templates(workflow)
 
     import json
     workflow.setdefault('metadata', {}).setdefault('annotations', {})['pipelines.kubeflow.org/pipeline_spec'] = json.dumps(pipeline_meta.to_dict(), sort_keys=True)
 
+    from ._workflow_size import offload_large_raw_artifacts
+    if pipeline_conf.data_offloading_threshold is not None:
+      with self._profiler.phase('offload_large_raw_artifacts'):
+        offload_large_raw_artifacts(
+          workflow,
+          pipeline_conf.artifact_location,
+          pipeline_conf.data_offloading_threshold,
+          pipeline_conf.data_offloading_upload_func,
+        )
     return workflow
 
   # For now (0.1.31) this function is only used by TFX's KubeflowDagRunner.
@@ -844,7 +825,8 @@ class Compiler(object):
                       pipeline_name: Text=None,
                       pipeline_description: Text=None,
                       params_list: List[dsl.PipelineParam]=None,
-                      pipeline_conf: dsl.PipelineConf = None) -> Dict[Text, Any]:
+                      pipeline_conf: dsl.PipelineConf = None,
+                      cache: CompileCache = None) -> Dict[Text, Any]:
     """ Create workflow spec from pipeline function and specified pipeline
     params/metadata. Currently, the pipeline params are either specified in
     the signature of the pipeline function or by passing a list of
@@ -855,9 +837,10 @@ class Compiler(object):
     :param pipeline_description:
     :param params_list: list of pipeline params to append to the pipeline.
     :param pipeline_conf: PipelineConf instance. Can specify op transforms, image pull secrets and other pipeline-level configuration options. Overrides any configuration that may be set by the pipeline.
+    :param cache: CompileCache instance. If specified, the workflow is taken from the cache when the pipeline did not change since it was cached.
     :return: workflow dict.
     """
-    return self._create_workflow(pipeline_func, pipeline_name, pipeline_description, params_list, pipeline_conf)
+    return self._create_workflow(pipeline_func, pipeline_name, pipeline_description, params_list, pipeline_conf, cache)
 
   @deprecated(
       version='0.1.32',
@@ -866,7 +849,7 @@ class Compiler(object):
     """Compile the given pipeline function into workflow."""
     return self._create_workflow(pipeline_func=pipeline_func, pipeline_conf=pipeline_conf)
 
-  def compile(self, pipeline_func, package_path, type_check=True, pipeline_conf: dsl.PipelineConf = None):
+  def compile(self, pipeline_func, package_path, type_check=True, pipeline_conf: dsl.PipelineConf = None, profile: CompileProfiler = None, cache: CompileCache = None):
     """Compile the given pipeline function into workflow yaml.
 
     Args:
@@ -874,17 +857,25 @@ class Compiler(object):
       package_path: the output workflow tar.gz file path. for example, "~/a.tar.gz"
       type_check: whether to enable the type check or not, default: False.
       pipeline_conf: PipelineConf instance. Can specify op transforms, image pull secrets and other pipeline-level configuration options. Overrides any configuration that may be set by the pipeline.
+      profile: CompileProfiler instance. If specified, it records the time and memory spent in every compilation phase and for every op.
+      cache: CompileCache instance. If specified, the workflow is taken from the cache when the pipeline did not change since it was cached.
     """
     import kfp
     type_check_old_value = kfp.TYPE_CHECK
+    if profile is not None:
+      self._profiler = profile
     try:
       kfp.TYPE_CHECK = type_check
-      self._create_and_write_workflow(
-          pipeline_func=pipeline_func,
-          pipeline_conf=pipeline_conf,
-          package_path=package_path)
+      with self._profiler:
+        self._create_and_write_workflow(
+            pipeline_func=pipeline_func,
+            pipeline_conf=pipeline_conf,
+            package_path=package_path,
+            cache=cache)
     finally:
       kfp.TYPE_CHECK = type_check_old_value
+      if profile is not None:
+        del self._profiler
 
   @staticmethod
   def _write_workflow(workflow: Dict[Text, Any], package_path: Text = None):
@@ -892,42 +883,11 @@ class Compiler(object):
 
     Args:
       workflow: Workflow spec of the pipline, dict.
-      package_path: file path to be written. If not specified, a yaml_text string
-        will be returned.
+      package_path: file path to be written. The supported formats are .tar.gz, .tgz,
+        .zip, .yaml, .yml and .json. If not specified, a yaml_text string will be returned.
     """
-    yaml.Dumper.ignore_aliases = lambda *args : True
-    yaml_text = yaml.dump(workflow, default_flow_style=False, default_style='|')
-
-    if '{{pipelineparam' in yaml_text:
-      raise RuntimeError(
-          'Internal compiler error: Found unresolved PipelineParam. '
-          'Please create a new issue at https://github.com/kubeflow/pipelines/issues '
-          'attaching the pipeline code and the pipeline package.' )
-
-    if package_path is None:
-      return yaml_text
-
-    if package_path.endswith('.tar.gz') or package_path.endswith('.tgz'):
-      from contextlib import closing
-      from io import BytesIO
-      with tarfile.open(package_path, "w:gz") as tar:
-          with closing(BytesIO(yaml_text.encode())) as yaml_file:
-            tarinfo = tarfile.TarInfo('pipeline.yaml')
-            tarinfo.size = len(yaml_file.getvalue())
-            tar.addfile(tarinfo, fileobj=yaml_file)
-    elif package_path.endswith('.zip'):
-      with zipfile.ZipFile(package_path, "w") as zip:
-        zipinfo = zipfile.ZipInfo('pipeline.yaml')
-        zipinfo.compress_type = zipfile.ZIP_DEFLATED
-        zip.writestr(zipinfo, yaml_text)
-    elif package_path.endswith('.yaml') or package_path.endswith('.yml'):
-      with open(package_path, 'w') as yaml_file:
-        yaml_file.write(yaml_text)
-    else:
-      raise ValueError(
-          'The output path '+ package_path +
-          ' should ends with one of the following formats: '
-          '[.tar.gz, .tgz, .zip, .yaml, .yml]')
+    from ._workflow_writer import write_workflow
+    return write_workflow(workflow, package_path)
 
   def _create_and_write_workflow(
       self,
@@ -936,7 +896,8 @@ class Compiler(object):
       pipeline_description: Text=None,
       params_list: List[dsl.PipelineParam]=None,
       pipeline_conf: dsl.PipelineConf=None,
-      package_path: Text=None
+      package_path: Text=None,
+      cache: CompileCache=None
   ) -> None:
     """Compile the given pipeline function and dump it to specified file format."""
     workflow = self._create_workflow(
@@ -944,6 +905,8 @@ class Compiler(object):
         pipeline_name,
         pipeline_description,
         params_list,
-        pipeline_conf)
-    self._write_workflow(workflow, package_path)
+        pipeline_conf,
+        cache)
+    with self._profiler.phase('write_workflow'):
+      self._write_workflow(workflow, package_path)
 
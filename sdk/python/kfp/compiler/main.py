@@ -14,6 +14,9 @@
 
 
 import argparse
+import concurrent.futures
+import importlib.util
+import json
 import kfp.dsl as dsl
 import kfp.compiler
 import os
@@ -21,6 +24,9 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import time
+import traceback
+from collections import OrderedDict
 from deprecated.sphinx import deprecated
 
 
@@ -30,7 +36,8 @@ def parse_arguments():
   parser = argparse.ArgumentParser()
   parser.add_argument('--py',
                       type=str,
-                      help='local absolute path to a py file.')
+                      help='local absolute path to a py file, or to a directory to compile all the pipelines '
+                           'of all the py files in it. For a directory, --output is the output directory.')
   parser.add_argument('--package',
                       type=str,
                       help='local path to a pip installable python package file.')
@@ -43,16 +50,38 @@ def parse_arguments():
   parser.add_argument('--output',
                       type=str,
                       required=True,
-                      help='local path to the output workflow yaml file.')
+                      help='local path to the output workflow file (.yaml, .yml, .json, .tar.gz, .tgz or .zip).')
   parser.add_argument('--disable-type-check',
                       action='store_true',
                       help='disable the type check, default is enabled.')
+  parser.add_argument('--profile',
+                      type=str,
+                      help='local path to a JSON file to write the time and memory spent in every compilation phase to.')
+  parser.add_argument('--cache',
+                      action='store_true',
+                      help='take the workflows of the pipelines that did not change from the compile cache. '
+                           'The cache is also enabled when $KFP_COMPILE_CACHE_DIR is set. '
+                           'The cache directory is $KFP_COMPILE_CACHE_DIR or ~/.cache/kfp/compile.')
+  parser.add_argument('--no-cache',
+                      action='store_true',
+                      help='disable the compile cache even when $KFP_COMPILE_CACHE_DIR is set.')
+  parser.add_argument('--jobs',
+                      type=int,
+                      help='the number of processes that compile the pipelines of a directory, default is the number of CPUs.')
+  parser.add_argument('--format',
+                      type=str,
+                      default='yaml',
+                      choices=['yaml', 'json', 'zip', 'tar.gz'],
+                      help='the format of the workflow files compiled from a directory, default is yaml.')
+  parser.add_argument('--summary',
+                      type=str,
+                      help='local path to a JSON file to write the compilation times and failures of a directory to.')
 
   args = parser.parse_args()
   return args
 
 
-def _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_check):
+def _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_check, profile_path=None, use_cache=False):
   if len(pipeline_funcs) == 0:
     raise ValueError('A function with @dsl.pipeline decorator is required in the py file.')
 
@@ -68,7 +97,11 @@ def _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_
   else:
     pipeline_func = pipeline_funcs[0]
 
-  kfp.compiler.Compiler().compile(pipeline_func, output_path, type_check)
+  profiler = kfp.compiler.CompileProfiler() if profile_path else None
+  cache = kfp.compiler.CompileCache() if use_cache else None
+  kfp.compiler.Compiler().compile(pipeline_func, output_path, type_check, profile=profiler, cache=cache)
+  if profiler:
+    profiler.write(profile_path)
 
 
 class PipelineCollectorContext():
@@ -90,39 +123,202 @@ class PipelineCollectorContext():
     Please switch to compiling pipeline files or functions.
     If you use this feature please create an issue in https://github.com/kubeflow/pipelines/issues .'''
 )
-def compile_package(package_path, namespace, function_name, output_path, type_check):
+def compile_package(package_path, namespace, function_name, output_path, type_check, profile_path=None, use_cache=False):
   tmpdir = tempfile.mkdtemp()
   sys.path.insert(0, tmpdir)
   try:
     subprocess.check_call(['python3', '-m', 'pip', 'install', package_path, '-t', tmpdir])
     with PipelineCollectorContext() as pipeline_funcs:
       __import__(namespace)
-    _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_check)
+    _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_check, profile_path, use_cache)
   finally:
     del sys.path[0]
     shutil.rmtree(tmpdir)
 
 
-def compile_pyfile(pyfile, function_name, output_path, type_check):
+def compile_pyfile(pyfile, function_name, output_path, type_check, profile_path=None, use_cache=False):
   sys.path.insert(0, os.path.dirname(pyfile))
   try:
     filename = os.path.basename(pyfile)
     with PipelineCollectorContext() as pipeline_funcs:
       __import__(os.path.splitext(filename)[0])
-    _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_check)
+    _compile_pipeline_function(pipeline_funcs, function_name, output_path, type_check, profile_path, use_cache)
+  finally:
+    del sys.path[0]
+
+
+def _find_pipeline_modules(directory):
+  """Finds the py files of the directory that can define pipelines.
+
+  Returns:
+    A list of tuples (module name, module file path, sys.path entry to import the module with).
+    The files in python packages (directories with __init__.py) are imported with their
+    full module name, so that they can use relative imports.
+  """
+  modules = []
+  for dir_path, dir_names, file_names in os.walk(os.path.abspath(directory)):
+    dir_names[:] = sorted(dir_name for dir_name in dir_names if not dir_name.startswith('.') and dir_name != '__pycache__')
+    for file_name in sorted(file_names):
+      # setup.py runs the setuptools commands of the command line when it is imported.
+      if not file_name.endswith('.py') or file_name == 'setup.py':
+        continue
+      file_path = os.path.join(dir_path, file_name)
+      with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        if 'pipeline' not in f.read():
+          continue
+      module_names = [] if file_name == '__init__.py' else [os.path.splitext(file_name)[0]]
+      sys_path_entry = dir_path
+      while os.path.exists(os.path.join(sys_path_entry, '__init__.py')):
+        module_names.insert(0, os.path.basename(sys_path_entry))
+        sys_path_entry = os.path.dirname(sys_path_entry)
+      modules.append(('.'.join(module_names), file_path, sys_path_entry))
+  return modules
+
+
+def _compile_module_pipelines(module_name, module_path, sys_path_entry, output_prefix, extension, type_check, use_cache):
+  """Imports the module file and compiles all the pipelines it defines.
+
+  Returns:
+    A list with the result dict of every pipeline.
+  """
+  spec = importlib.util.spec_from_file_location(
+      module_name, module_path,
+      submodule_search_locations=[os.path.dirname(module_path)] if os.path.basename(module_path) == '__init__.py' else None)
+  module = importlib.util.module_from_spec(spec)
+  # Several files can have the same module name, so the module is only registered while its pipelines are compiled.
+  previous_module = sys.modules.get(module_name)
+  sys.modules[module_name] = module
+  sys.path.insert(0, sys_path_entry)
+  results = []
+  try:
+    start_time = time.perf_counter()
+    try:
+      with PipelineCollectorContext() as pipeline_funcs:
+        spec.loader.exec_module(module)
+    except (Exception, SystemExit):
+      return [OrderedDict([
+          ('module', module_path),
+          ('pipeline', None),
+          ('output', None),
+          ('wall_time', time.perf_counter() - start_time),
+          ('error', traceback.format_exc()),
+      ])]
+
+    cache = kfp.compiler.CompileCache() if use_cache else None
+    # The pipelines of the modules imported by this module are compiled with these modules.
+    for pipeline_func in pipeline_funcs:
+      if pipeline_func.__module__ != module_name:
+        continue
+      output_path = output_prefix + '.' + pipeline_func.__name__ + extension
+      error = None
+      start_time = time.perf_counter()
+      try:
+        kfp.compiler.Compiler().compile(pipeline_func, output_path, type_check, cache=cache)
+      except Exception:
+        error = traceback.format_exc()
+      results.append(OrderedDict([
+          ('module', module_path),
+          ('pipeline', pipeline_func.__name__),
+          ('output', output_path if error is None else None),
+          ('wall_time', time.perf_counter() - start_time),
+          ('error', error),
+      ]))
   finally:
     del sys.path[0]
+    if previous_module is None:
+      sys.modules.pop(module_name, None)
+    else:
+      sys.modules[module_name] = previous_module
+  return results
+
+
+def compile_directory(directory, output_dir, type_check, output_format='yaml', jobs=None, use_cache=False):
+  """Compiles all the pipelines of all the py files in the directory using a pool of processes.
+
+  Every pipeline is written to <output_dir>/<file path relative to the directory, with dots>.<function name>.<output_format>.
+
+  Returns:
+    A summary dict with the total wall time and the result of every pipeline, sorted by module and pipeline.
+    The results of the modules that failed to import have no pipeline name.
+  """
+  start_time = time.perf_counter()
+  os.makedirs(output_dir, exist_ok=True)
+  tasks = []
+  for module_name, module_path, sys_path_entry in _find_pipeline_modules(directory):
+    relative_path = os.path.splitext(os.path.relpath(module_path, directory))[0]
+    output_prefix = os.path.join(output_dir, relative_path.replace(os.sep, '.'))
+    tasks.append((module_name, module_path, sys_path_entry, output_prefix, '.' + output_format, type_check, use_cache))
+
+  jobs = min(jobs or os.cpu_count() or 1, len(tasks) or 1)
+  if jobs == 1:
+    module_results = [_compile_module_pipelines(*task) for task in tasks]
+  else:
+    # The worker processes are reused, so the SDK and the Kubernetes models are only imported once per process.
+    module_results = []
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+      futures = [executor.submit(_compile_module_pipelines, *task) for task in tasks]
+      for task, future in zip(tasks, futures):
+        try:
+          module_results.append(future.result())
+        except Exception:
+          # For example, the module killed its worker process.
+          module_results.append([OrderedDict([
+              ('module', task[1]),
+              ('pipeline', None),
+              ('output', None),
+              ('wall_time', 0),
+              ('error', traceback.format_exc()),
+          ])])
+
+  results = sorted(
+      (result for results in module_results for result in results),
+      key=lambda result: (result['module'], result['pipeline'] or ''))
+  return OrderedDict([
+      ('wall_time', time.perf_counter() - start_time),
+      ('jobs', jobs),
+      ('modules', len(tasks)),
+      ('pipelines', results),
+  ])
+
+
+def _print_summary(summary):
+  results = summary['pipelines']
+  failed_count = sum(1 for result in results if result['error'])
+  for result in results:
+    name = result['module'] + (':' + result['pipeline'] if result['pipeline'] else '')
+    if result['error']:
+      print('FAILED  {:.3f}s  {}\n{}'.format(result['wall_time'], name, result['error']))
+    else:
+      print('OK      {:.3f}s  {} -> {}'.format(result['wall_time'], name, result['output']))
+  print('Compiled {} pipelines from {} files in {:.3f}s with {} processes. {} failed.'.format(
+      len(results) - failed_count, summary['modules'], summary['wall_time'], summary['jobs'], failed_count))
+
+
+def _use_cache(args):
+  """Returns whether the compile cache is enabled. It is opt-in: --cache or $KFP_COMPILE_CACHE_DIR enable it and --no-cache overrides both."""
+  return (args.cache or bool(os.environ.get('KFP_COMPILE_CACHE_DIR'))) and not args.no_cache
 
 
 def main():
   args = parse_arguments()
+  use_cache = _use_cache(args)
   if ((args.py is None and args.package is None) or
       (args.py is not None and args.package is not None)):
     raise ValueError('Either --py or --package is needed but not both.')
-  if args.py:
-    compile_pyfile(args.py, args.function, args.output, not args.disable_type_check)
+  if args.py and os.path.isdir(args.py):
+    if args.function or args.profile:
+      raise ValueError('--function and --profile are not supported when compiling a directory.')
+    summary = compile_directory(args.py, args.output, not args.disable_type_check, args.format, args.jobs, use_cache)
+    _print_summary(summary)
+    if args.summary:
+      with open(args.summary, 'w') as f:
+        json.dump(summary, f, indent=2)
+    if any(result['error'] for result in summary['pipelines']):
+      sys.exit(1)
+  elif args.py:
+    compile_pyfile(args.py, args.function, args.output, not args.disable_type_check, args.profile, use_cache)
   else:
     if args.namespace is None:
       raise ValueError('--namespace is required for compiling packages.')
-    compile_package(args.package, args.namespace, args.function, args.output, not args.disable_type_check)
+    compile_package(args.package, args.namespace, args.function, args.output, not args.disable_type_check, args.profile, use_cache)
   
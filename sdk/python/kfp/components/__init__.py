@@ -12,8 +12,49 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from ._airflow_op import *
-from ._components import *
-from ._python_op import *
-from ._python_to_graph_component import *
-from ._component_store import *
+
+import sys as _sys
+
+# The public names and the modules that define them. The modules import yaml, requests and the code pickling support,
+# so on Python 3.7+ they are imported on the first attribute access (PEP 562).
+_lazy_attributes = {}
+for _module_name, _names in [
+    ('._airflow_op', ['create_component_from_airflow_op']),
+    ('._components', ['load_component', 'load_component_from_text', 'load_component_from_url', 'load_component_from_file']),
+    ('._python_op', ['create_component_from_func', 'func_to_container_op', 'func_to_component_text', 'default_base_image_or_builder', 'get_default_base_image', 'set_default_base_image', 'InputPath', 'InputTextFile', 'InputBinaryFile', 'OutputPath', 'OutputTextFile', 'OutputBinaryFile']),
+    ('._python_to_graph_component', ['create_graph_component_from_pipeline_func']),
+    ('._component_store', ['ComponentStore']),
+    ('._component_cache', ['ComponentCache']),
+]:
+    for _name in _names:
+        _lazy_attributes[_name] = _module_name
+del _module_name, _name, _names
+
+if _sys.version_info >= (3, 7):
+    import importlib as _importlib
+
+    __all__ = list(_lazy_attributes)
+
+    def __getattr__(name):
+        if name in _lazy_attributes:
+            value = getattr(_importlib.import_module(_lazy_attributes[name], __name__), name)
+            globals()[name] = value
+            return value
+        if not name.startswith('__'):
+            # Submodules such as kfp.components.structures were accessible after `import kfp.components` before the imports became lazy.
+            try:
+                return _importlib.import_module('.' + name, __name__)
+            except ModuleNotFoundError as e:
+                if e.name != __name__ + '.' + name:
+                    raise
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+    def __dir__():
+        return sorted(set(globals()) | set(_lazy_attributes))
+else:
+    from ._airflow_op import *
+    from ._components import *
+    from ._python_op import *
+    from ._python_to_graph_component import *
+    from ._component_store import *
+    from ._component_cache import *
@@ -0,0 +1,205 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__all__ = [
+    'ComponentCache',
+]
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Optional
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'kfp', 'components')
+DEFAULT_MAX_SIZE = 100 * 2**20
+DEFAULT_TTL = 10 * 60
+
+_logger = logging.getLogger(__name__)
+
+_BLOBS_SUBDIR = 'sha256'
+_URLS_SUBDIR = 'urls'
+
+
+def _write_file_atomically(path: str, data: bytes):
+    '''Writes the file under a temporary name and renames it, so that concurrent readers never read a partial file.'''
+    dir_path = os.path.dirname(path)
+    os.makedirs(dir_path, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=dir_path, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+class ComponentCache:
+    '''On-disk cache of the component files downloaded by ComponentStore.
+
+    The files are stored under the SHA256 digest of their content. Every downloaded URL is recorded with the digest of its content and with the ETag and Last-Modified response headers.
+
+    * The URLs that were downloaded less than ttl seconds ago are served from the cache.
+    * Older URLs are revalidated with a conditional request (If-None-Match/If-Modified-Since). A "304 Not Modified" response keeps the cached file.
+    * The lookups pinned to a digest are served from the cache whenever the cached content has that digest, without any request, since that content cannot change.
+
+    When the total size of the cached files exceeds max_size, the least recently used files are removed.
+
+    The cache is best-effort: when the cache directory cannot be used (e.g. a read-only home directory), fetch logs a warning and returns the downloaded content.
+
+    Args:
+        cache_dir: The directory of the cache files. Defaults to the KFP_COMPONENT_CACHE_DIR environment variable or ~/.cache/kfp/components.
+        max_size: The maximum total size of the cached component files in bytes.
+        ttl: The number of seconds during which a downloaded URL is used without revalidation.
+    '''
+    def __init__(self, cache_dir: str = None, max_size: int = DEFAULT_MAX_SIZE, ttl: float = DEFAULT_TTL):
+        self.cache_dir = cache_dir or os.environ.get('KFP_COMPONENT_CACHE_DIR') or DEFAULT_CACHE_DIR
+        self.max_size = max_size
+        self.ttl = ttl
+        self._warned_about_errors = False
+
+    def _log_error(self, error: OSError):
+        #Only the first error is a warning, since the cache directory usually stays unusable.
+        log = _logger.debug if self._warned_about_errors else _logger.warning
+        self._warned_about_errors = True
+        log('The component cache in "%s" cannot be used: %s', self.cache_dir, error)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, _BLOBS_SUBDIR, digest)
+
+    def _url_entry_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, _URLS_SUBDIR, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, digest: str) -> Optional[bytes]:
+        '''Returns the cached file content with the specified SHA256 digest or None.'''
+        path = self._blob_path(digest)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            if hashlib.sha256(data).hexdigest() != digest:
+                #Corrupted file
+                os.remove(path)
+                return None
+            #The modification time records the last use.
+            os.utime(path)
+        except OSError as e:
+            self._log_error(e)
+        return data
+
+    def put(self, data: bytes) -> str:
+        '''Stores the file content and returns its SHA256 digest.'''
+        digest = hashlib.sha256(data).hexdigest()
+        _write_file_atomically(self._blob_path(digest), data)
+        self._evict()
+        return digest
+
+    def _read_url_entry(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._url_entry_path(url), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('url') != url:
+            return None
+        return entry
+
+    def _write_url_entry(self, url: str, entry: dict):
+        _write_file_atomically(self._url_entry_path(url), json.dumps(entry).encode('utf-8'))
+
+    def fetch(self, url: str, session, digest: str = None) -> bytes:
+        '''Returns the content of the URL, downloading it with the requests session when the cached content is missing or expired.
+
+        Args:
+            url: The URL of the file.
+            session: The requests.Session used for the downloads.
+            digest: The expected SHA256 digest of the content. When the cached content of the URL has this digest, it is returned without revalidation.
+
+        Raises:
+            requests.HTTPError: The server returned an error status.
+        '''
+        entry = self._read_url_entry(url)
+        data = self.get(entry['digest']) if entry else None
+        if data is not None:
+            if digest is not None and entry['digest'] == digest:
+                return data
+            if time.time() - entry['fetched_at'] < self.ttl:
+                return data
+
+        headers = {}
+        if data is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        response = session.get(url, headers=headers)
+        if response.status_code == 304 and data is not None:
+            entry['fetched_at'] = time.time()
+            try:
+                self._write_url_entry(url, entry)
+            except OSError as e:
+                self._log_error(e)
+            return data
+        response.raise_for_status()
+
+        data = response.content
+        if data:
+            try:
+                self._write_url_entry(url, {
+                    'url': url,
+                    'digest': self.put(data),
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'fetched_at': time.time(),
+                })
+            except OSError as e:
+                self._log_error(e)
+        return data
+
+    def _evict(self):
+        blobs_dir = os.path.join(self.cache_dir, _BLOBS_SUBDIR)
+        entries = []
+        for file_name in os.listdir(blobs_dir):
+            if file_name.endswith('.tmp'):
+                continue
+            try:
+                stat = os.stat(os.path.join(blobs_dir, file_name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_name))
+        total_size = sum(size for _, size, _ in entries)
+        #The URL entries of the removed files are ignored when they are read.
+        for _, size, file_name in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(blobs_dir, file_name))
+            except OSError:
+                pass
+            total_size -= size
+
+    def clear(self):
+        '''Removes all the cached files.'''
+        for subdir in [_BLOBS_SUBDIR, _URLS_SUBDIR]:
+            dir_path = os.path.join(self.cache_dir, subdir)
+            if not os.path.isdir(dir_path):
+                continue
+            for file_name in os.listdir(dir_path):
+                os.remove(os.path.join(dir_path, file_name))
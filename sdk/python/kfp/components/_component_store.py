@@ -3,22 +3,60 @@ __all__ = [
 ]
 
 from pathlib import Path
+import threading
 import requests
 from typing import Callable
 from . import _components as comp
+from ._component_cache import ComponentCache
 from .structures import ComponentReference
 
 class ComponentStore:
-    def __init__(self, local_search_paths=None, url_search_prefixes=None):
+    '''Loads the components from local directories and URL prefixes.
+
+    Args:
+        local_search_paths: The directories where the components are searched first.
+        url_search_prefixes: The URL prefixes where the components are searched next.
+        cache: Optional. The ComponentCache that stores the downloaded component files. Without cache every lookup downloads the files again.
+    '''
+    def __init__(self, local_search_paths=None, url_search_prefixes=None, cache: ComponentCache = None):
         self.local_search_paths = local_search_paths or ['.']
         self.url_search_prefixes = url_search_prefixes or []
+        self.cache = cache
 
         self._component_file_name = 'component.yaml'
         self._digests_subpath = 'versions/sha256'
         self._tags_subpath = 'versions/tags'
 
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def _get_session(self) -> requests.Session:
+        #All downloads share the connection pool of one session.
+        with self._session_lock:
+            if self._session is None:
+                self._session = requests.Session()
+            return self._session
+
+    def _fetch_url(self, url: str, digest: str = None) -> bytes:
+        '''Returns the content of the URL. Raises on bad status, dead domains and malformed URLs.'''
+        if self.cache is not None:
+            return self.cache.fetch(url, self._get_session(), digest=digest)
+        response = self._get_session().get(url)
+        response.raise_for_status()
+        return response.content
+
     def load_component_from_url(self, url):
-        return comp.load_component_from_url(url)
+        '''Loads component from URL and creates a task factory function. The downloads are cached when the store has a cache.'''
+        if url is None:
+            raise TypeError
+
+        #Handling Google Cloud Storage URIs
+        if url.startswith('gs://'):
+            #Replacing the gs:// URI with https:// URI (works for public objects)
+            url = 'https://storage.googleapis.com/' + url[len('gs://'):]
+
+        component_ref = ComponentReference(url=url)
+        return comp._load_component_from_yaml_or_zip_bytes(self._fetch_url(url), url, component_ref)
 
     def load_component_from_file(self, path):
         return comp.load_component_from_file(path)
@@ -39,6 +77,8 @@ class ComponentStore:
         <local-search-path>/<name>/versions/tags/<digest>
         <url-search-prefix>/<name>/versions/tags/<digest>
 
+        When the store has a cache, the components that were downloaded with the specified digest are loaded without any request.
+
         Args:
             name:   Component name used to search and load the component artifact containing the component definition.
                     Component name usually has the following form: group/subgroup/component
@@ -83,13 +123,12 @@ class ComponentStore:
             url = url_search_prefix + path_suffix
             tried_locations.append(url)
             try:
-                response = requests.get(url) #Does not throw exceptions on bad status, but throws on dead domains and malformed URLs. Should we log those cases?
-                response.raise_for_status()
+                content = self._fetch_url(url, digest=digest) #Should we log the failures?
             except:
                 continue
-            if response.content:
+            if content:
                 component_ref = ComponentReference(name=name, digest=digest, tag=tag, url=url)
-                return comp._load_component_from_yaml_or_zip_bytes(response.content, url, component_ref)
+                return comp._load_component_from_yaml_or_zip_bytes(content, url, component_ref)
 
         raise RuntimeError('Component {} was not found. Tried the following locations:\n{}'.format(name, '\n'.join(tried_locations)))
 
@@ -112,4 +151,5 @@ ComponentStore.default_store = ComponentStore(
     url_search_prefixes=[
         'https://raw.githubusercontent.com/kubeflow/pipelines/master/components/'
     ],
+    cache=ComponentCache(),
 )
@@ -20,8 +20,11 @@ __all__ = [
 ]
 
 import copy
+import hashlib
 import sys
+import threading
 from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from typing import Any, List, Mapping, NamedTuple, Sequence, Union
 from ._naming import _sanitize_file_name, _sanitize_python_function_name, generate_unique_name_conversion_table
 from ._yaml_utils import load_yaml
@@ -77,16 +80,9 @@ def load_component_from_url(url):
     if url is None:
         raise TypeError
 
-    #Handling Google Cloud Storage URIs
-    if url.startswith('gs://'):
-        #Replacing the gs:// URI with https:// URI (works for public objects)
-        url = 'https://storage.googleapis.com/' + url[len('gs://'):]
-
-    import requests
-    resp = requests.get(url)
-    resp.raise_for_status()
-    component_ref = ComponentReference(url=url)
-    return _load_component_from_yaml_or_zip_bytes(resp.content, url, component_ref)
+    #The default store reuses the HTTP connections and caches the downloaded files.
+    from ._component_store import ComponentStore
+    return ComponentStore.default_store.load_component_from_url(url)
 
 
 def load_component_from_file(filename):
@@ -147,9 +143,50 @@ def _load_component_from_yaml_or_zip_stream(stream, component_filename=None, com
         return _create_task_factory_from_component_text(stream, component_filename, component_ref)
 
 
+#The maximum number of task factories kept by _create_task_factory_from_component_text. Set to 0 to disable the memo.
+_max_task_factory_cache_size = 256
+
+_task_factory_cache = OrderedDict()
+_task_factory_cache_lock = threading.Lock()
+
+#The functions called with the file name and the component reference of every component text that is loaded, including the memoized ones.
+#The compile cache uses them to find the component files and URLs that a pipeline loads while it is compiled.
+_component_text_load_observers = []
+
+
 def _create_task_factory_from_component_text(text_or_file, component_filename=None, component_ref: ComponentReference = None):
-    component_dict = load_yaml(text_or_file)
-    return _create_task_factory_from_component_dict(component_dict, component_filename, component_ref)
+    '''Creates a task factory function from the component text.
+
+    The task factories are memoized by the SHA256 digest of the component text, the file name and the component reference,
+    so loading the same component again returns the same factory and ComponentSpec without parsing the text again.
+    The least recently used factories are dropped when there are more than _max_task_factory_cache_size of them.
+    '''
+    for observer in list(_component_text_load_observers):
+        observer(component_filename, component_ref)
+    data = text_or_file.read() if hasattr(text_or_file, 'read') else text_or_file
+    data_bytes = data.encode('utf-8') if isinstance(data, str) else data
+    #The factory embeds the file name and the reference (e.g. URL or digest), so the components loaded from different locations do not share factories.
+    cache_key = (
+        hashlib.sha256(data_bytes).hexdigest(),
+        component_filename,
+        _get_component_ref_key(component_ref) if component_ref is not None else None,
+    )
+    with _task_factory_cache_lock:
+        task_factory = _task_factory_cache.get(cache_key)
+        if task_factory is not None:
+            _task_factory_cache.move_to_end(cache_key)
+            return task_factory
+
+    component_dict = load_yaml(data)
+    task_factory = _create_task_factory_from_component_dict(component_dict, component_filename, component_ref)
+
+    with _task_factory_cache_lock:
+        if _max_task_factory_cache_size > 0:
+            #Another thread could have stored the same factory in the meantime.
+            task_factory = _task_factory_cache.setdefault(cache_key, task_factory)
+            while len(_task_factory_cache) > _max_task_factory_cache_size:
+                _task_factory_cache.popitem(last=False)
+    return task_factory
 
 
 def _create_task_factory_from_component_dict(component_dict, component_filename=None, component_ref: ComponentReference = None):
@@ -474,14 +511,101 @@ _ResolvedGraphTask = NamedTuple(
 )
 
 
+#The maximum number of component references that are loaded concurrently when a graph component is resolved.
+_max_component_prefetch_workers = 8
+
+#The component references prefetched by the outermost _resolve_graph_task call. The nested graph components reuse them.
+_prefetch_state = threading.local()
+
+
+def _get_component_ref_key(component_ref: ComponentReference):
+    return (component_ref.name, component_ref.digest, component_ref.tag, component_ref.url)
+
+
+def _get_graph_component_refs_to_load(component_spec: ComponentSpec) -> List[ComponentReference]:
+    '''Returns the component references of the graph tasks that must be loaded by the component store, including the ones in the inline nested graph components.'''
+    component_refs = []
+    component_specs = [component_spec]
+    while component_specs:
+        spec = component_specs.pop()
+        if not isinstance(spec.implementation, GraphImplementation):
+            continue
+        for task_spec in spec.implementation.graph._toposorted_tasks.values():
+            if task_spec.component_ref.spec is not None:
+                component_specs.append(task_spec.component_ref.spec)
+            else:
+                component_refs.append(task_spec.component_ref)
+    return component_refs
+
+
+def _prefetch_graph_component_refs(component_spec: ComponentSpec, component_store) -> Mapping[tuple, Future]:
+    '''Loads all the component references of the graph concurrently.
+
+    The identical references are loaded once. The graph components loaded by the store are searched for more references as soon as they are loaded.
+
+    Returns:
+        The futures of the task factories keyed by _get_component_ref_key. The loading errors are raised by Future.result().
+    '''
+    futures = {}
+    component_refs = _get_graph_component_refs_to_load(component_spec)
+    if not component_refs:
+        return futures
+
+    with ThreadPoolExecutor(max_workers=_max_component_prefetch_workers) as executor:
+        def submit(component_refs):
+            new_futures = []
+            for component_ref in component_refs:
+                key = _get_component_ref_key(component_ref)
+                if key not in futures:
+                    futures[key] = executor.submit(component_store._load_component_from_ref, component_ref)
+                    new_futures.append(futures[key])
+            return new_futures
+
+        pending = set(submit(component_refs))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    pending.update(submit(_get_graph_component_refs_to_load(future.result().component_spec)))
+    return futures
+
+
 def _resolve_graph_task(
     component_spec: ComponentSpec,
     arguments: Mapping[str, Any],
     component_ref: ComponentReference = None,
+) -> TaskSpec:
+    prefetched_task_factories = getattr(_prefetch_state, 'task_factories', None)
+    if prefetched_task_factories is not None:
+        #Nested graph component
+        return _resolve_graph_task_with_task_factories(component_spec, arguments, component_ref, prefetched_task_factories)
+
+    from ..components import ComponentStore
+    component_store = ComponentStore.default_store
+    #The references are loaded up front, but the tasks are still constructed one by one in the topological order below.
+    _prefetch_state.task_factories = _prefetch_graph_component_refs(component_spec, component_store)
+    try:
+        return _resolve_graph_task_with_task_factories(component_spec, arguments, component_ref, _prefetch_state.task_factories)
+    finally:
+        _prefetch_state.task_factories = None
+
+
+def _resolve_graph_task_with_task_factories(
+    component_spec: ComponentSpec,
+    arguments: Mapping[str, Any],
+    component_ref: ComponentReference,
+    prefetched_task_factories: Mapping[tuple, Future],
 ) -> TaskSpec:
     from ..components import ComponentStore
     component_store = ComponentStore.default_store
 
+    def load_task_factory(task_component_ref: ComponentReference):
+        if task_component_ref.spec is None:
+            future = prefetched_task_factories.get(_get_component_ref_key(task_component_ref))
+            if future is not None:
+                return future.result()
+        return component_store._load_component_from_ref(task_component_ref)
+
     graph = component_spec.implementation.graph
 
     graph_input_arguments = {input.name: input.default for input in component_spec.inputs if input.default is not None}
@@ -502,7 +626,7 @@ def _resolve_graph_task(
             raise TypeError('Argument for input has unexpected type "{}".'.format(type(argument)))
 
     for task_id, task_spec in graph._toposorted_tasks.items(): # Cannot use graph.tasks here since they might be listed not in dependency order. Especially on python <3.6 where the dicts do not preserve ordering
-        task_factory = component_store._load_component_from_ref(task_spec.component_ref)
+        task_factory = load_task_factory(task_spec.component_ref)
         # TODO: Handle the case when optional graph component input is passed to optional task component input
         task_arguments = {input_name: resolve_argument(argument) for input_name, argument in task_spec.arguments.items()}
         task_component_spec = task_factory.component_spec
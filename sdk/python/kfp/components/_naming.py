@@ -67,13 +67,23 @@ def _generate_unique_suffix(data):
     return hashlib.sha256(string_data.encode()).hexdigest()[0:8]
 
 
-def _make_name_unique_by_adding_index(name:str, collection, delimiter:str):
+def _make_name_unique_by_adding_index(name:str, collection, delimiter:str, next_indices: dict = None):
+    '''Makes the name unique by adding the smallest index (starting from 2) that produces a name that is not in the collection.
+    The collection should support fast membership checks (e.g. dict, set or dict keys view).
+
+    next_indices: Optional dict that remembers the index search position for every base name.
+        When the same dict is passed for a collection that only grows, the search continues from where it stopped the last time,
+        so generating N names with the same base name costs O(N) instead of O(N^2). The generated names are the same.
+    '''
     unique_name = name
     if unique_name in collection:
-        for i in range(2, sys.maxsize**10):
+        start_index = next_indices.get(name, 2) if next_indices is not None else 2
+        for i in range(start_index, sys.maxsize**10):
             unique_name = name + delimiter + str(i)
             if unique_name not in collection:
                 break
+        if next_indices is not None:
+            next_indices[name] = i + 1
     return unique_name
 
 
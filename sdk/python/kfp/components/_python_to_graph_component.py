@@ -85,6 +85,7 @@ def create_graph_component_spec_from_pipeline_func(pipeline_func: Callable, embe
             raise TypeError('Graph component function parameter "{}" cannot have file-passing annotation "{}".'.format(input.name, input._passing_style))
 
     task_map = OrderedDict() #Preserving task order
+    task_id_next_indices = {}
 
     from ._components import _create_task_spec_from_component_and_arguments
     def task_construction_handler(
@@ -100,7 +101,7 @@ def create_graph_component_spec_from_pipeline_func(pipeline_func: Callable, embe
 
         #Rewriting task ids so that they're same every time
         task_id = task.component_ref.spec.name or "Task"
-        task_id = _make_name_unique_by_adding_index(task_id, task_map.keys(), ' ')
+        task_id = _make_name_unique_by_adding_index(task_id, task_map, ' ', task_id_next_indices)
         for output_ref in task.outputs.values():
             output_ref.task_output.task_id = task_id
             output_ref.task_output.task = None
@@ -17,6 +17,7 @@ __all__ = [
 ]
 
 import inspect
+import threading
 from collections import abc, OrderedDict
 from typing import Any, Callable, Dict, List, Mapping, MutableMapping, MutableSequence, Optional, Sequence, Tuple, Type, TypeVar, Union, cast, get_type_hints
 
@@ -24,155 +25,283 @@ from typing import Any, Callable, Dict, List, Mapping, MutableMapping, MutableSe
 T = TypeVar('T')
 
 
+class _LazyTypeError(TypeError):
+    '''TypeError whose message is only formatted when it is converted to string.
+    Parsing and verifying Union types creates and discards many errors. Formatting their messages, which include the objects, is expensive.'''
+    def __init__(self, message_format: str, *format_args):
+        super().__init__(message_format, *format_args)
+
+    def __str__(self):
+        return self.args[0].format(*self.args[1:])
+
+
+def _union_error(exceptions: List[Exception], message_format: str, *format_args) -> _LazyTypeError:
+    '''Creates the error listing the errors for each of the Union types followed by the message.'''
+    return _LazyTypeError('\n'.join(['{}'] * len(exceptions) + [message_format]), *(list(exceptions) + list(format_args)))
+
+
+class _StructKeys:
+    '''The structure keys of the class fields for a mapping of serialized names.'''
+    def __init__(self, field_names: List[str], serialized_names: Mapping[str, str]):
+        self.serialized_names = serialized_names
+        self.serialized_names_to_pythonic = {v: k for k, v in serialized_names.items()}
+        #If a pythonic name has a different original name, we forbid the pythonic name in the structure. Otherwise, this function would accept "python-styled" structures that should be invalid
+        self.forbidden_keys = set(self.serialized_names_to_pythonic.values()).difference(self.serialized_names_to_pythonic.keys())
+        self.keys = set(serialized_names.get(name, name) for name in field_names)
+
+
+class _ClassSchema:
+    '''The fields of a class and their types, as described by the class.__init__ method. Computed once per class.'''
+    def __init__(self, cls: type):
+        self.parameter_types = get_type_hints(cls.__init__) #Properlty resolves forward references
+        signature = inspect.signature(cls.__init__)
+        self.parameters = OrderedDict(list(signature.parameters.items())[1:]) #Skipping self
+        self.field_names = list(self.parameters)
+        self.has_var_keyword = any(param.kind == inspect.Parameter.VAR_KEYWORD for param in self.parameters.values())
+        self._struct_keys = None
+
+    def get_struct_keys(self, serialized_names: Mapping[str, str]) -> _StructKeys:
+        struct_keys = self._struct_keys
+        #The class always passes the same _serialized_names mapping, so the last computed keys are reused.
+        if struct_keys is None or struct_keys.serialized_names is not serialized_names:
+            struct_keys = _StructKeys(self.field_names, serialized_names)
+            self._struct_keys = struct_keys
+        return struct_keys
+
+
+_class_schemas = {}
+
+
+def _get_class_schema(cls: type) -> _ClassSchema:
+    schema = _class_schemas.get(cls, None)
+    if schema is None:
+        schema = _ClassSchema(cls)
+        _class_schemas[cls] = schema
+    return schema
+
+
+# The class of the object that parse_object_from_struct_based_on_class_init is constructing from already parsed arguments.
+_parsed_object_class = threading.local()
+
+
+_SEQUENCE_TYPES = [list, List, abc.Sequence, abc.MutableSequence, Sequence, MutableSequence]
+_MAPPING_TYPES = [dict, Dict, abc.Mapping, abc.MutableMapping, Mapping, MutableMapping, OrderedDict] #in Python <3.7 there is a difference between abc.Mapping and typing.Mapping
+
+
+def _get_cached(cache: dict, typ, create: Callable):
+    '''Returns the function that was created for the type, creating it on first use.'''
+    try:
+        func = cache.get(typ, None)
+    except TypeError: #Unhashable type
+        return create(typ)
+    if func is None:
+        func = create(typ)
+        cache[typ] = func
+    return func
+
+
+_type_verifiers = {}
+_type_parsers = {}
+
+
 def verify_object_against_type(x: Any, typ: Type[T]) -> T:
     '''Verifies that the object is compatible to the specified type (types from the typing package can be used).'''
-    #TODO: Merge with parse_object_from_struct_based_on_type which has almost the same code
+    return _get_cached(_type_verifiers, typ, _create_type_verifier)(x)
+
+
+def _create_type_verifier(typ: Type[T]) -> Callable[[Any], T]:
+    '''Creates the function that verifies the objects against the type. The type is only inspected once.'''
+    #TODO: Merge with _create_type_parser which has almost the same code
     if typ is type(None):
-        if x is None:
-            return x
-        else:
-            raise TypeError('Error: Object "{}" is not None.'.format(x))
+        def verify_none(x):
+            if x is None:
+                return x
+            else:
+                raise _LazyTypeError('Error: Object "{}" is not None.', x)
+        return verify_none
 
     if typ is Any or type(typ) is TypeVar:
-        return x
+        return lambda x: x
 
-    try: #isinstance can fail for generics
-        if isinstance(x, typ):
-            return cast(typ, x)
-    except:
-        pass
+    def verify_instance(x):
+        try: #isinstance can fail for generics
+            return isinstance(x, typ)
+        except:
+            return False
 
     if hasattr(typ, '__origin__'): #Handling generic types
         if typ.__origin__ is Union: #Optional == Union
-            exception_map = {}
             possible_types = typ.__args__
-            if type(None) in possible_types and x is None: #Shortcut for Optional[] tests. Can be removed, but the exceptions will be more noisy.
-                return x
-            for possible_type in possible_types:
-                try:
-                    verify_object_against_type(x, possible_type)
+            def verify_union(x):
+                if verify_instance(x):
+                    return cast(typ, x)
+                if type(None) in possible_types and x is None: #Shortcut for Optional[] tests. Can be removed, but the exceptions will be more noisy.
                     return x
-                except Exception as ex:
-                    exception_map[possible_type] = ex
-                    pass
-            #exception_lines = ['Exception for type {}: {}.'.format(t, e) for t, e in exception_map.items()]
-            exception_lines = [str(e) for t, e in exception_map.items()]
-            exception_lines.append('Error: Object "{}" is incompatible with type "{}".'.format(x, typ))
-            raise TypeError('\n'.join(exception_lines))
-
-        #not Union => not None
-        if x is None:
-            raise TypeError('Error: None object is incompatible with type {}'.format(typ))
+                exception_map = {}
+                for possible_type in possible_types:
+                    try:
+                        #The verifiers of the branches are created on first use, since some types cannot be verified at all.
+                        _get_cached(_type_verifiers, possible_type, _create_type_verifier)(x)
+                        return x
+                    except Exception as ex:
+                        exception_map[possible_type] = ex
+                        pass
+                raise _union_error(list(exception_map.values()), 'Error: Object "{}" is incompatible with type "{}".', x, typ)
+            return verify_union
 
         #assert isinstance(x, typ.__origin__)
         generic_type = typ.__origin__ or getattr(typ, '__extra__', None) #In python <3.7 typing.List.__origin__ == None; Python 3.7 has working __origin__, but no __extra__  TODO: Remove the __extra__ once we move to Python 3.7
-        if generic_type in [list, List, abc.Sequence, abc.MutableSequence, Sequence, MutableSequence] and type(x) is not str: #! str is also Sequence
-            if not isinstance(x, generic_type):
-                raise TypeError('Error: Object "{}" is incompatible with type "{}"'.format(x, typ))
-            type_args = typ.__args__ if typ.__args__ is not None else (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None)
-            inner_type = type_args[0]
-            for item in x:
-                verify_object_against_type(item, inner_type)
-            return x
-
-        elif generic_type in [dict, Dict, abc.Mapping, abc.MutableMapping, Mapping, MutableMapping, OrderedDict]:
-            if not isinstance(x, generic_type):
-                raise TypeError('Error: Object "{}" is incompatible with type "{}"'.format(x, typ))
-            type_args = typ.__args__ if typ.__args__ is not None else (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None)
-            inner_key_type = type_args[0]
-            inner_value_type = type_args[1]
-            for k, v in x.items():
-                verify_object_against_type(k, inner_key_type)
-                verify_object_against_type(v, inner_value_type)
-            return x
+        type_args = getattr(typ, '__args__', None) or (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None) and Python 3.9+ (where the bare typing.Dict has no __args__)
+
+        if generic_type in _SEQUENCE_TYPES:
+            verify_item = _get_cached(_type_verifiers, type_args[0], _create_type_verifier)
+        elif generic_type in _MAPPING_TYPES:
+            verify_key = _get_cached(_type_verifiers, type_args[0], _create_type_verifier)
+            verify_value = _get_cached(_type_verifiers, type_args[1], _create_type_verifier)
+
+        def verify_generic(x):
+            if verify_instance(x):
+                return cast(typ, x)
+
+            #not Union => not None
+            if x is None:
+                raise _LazyTypeError('Error: None object is incompatible with type {}', typ)
+
+            if generic_type in _SEQUENCE_TYPES and type(x) is not str: #! str is also Sequence
+                if not isinstance(x, generic_type):
+                    raise _LazyTypeError('Error: Object "{}" is incompatible with type "{}"', x, typ)
+                for item in x:
+                    verify_item(item)
+                return x
 
-        else:
-            raise TypeError('Error: Unsupported generic type "{}". type.__origin__ or type.__extra__ == "{}"'.format(typ, generic_type))
+            elif generic_type in _MAPPING_TYPES:
+                if not isinstance(x, generic_type):
+                    raise _LazyTypeError('Error: Object "{}" is incompatible with type "{}"', x, typ)
+                for k, v in x.items():
+                    verify_key(k)
+                    verify_value(v)
+                return x
+
+            else:
+                raise TypeError('Error: Unsupported generic type "{}". type.__origin__ or type.__extra__ == "{}"'.format(typ, generic_type))
+        return verify_generic
 
-    raise TypeError('Error: Object "{}" is incompatible with type "{}"'.format(x, typ))
+    def verify_class(x):
+        if verify_instance(x):
+            return cast(typ, x)
+        raise _LazyTypeError('Error: Object "{}" is incompatible with type "{}"', x, typ)
+    return verify_class
 
 
 def parse_object_from_struct_based_on_type(struct: Any, typ: Type[T]) -> T:
     '''Constructs an object from structure (usually dict) based on type. Supports list and dict types from the typing package plus Optional[] and Union[] types.
     If some type is a class that has .from_dict class method, that method is used for object construction.
     '''
+    return _get_cached(_type_parsers, typ, _create_type_parser)(struct)
+
+
+def _create_type_parser(typ: Type[T]) -> Callable[[Any], T]:
+    '''Creates the function that constructs the objects of the type from structures. The type is only inspected once.'''
     if typ is type(None):
-        if struct is None:
-            return None
-        else:
-            raise TypeError('Error: Structure "{}" is not None.'.format(struct))
+        def parse_none(struct):
+            if struct is None:
+                return None
+            else:
+                raise _LazyTypeError('Error: Structure "{}" is not None.', struct)
+        return parse_none
 
     if typ is Any or type(typ) is TypeVar:
-        return struct
-
-    try: #isinstance can fail for generics
-        #if (isinstance(struct, typ)
-        #    and not (typ is Sequence and type(struct) is str) #! str is also Sequence
-        #    and not (typ is int and type(struct) is bool) #! bool is int
-        #):
-        if type(struct) is typ:
-            return struct
-    except:
-        pass
+        return lambda struct: struct
+
+    def is_exact_type(struct):
+        try: #isinstance can fail for generics
+            #if (isinstance(struct, typ)
+            #    and not (typ is Sequence and type(struct) is str) #! str is also Sequence
+            #    and not (typ is int and type(struct) is bool) #! bool is int
+            #):
+            return type(struct) is typ
+        except:
+            return False
 
     if hasattr(typ, 'from_dict'):
-        try: #More informative errors
-            return typ.from_dict(struct)
-        except Exception as ex:
-            raise TypeError('Error: {}.from_dict(struct={}) failed with exception:\n{}'.format(typ.__name__, struct, str(ex)))
+        def parse_with_from_dict(struct):
+            if is_exact_type(struct):
+                return struct
+            try: #More informative errors
+                return typ.from_dict(struct)
+            except Exception as ex:
+                raise _LazyTypeError('Error: {}.from_dict(struct={}) failed with exception:\n{}', typ.__name__, struct, ex)
+        return parse_with_from_dict
+
     if hasattr(typ, '__origin__'): #Handling generic types
         if typ.__origin__ is Union: #Optional == Union
-            results = {}
-            exception_map = {}
             possible_types = list(typ.__args__)
-            #if type(None) in possible_types and struct is None: #Shortcut for Optional[] tests. Can be removed, but the exceptions will be more noisy.
-            #    return None
             #Hack for Python <3.7 which for some reason "simplifies" Union[bool, int, ...] to just Union[int, ...]
             if int in possible_types:
                 possible_types = possible_types + [bool]
-            for possible_type in possible_types:
-                try:
-                    obj = parse_object_from_struct_based_on_type(struct, possible_type)
-                    results[possible_type] = obj
-                except Exception as ex:
-                    exception_map[possible_type] = ex
-                    pass
-
-            #Single successful parsing.
-            if len(results) == 1:
-                return list(results.values())[0]
-
-            if len(results) > 1:
-                raise TypeError('Error: Structure "{}" is ambiguous. It can be parsed to multiple types: {}.'.format(struct, list(results.keys())))
-
-            exception_lines = [str(e) for t, e in exception_map.items()]
-            exception_lines.append('Error: Structure "{}" is incompatible with type "{}" - none of the types in Union are compatible.'.format(struct, typ))
-            raise TypeError('\n'.join(exception_lines))
-        #not Union => not None
-        if struct is None:
-            raise TypeError('Error: None structure is incompatible with type {}'.format(typ))
+            def parse_union(struct):
+                if is_exact_type(struct):
+                    return struct
+                results = {}
+                exception_map = {}
+                #if type(None) in possible_types and struct is None: #Shortcut for Optional[] tests. Can be removed, but the exceptions will be more noisy.
+                #    return None
+                for possible_type in possible_types:
+                    try:
+                        #The parsers of the branches are created on first use, since some types cannot be parsed at all.
+                        obj = _get_cached(_type_parsers, possible_type, _create_type_parser)(struct)
+                        results[possible_type] = obj
+                    except Exception as ex:
+                        exception_map[possible_type] = ex
+                        pass
+
+                #Single successful parsing.
+                if len(results) == 1:
+                    return list(results.values())[0]
+
+                if len(results) > 1:
+                    raise TypeError('Error: Structure "{}" is ambiguous. It can be parsed to multiple types: {}.'.format(struct, list(results.keys())))
+
+                raise _union_error(list(exception_map.values()), 'Error: Structure "{}" is incompatible with type "{}" - none of the types in Union are compatible.', struct, typ)
+            return parse_union
 
         #assert isinstance(x, typ.__origin__)
         generic_type = typ.__origin__ or getattr(typ, '__extra__', None) #In python <3.7 typing.List.__origin__ == None; Python 3.7 has working __origin__, but no __extra__  TODO: Remove the __extra__ once we move to Python 3.7
-        if generic_type in [list, List, abc.Sequence, abc.MutableSequence, Sequence, MutableSequence] and type(struct) is not str: #! str is also Sequence
-            if not isinstance(struct, generic_type):
-                raise TypeError('Error: Structure "{}" is incompatible with type "{}" - it does not have list type.'.format(struct, typ))
-            type_args = typ.__args__ if typ.__args__ is not None else (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None)
-            inner_type = type_args[0]
-            return [parse_object_from_struct_based_on_type(item, inner_type) for item in struct]
-
-        elif generic_type in [dict, Dict, abc.Mapping, abc.MutableMapping, Mapping, MutableMapping, OrderedDict]: #in Python <3.7 there is a difference between abc.Mapping and typing.Mapping
-            if not isinstance(struct, generic_type):
-                raise TypeError('Error: Structure "{}" is incompatible with type "{}" - it does not have dict type.'.format(struct, typ))
-            type_args = typ.__args__ if typ.__args__ is not None else (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None)
-            inner_key_type = type_args[0]
-            inner_value_type = type_args[1]
-            return {parse_object_from_struct_based_on_type(k, inner_key_type): parse_object_from_struct_based_on_type(v, inner_value_type) for k, v in struct.items()}
-
-        else:
-            raise TypeError('Error: Unsupported generic type "{}". type.__origin__ or type.__extra__ == "{}"'.format(typ, generic_type))
-
-    raise TypeError('Error: Structure "{}" is incompatible with type "{}". Structure is not the instance of the type, the type does not have .from_dict method and is not generic.'.format(struct, typ))
+        type_args = getattr(typ, '__args__', None) or (Any, Any) #Workaround for Python <3.7 (where Mapping.__args__ is None) and Python 3.9+ (where the bare typing.Dict has no __args__)
+
+        if generic_type in _SEQUENCE_TYPES:
+            parse_item = _get_cached(_type_parsers, type_args[0], _create_type_parser)
+        elif generic_type in _MAPPING_TYPES:
+            parse_key = _get_cached(_type_parsers, type_args[0], _create_type_parser)
+            parse_value = _get_cached(_type_parsers, type_args[1], _create_type_parser)
+
+        def parse_generic(struct):
+            if is_exact_type(struct):
+                return struct
+
+            #not Union => not None
+            if struct is None:
+                raise _LazyTypeError('Error: None structure is incompatible with type {}', typ)
+
+            if generic_type in _SEQUENCE_TYPES and type(struct) is not str: #! str is also Sequence
+                if not isinstance(struct, generic_type):
+                    raise _LazyTypeError('Error: Structure "{}" is incompatible with type "{}" - it does not have list type.', struct, typ)
+                return [parse_item(item) for item in struct]
+
+            elif generic_type in _MAPPING_TYPES:
+                if not isinstance(struct, generic_type):
+                    raise _LazyTypeError('Error: Structure "{}" is incompatible with type "{}" - it does not have dict type.', struct, typ)
+                return {parse_key(k): parse_value(v) for k, v in struct.items()}
+
+            else:
+                raise TypeError('Error: Unsupported generic type "{}". type.__origin__ or type.__extra__ == "{}"'.format(typ, generic_type))
+        return parse_generic
+
+    def parse_class(struct):
+        if is_exact_type(struct):
+            return struct
+        raise _LazyTypeError('Error: Structure "{}" is incompatible with type "{}". Structure is not the instance of the type, the type does not have .from_dict method and is not generic.', struct, typ)
+    return parse_class
 
 
 def convert_object_to_struct(obj, serialized_names: Mapping[str, str] = {}):
@@ -181,9 +310,9 @@ def convert_object_to_struct(obj, serialized_names: Mapping[str, str] = {}):
     If the type of some property is a class that has .to_dict class method, that method is used for conversion.
     Used by the ModelBase class.
     '''
-    signature = inspect.signature(obj.__init__) #Needed for default values
+    parameters = _get_class_schema(type(obj)).parameters #Needed for default values
     result = {}
-    for python_name in signature.parameters: #TODO: Make it possible to specify the field ordering regardless of the presence of default values
+    for python_name in parameters: #TODO: Make it possible to specify the field ordering regardless of the presence of default values
         value = getattr(obj, python_name)
         if python_name.startswith('_'):
             continue
@@ -195,7 +324,7 @@ def convert_object_to_struct(obj, serialized_names: Mapping[str, str] = {}):
         elif isinstance(value, dict):
             result[attr_name] = {k: (v.to_dict() if hasattr(v, 'to_dict') else v) for k, v in value.items()}
         else:
-            param = signature.parameters.get(python_name, None)
+            param = parameters.get(python_name, None)
             if param is None or param.default == inspect.Parameter.empty or value != param.default:
                 result[attr_name] = value
 
@@ -211,11 +340,18 @@ def parse_object_from_struct_based_on_class_init(cls : Type[T], struct: Mapping,
 
     serialized_names: specifies the mapping between __init__ parameter names and the structure key names for cases where these names are different (due to language syntax clashes or style differences).
     '''
-    parameter_types = get_type_hints(cls.__init__) #Properlty resolves forward references
+    schema = _get_class_schema(cls)
+    struct_keys = schema.get_struct_keys(serialized_names)
+    parameter_types = schema.parameter_types
+    serialized_names_to_pythonic = struct_keys.serialized_names_to_pythonic
+    forbidden_struct_keys = struct_keys.forbidden_keys
+
+    #Rejecting the unknown keys before parsing the values. It makes the failed attempts to parse Union types cheap.
+    if isinstance(struct, abc.Mapping) and not schema.has_var_keyword:
+        unknown_keys = [key for key in struct if key not in struct_keys.keys and key not in forbidden_struct_keys]
+        if unknown_keys:
+            raise _LazyTypeError('Error: Structure "{}" has keys {} that are not fields of {}.', struct, unknown_keys, cls.__name__)
 
-    serialized_names_to_pythonic = {v: k for k, v in serialized_names.items()}
-    #If a pythonic name has a different original name, we forbid the pythonic name in the structure. Otherwise, this function would accept "python-styled" structures that should be invalid
-    forbidden_struct_keys = set(serialized_names_to_pythonic.values()).difference(serialized_names_to_pythonic.keys())
     args = {}
     for original_name, value in struct.items():
         if original_name in forbidden_struct_keys:
@@ -227,7 +363,14 @@ def parse_object_from_struct_based_on_class_init(cls : Type[T], struct: Mapping,
         else:
             args[python_name] = value
 
-    return cls(**args)
+    if not issubclass(cls, ModelBase):
+        return cls(**args)
+    #The arguments were parsed based on the same type hints, so the ModelBase constructor does not need to verify them again.
+    _parsed_object_class.cls = cls
+    try:
+        return cls(**args)
+    finally:
+        _parsed_object_class.cls = None
 
 
 class ModelBase:
@@ -257,8 +400,13 @@ class ModelBase:
     '''
     _serialized_names = {}
     def __init__(self, args):
-        parameter_types = get_type_hints(self.__class__.__init__)
         field_values = {k: v for k, v in args.items() if k != 'self' and not k.startswith('_')}
+        if getattr(_parsed_object_class, 'cls', None) is self.__class__:
+            #Only the object that is being constructed by the parser is trusted, not the objects that its constructor may create.
+            _parsed_object_class.cls = None
+            self.__dict__.update(field_values)
+            return
+        parameter_types = _get_class_schema(self.__class__).parameter_types
         for k, v in field_values.items():
             parameter_type = parameter_types.get(k, None)
             if parameter_type is not None:
@@ -276,7 +424,7 @@ class ModelBase:
         return convert_object_to_struct(self, serialized_names=self._serialized_names)
     
     def _get_field_names(self):
-        return list(inspect.signature(self.__init__).parameters)
+        return _get_class_schema(self.__class__).field_names
 
     def __repr__(self):
         return self.__class__.__name__ + '(' + ', '.join(param + '=' + repr(getattr(self, param)) for param in self._get_field_names()) + ')'
@@ -11,12 +11,15 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Dict, Union, Any
+from typing import TYPE_CHECKING, Dict, Union, Any
 
-from argo.models import V1alpha1ArtifactLocation, V1alpha1S3Artifact, V1alpha1Artifact
 from deprecated.sphinx import deprecated
 from kubernetes.client.models import V1SecretKeySelector
 
+if TYPE_CHECKING:
+    # The argo models are only imported when they are used, since importing them is slow.
+    from argo.models import V1alpha1Artifact, V1alpha1ArtifactLocation
+
 
 def _dict_to_secret(
     value: Union[V1SecretKeySelector, Dict[str, Any]]
@@ -45,7 +48,7 @@ class ArtifactLocation:
         region: str = None,
         access_key_secret: Union[V1SecretKeySelector, Dict[str, Any]] = None,
         secret_key_secret: Union[V1SecretKeySelector, Dict[str, Any]] = None,
-    ) -> V1alpha1ArtifactLocation:
+    ) -> 'V1alpha1ArtifactLocation':
         """
         Creates a new instance of V1alpha1ArtifactLocation with a s3 artifact
         backend.
@@ -76,6 +79,8 @@ class ArtifactLocation:
         Returns:
           V1alpha1ArtifactLocation: a new instance of V1alpha1ArtifactLocation.
         """
+        # argo.models takes long to import and is only needed here.
+        from argo.models import V1alpha1ArtifactLocation, V1alpha1S3Artifact
         return V1alpha1ArtifactLocation(
             s3=V1alpha1S3Artifact(
                 bucket=bucket,
@@ -90,12 +95,12 @@ class ArtifactLocation:
 
     @staticmethod
     def create_artifact_for_s3(
-        artifact_location: Union[V1alpha1ArtifactLocation, Dict[str, Any]],
+        artifact_location: Union['V1alpha1ArtifactLocation', Dict[str, Any]],
         name: str,
         path: str,
         key: str,
         **kwargs
-    ) -> V1alpha1Artifact:
+    ) -> 'V1alpha1Artifact':
         """
         Creates a s3-backed `V1alpha1Artifact` object using a
         `V1alpha1ArtifactLocation` object.
@@ -112,6 +117,7 @@ class ArtifactLocation:
         Returns:
           V1alpha1Artifact: V1alpha1Artifact object.
         """
+        from argo.models import V1alpha1Artifact, V1alpha1S3Artifact
         if not artifact_location:
             return V1alpha1Artifact(
                 name=name,
@@ -14,9 +14,8 @@
 import collections
 import re
 import warnings
-from typing import Any, Dict, List, TypeVar, Union, Callable, Optional, Sequence
+from typing import TYPE_CHECKING, Any, Dict, List, TypeVar, Union, Callable, Optional, Sequence
 
-from argo.models import V1alpha1ArtifactLocation
 from kubernetes.client import V1Toleration, V1Affinity
 from kubernetes.client.models import (
     V1Container, V1EnvVar, V1EnvFromSource, V1SecurityContext, V1Probe,
@@ -27,6 +26,10 @@ from kubernetes.client.models import (
 from . import _pipeline_param
 from ..components.structures import ComponentSpec
 
+if TYPE_CHECKING:
+    # The argo models are only imported when they are used, since importing them is slow.
+    from argo.models import V1alpha1ArtifactLocation
+
 # generics
 T = TypeVar('T')
 # type alias: either a string or a list of string
@@ -93,6 +96,31 @@ def create_and_append(current_list: Union[List[T], None], item: T) -> List[T]:
     return current_list
 
 
+class _LazyCollection(object):
+    """Descriptor of an op attribute holding a list or a dict that is only created when it is first accessed.
+
+    Most ops never set most of their optional collections, so the value is stored in a private slot
+    that holds None until the collection is accessed through the attribute.
+    """
+    __slots__ = ('slot_name', 'factory')
+
+    def __init__(self, slot_name: str, factory: Callable):
+        self.slot_name = slot_name
+        self.factory = factory
+
+    def __get__(self, op, owner):
+        if op is None:
+            return self
+        value = getattr(op, self.slot_name)
+        if value is None:
+            value = self.factory()
+            setattr(op, self.slot_name, value)
+        return value
+
+    def __set__(self, op, value):
+        setattr(op, self.slot_name, value)
+
+
 class Container(V1Container):
     """
     A wrapper over k8s container definition object (io.k8s.api.core.v1.Container),
@@ -683,6 +711,27 @@ class BaseOp(object):
         'num_retries', 'init_containers', 'sidecars', 'tolerations'
     ]
 
+    # The attributes are stored in slots to keep big pipelines small in memory.
+    # The `__dict__` slot keeps the ops extensible: it is only created when an
+    # attribute that is not listed here is set.
+    __slots__ = (
+        'is_exit_handler', 'human_name', 'display_name', 'name',
+        '_node_selector', '_volumes', '_tolerations', '_affinity',
+        '_pod_annotations', '_pod_labels', 'num_retries', 'timeout',
+        '_init_containers', '_sidecars', 'loop_args', '_inputs',
+        '_dependent_names', '__dict__', '__weakref__',
+    )
+
+    node_selector = _LazyCollection('_node_selector', dict)
+    volumes = _LazyCollection('_volumes', list)
+    tolerations = _LazyCollection('_tolerations', list)
+    affinity = _LazyCollection('_affinity', dict)
+    pod_annotations = _LazyCollection('_pod_annotations', dict)
+    pod_labels = _LazyCollection('_pod_labels', dict)
+    init_containers = _LazyCollection('_init_containers', list)
+    sidecars = _LazyCollection('_sidecars', list)
+    dependent_names = _LazyCollection('_dependent_names', list)
+
     def __init__(self,
                  name: str,
                  init_containers: List[UserContainer] = None,
@@ -721,23 +770,24 @@ class BaseOp(object):
 
         # TODO: proper k8s definitions so that `convert_k8s_obj_to_json` can be used?
         # `io.argoproj.workflow.v1alpha1.Template` properties
-        self.node_selector = {}
-        self.volumes = []
-        self.tolerations = []
-        self.affinity = {}
-        self.pod_annotations = {}
-        self.pod_labels = {}
+        # The empty collections are created when they are first accessed.
+        self._node_selector = None
+        self._volumes = None
+        self._tolerations = None
+        self._affinity = None
+        self._pod_annotations = None
+        self._pod_labels = None
         self.num_retries = 0
         self.timeout = 0
-        self.init_containers = init_containers or []
-        self.sidecars = sidecars or []
+        self._init_containers = init_containers or None
+        self._sidecars = sidecars or None
 
         # used to mark this op with loop arguments
         self.loop_args = None
 
         # attributes specific to `BaseOp`
-        self._inputs = []
-        self.dependent_names = []
+        self._inputs = None
+        self._dependent_names = None
 
     @property
     def inputs(self):
@@ -748,12 +798,9 @@ class BaseOp(object):
         # called the 1st time (because there are in-place updates to `PipelineParam`
         # during compilation - remove in-place updates for easier debugging?)
         if not self._inputs:
-            self._inputs = []
             # TODO replace with proper k8s obj?
-            for key in self.attrs_with_pipelineparams:
-                self._inputs += _pipeline_param.extract_pipelineparams_from_any(getattr(self, key))
-            # keep only unique
-            self._inputs = list(set(self._inputs))
+            self._inputs = _pipeline_param.extract_pipelineparams_from_any(
+                [self._get_attr_value(key) for key in self.attrs_with_pipelineparams])
         return self._inputs
 
     @inputs.setter
@@ -761,6 +808,13 @@ class BaseOp(object):
         # to support in-place updates
         self._inputs = value
 
+    def _get_attr_value(self, name: str):
+        """Returns the value of the attribute. The collections that were never accessed are returned as None instead of being created."""
+        attribute = getattr(type(self), name, None)
+        if isinstance(attribute, _LazyCollection):
+            return getattr(self, attribute.slot_name)
+        return getattr(self, name)
+
     def apply(self, mod_func):
         """Applies a modifier function to self. The function should return the passed object.
         This is needed to chain "extention methods" to this class.
@@ -900,7 +954,13 @@ class BaseOp(object):
         return self
 
     def __repr__(self):
-        return str({self.__class__.__name__: self.__dict__})
+        attributes = {}
+        for cls in reversed(type(self).__mro__):
+            for slot_name in getattr(cls, '__slots__', ()):
+                if slot_name not in ('__dict__', '__weakref__') and hasattr(self, slot_name):
+                    attributes[slot_name] = getattr(self, slot_name)
+        attributes.update(getattr(self, '__dict__', {}))
+        return str({self.__class__.__name__: attributes})
 
 
 from ._pipeline_volume import PipelineVolume  # The import is here to prevent circular reference problems.
@@ -952,6 +1012,22 @@ class ContainerOp(BaseOp):
     # the input parameters during compilation.
     # Excludes `file_outputs` and `outputs` as they are handled separately
     # in the compilation process to generate the DAGs and task io parameters.
+    attrs_with_pipelineparams = BaseOp.attrs_with_pipelineparams + ['_container', 'artifact_location', 'artifact_arguments']
+
+    __slots__ = (
+        '_container', '_input_artifact_paths', '_artifact_arguments', 'file_outputs',
+        '_output_artifact_paths', 'artifact_location', '_metadata', '_outputs', 'output',
+        '_pvolumes', 'pvolume',
+    )
+
+    input_artifact_paths = _LazyCollection('_input_artifact_paths', dict)
+    artifact_arguments = _LazyCollection('_artifact_arguments', dict)
+    output_artifact_paths = _LazyCollection('_output_artifact_paths', dict)
+    outputs = _LazyCollection('_outputs', dict)
+    pvolumes = _LazyCollection('_pvolumes', dict)
+
+    # attributes of `Container` that are not proxied to `ContainerOp`
+    _NOT_PROXIED_CONTAINER_ATTRIBUTES = frozenset(['to_dict', 'to_str'])
 
     def __init__(
       self,
@@ -965,7 +1041,7 @@ class ContainerOp(BaseOp):
       artifact_argument_paths: List[InputArgumentPath] = None,
       file_outputs: Dict[str, str] = None,
       output_artifact_paths: Dict[str, str]=None,
-      artifact_location: V1alpha1ArtifactLocation=None,
+      artifact_location: 'V1alpha1ArtifactLocation'=None,
       is_exit_handler=False,
       pvolumes: Dict[str, V1Volume] = None,
     ):
@@ -1007,7 +1083,6 @@ class ContainerOp(BaseOp):
         """
 
         super().__init__(name=name, init_containers=init_containers, sidecars=sidecars, is_exit_handler=is_exit_handler)
-        self.attrs_with_pipelineparams = BaseOp.attrs_with_pipelineparams + ['_container', 'artifact_location', 'artifact_arguments'] #Copying the BaseOp class variable!
 
         input_artifact_paths = {}
         artifact_arguments = {}
@@ -1041,34 +1116,6 @@ class ContainerOp(BaseOp):
         self._container = Container(
             image=image, args=arguments, command=command, **container_kwargs)
 
-        # NOTE for backward compatibility (remove in future?)
-        # proxy old ContainerOp callables to Container
-
-        # attributes to NOT proxy
-        ignore_set = frozenset(['to_dict', 'to_str'])
-
-        # decorator func to proxy a method in `Container` into `ContainerOp`
-        def _proxy(proxy_attr):
-            """Decorator func to proxy to ContainerOp.container"""
-
-            def _decorated(*args, **kwargs):
-                # execute method
-                ret = getattr(self._container, proxy_attr)(*args, **kwargs)
-                if ret == self._container:
-                    return self
-                return ret
-
-            return deprecation_warning(_decorated, proxy_attr, proxy_attr)
-
-        # iter thru container and attach a proxy func to the container method
-        for attr_to_proxy in dir(self._container):
-            func = getattr(self._container, attr_to_proxy)
-            # ignore private methods
-            if hasattr(func, '__call__') and (attr_to_proxy[0] != '_') and (
-                    attr_to_proxy not in ignore_set):
-                # only proxy public callables
-                setattr(self, attr_to_proxy, _proxy(attr_to_proxy))
-
         # Special handling for the mlpipeline-ui-metadata and mlpipeline-metrics outputs that should always be saved as artifacts
         # TODO: Remove when outputs are always saved as artifacts
         for output_name, path in dict(file_outputs).items():
@@ -1078,10 +1125,10 @@ class ContainerOp(BaseOp):
                 del file_outputs[output_name]
 
         # attributes specific to `ContainerOp`
-        self.input_artifact_paths = input_artifact_paths
-        self.artifact_arguments = artifact_arguments
+        self._input_artifact_paths = input_artifact_paths or None
+        self._artifact_arguments = artifact_arguments or None
         self.file_outputs = file_outputs
-        self.output_artifact_paths = output_artifact_paths or {}
+        self._output_artifact_paths = output_artifact_paths or None
         self.artifact_location = artifact_location
 
         if artifact_location:
@@ -1089,21 +1136,44 @@ class ContainerOp(BaseOp):
 
         self._metadata = None
 
-        self.outputs = {}
+        self._outputs = None
         if file_outputs:
-            self.outputs = {
+            self._outputs = {
                 name: _pipeline_param.PipelineParam(name, op_name=self.name)
                 for name in file_outputs.keys()
             }
 
-        if len(self.outputs) == 1:
-            self.output = list(self.outputs.values())[0]
+        if file_outputs and len(self._outputs) == 1:
+            self.output = list(self._outputs.values())[0]
         else:
-            self.output = _MultipleOutputsError()
+            self.output = _MULTIPLE_OUTPUTS_ERROR
 
-        self.pvolumes = {}
+        self._pvolumes = None
+        self.pvolume = None
         self.add_pvolumes(pvolumes)
 
+    def __getattr__(self, name):
+        # NOTE for backward compatibility (remove in future?)
+        # proxy old ContainerOp callables to Container.
+        # The proxies are created on access instead of being attached to every op.
+        if name.startswith('_') or name in self._NOT_PROXIED_CONTAINER_ATTRIBUTES:
+            raise AttributeError(name)
+        try:
+            container = object.__getattribute__(self, '_container')
+        except AttributeError:
+            raise AttributeError(name)
+        func = getattr(container, name, None)
+        if not callable(func):
+            raise AttributeError(name)
+
+        def _decorated(*args, **kwargs):
+            ret = func(*args, **kwargs)
+            if ret == container:
+                return self
+            return ret
+
+        return deprecation_warning(_decorated, name, name)
+
 
     @property
     def command(self):
@@ -1188,8 +1258,8 @@ class ContainerOp(BaseOp):
                 ))
 
         self.pvolume = None
-        if len(self.pvolumes) == 1:
-            self.pvolume = list(self.pvolumes.values())[0]
+        if self._pvolumes and len(self._pvolumes) == 1:
+            self.pvolume = list(self._pvolumes.values())[0]
         return self
 
 
@@ -1208,3 +1278,7 @@ class _MultipleOutputsError:
 
     def __str__(self):
         _MultipleOutputsError.raise_error()
+
+
+# The error has no state, so all the ops with several outputs share the same instance.
+_MULTIPLE_OUTPUTS_ERROR = _MultipleOutputsError()
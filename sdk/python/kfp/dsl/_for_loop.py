@@ -1,5 +1,6 @@
+import json
 import re
-from typing import List, Union, Dict, Text, Any, Tuple, Optional
+from typing import Iterable, List, Union, Dict, Text, Any, Tuple, Optional
 
 from kfp import dsl
 
@@ -15,6 +16,8 @@ class LoopArguments(dsl.PipelineParam):
     # number of characters in the code which is passed to the constructor
     NUM_CODE_CHARS = 8
     LEGAL_SUBVAR_NAME_REGEX = re.compile(r'[a-zA-Z_][0-9a-zA-Z_]*')
+    # The key of the sharded dict items that holds the whole shard.
+    SHARD_ITEMS_KEY = 'kfp_shard_items'
 
     @classmethod
     def _subvar_name_is_legal(cls, proposed_variable_name: Text):
@@ -41,7 +44,9 @@ class LoopArguments(dsl.PipelineParam):
         if isinstance(items, tuple):
             items = list(items)
 
-        if isinstance(items, list) and isinstance(items[0], dict):
+        # Whether the items are dicts whose keys are exposed as item attributes.
+        self.items_are_dicts = isinstance(items, list) and len(items) > 0 and isinstance(items[0], dict)
+        if self.items_are_dicts:
             subvar_names = set(items[0].keys())
             for item in items:
                 if not set(item.keys()) == subvar_names:
@@ -57,6 +62,8 @@ class LoopArguments(dsl.PipelineParam):
 
         self.items_or_pipeline_param = items
         self.referenced_subvar_names = []
+        # The number of items passed to each loop iteration. None passes the items one by one.
+        self.shard_size = None
 
     @classmethod
     def from_pipeline_param(cls, param: dsl.PipelineParam) -> 'LoopArguments':
@@ -81,6 +88,34 @@ class LoopArguments(dsl.PipelineParam):
             raise ValueError("You should only call this method on loop args which have list items, "
                              "not pipeline param items.")
 
+    def to_sharded_list_for_task_yaml(self, subvar_names: Iterable[Text] = (), include_shard_items: bool = True):
+        """Groups the items into shards of shard_size items. Every loop iteration gets one shard.
+
+        For a list of plain items, every shard is the JSON list of its items.
+        For a list of dicts, every shard is a dict that maps each of the subvar_names to the JSON list of the
+        values of that key in the shard and, if include_shard_items is true, SHARD_ITEMS_KEY to the JSON list of the
+        items of the shard.
+        """
+        items = self.to_list_for_task_yaml()
+        shards = [items[start:start + self.shard_size] for start in range(0, len(items), self.shard_size)]
+        if not self.items_are_dicts:
+            return [json.dumps(shard, sort_keys=True) for shard in shards]
+
+        for index, item in enumerate(items):
+            missing_names = [subvar_name for subvar_name in subvar_names if subvar_name not in item]
+            if missing_names:
+                raise ValueError('Item {} of the loop does not have the keys {}: {}.'.format(index, missing_names, item))
+        sharded_items = []
+        for shard in shards:
+            sharded_item = {
+                subvar_name: json.dumps([item[subvar_name] for item in shard], sort_keys=True)
+                for subvar_name in subvar_names
+            }
+            if include_shard_items:
+                sharded_item[self.SHARD_ITEMS_KEY] = json.dumps(shard, sort_keys=True)
+            sharded_items.append(sharded_item)
+        return sharded_items
+
     @classmethod
     def _make_name(cls, code: Text):
         """Make a name for this parameter.  Code is a """
@@ -173,6 +173,14 @@ class ParallelFor(OpsGroup):
     op2 = ContainerOp(..., args=['echo {}'.format(item.b])
   ```
   and op1 would be executed twice, once with args=['echo 1'] and once with args=['echo 2']
+
+  A static list of items can be sharded, so that every loop iteration processes several items:
+  ```python
+  with dsl.ParallelFor(list(range(10000)), shard_size=100) as items:
+    op1 = ContainerOp(..., args=['process-all', items])
+  ```
+  and op1 would be executed 100 times, each time with the JSON list of 100 items. The item attributes
+  (item.a for a list of dicts) are the JSON lists of the attribute values of the items of the shard.
   """
   TYPE_NAME = 'for_loop'
 
@@ -180,7 +188,18 @@ class ParallelFor(OpsGroup):
   def _get_unique_id_code():
     return uuid.uuid4().hex[:_for_loop.LoopArguments.NUM_CODE_CHARS]
 
-  def __init__(self, loop_args: Union[_for_loop.ItemList, _pipeline_param.PipelineParam]):
+  def __init__(self,
+               loop_args: Union[_for_loop.ItemList, _pipeline_param.PipelineParam],
+               shard_size: int = None,
+               max_shards: int = None):
+    """Create a new instance of ParallelFor.
+
+    Args:
+      loop_args: The static list of items or the PipelineParam to loop over.
+      shard_size: The number of items of a static list passed to each loop iteration.
+      max_shards: The maximum number of loop iterations over a static list. The items are evenly
+        distributed over the iterations. Cannot be used with shard_size.
+    """
     self.items_is_pipeline_param = isinstance(loop_args, _pipeline_param.PipelineParam)
 
     # use a random code to uniquely identify this loop
@@ -194,6 +213,22 @@ class ParallelFor(OpsGroup):
       # we were passed a raw list, wrap it in loop args
       loop_args = _for_loop.LoopArguments(loop_args, code)
 
+    if shard_size is not None or max_shards is not None:
+      if self.items_is_pipeline_param:
+        raise ValueError('Sharding is only supported for static lists of items.')
+      if shard_size is not None and max_shards is not None:
+        raise ValueError('Either shard_size or max_shards can be specified but not both.')
+      if (shard_size is not None and shard_size < 1) or (max_shards is not None and max_shards < 1):
+        raise ValueError('shard_size and max_shards must be positive.')
+      items = loop_args.to_list_for_task_yaml()
+      if not items:
+        raise ValueError('Cannot shard an empty list of items.')
+      if loop_args.items_are_dicts and _for_loop.LoopArguments.SHARD_ITEMS_KEY in items[0]:
+        raise ValueError('The item key {} is reserved for sharded loops.'.format(_for_loop.LoopArguments.SHARD_ITEMS_KEY))
+      if max_shards is not None:
+        shard_size = -(-len(items) // max_shards)
+      loop_args.shard_size = shard_size
+
     self.loop_args = loop_args
 
   def __enter__(self) -> _for_loop.LoopArguments:
@@ -61,6 +61,9 @@ class PipelineConf():
     self.ttl_seconds_after_finished = -1
     self.artifact_location = None
     self.op_transformers = []
+    self.deduplicate_templates = False
+    self.data_offloading_threshold = None
+    self.data_offloading_upload_func = None
 
   def set_image_pull_secrets(self, image_pull_secrets):
     """Configures the pipeline level imagepullsecret
@@ -133,6 +136,48 @@ class PipelineConf():
     """
     self.op_transformers.append(transformer)
 
+  def set_deduplicate_templates(self, deduplicate_templates: bool = True):
+    """Configures whether the compiler shares the templates that only differ by their name.
+
+    When the same component is used many times, the compiler generates one template per task.
+    With deduplication, every unique template is only generated once and all the tasks use it,
+    which makes the compiled workflow smaller.
+
+    Args:
+      deduplicate_templates: whether to deduplicate the templates.
+    """
+    self.deduplicate_templates = deduplicate_templates
+    return self
+
+  def set_data_offloading(self, size_threshold: int, upload_func):
+    """Configures the compiler to move the big raw artifact data out of the workflow.
+
+    The compiled workflow inlines the constant data passed to the artifact inputs.
+    With offloading, the data bigger than size_threshold bytes is uploaded to the
+    pipeline level artifact location (see set_artifact_location) at compile time
+    and the artifacts reference it, so the workflow stays small.
+
+    Example::
+
+      from minio import Minio
+
+      minio_client = Minio('minio-service:9000', access_key='...', secret_key='...', secure=False)
+
+      def upload_to_minio(key, data):
+        data = data.encode('utf-8')
+        minio_client.put_object('foo', key, io.BytesIO(data), len(data))
+
+      get_pipeline_conf().set_artifact_location(artifact_location).set_data_offloading(100000, upload_to_minio)
+
+    Args:
+      size_threshold: size in bytes above which the data is moved to the artifact location.
+      upload_func: a function that takes a bucket key and the data (str) and uploads the data
+        to the bucket of the artifact location.
+    """
+    self.data_offloading_threshold = size_threshold
+    self.data_offloading_upload_func = upload_func
+    return self
+
 
 def get_pipeline_conf():
   """Configure the pipeline level setting to the current pipeline
@@ -179,6 +224,8 @@ class Pipeline():
     """
     self.name = name
     self.ops = {}
+    # Next index to try for every op base name. Makes unique name generation amortized O(1).
+    self._op_name_next_indices = {}
     # Add the root group.
     self.groups = [_ops_group.OpsGroup('pipeline', name=name)]
     self.group_id = 0
@@ -215,7 +262,7 @@ class Pipeline():
       op_name: a unique op name.
     """
     #If there is an existing op with this name then generate a new name.
-    op_name = _make_name_unique_by_adding_index(op.human_name, list(self.ops.keys()), ' ')
+    op_name = _make_name_unique_by_adding_index(op.human_name, self.ops, ' ', self._op_name_next_indices)
 
     self.ops[op_name] = op
     if not define_only:
@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import operator
 import re
 from collections import namedtuple
 from typing import List, Dict, Union
@@ -81,8 +82,55 @@ def _extract_pipelineparams(payloads: str or List[str]):
   return pipeline_params
 
 
+# The serialized PipelineParams all start with this marker. Strings that do not
+# contain it are not searched with the regular expression.
+_PIPELINEPARAM_MARKER = '{{pipelineparam:'
+
+# Cache of the attribute walkers of the k8s swagger/openapi model classes.
+# The key is the class and the value is the walker, or None if the class is
+# not a k8s model.
+_k8s_attribute_walkers = {}
+
+
+def _make_attribute_walker(attribute_types: dict):
+  """Returns a function that returns the values of the attributes in reverse order."""
+  attribute_names = list(reversed(list(attribute_types.keys())))
+  if not attribute_names:
+    return None
+  if len(attribute_names) == 1:
+    get_attribute = operator.attrgetter(attribute_names[0])
+    return lambda payload: (get_attribute(payload),)
+  return operator.attrgetter(*attribute_names)
+
+
+def _get_k8s_attribute_walker(payload):
+  """Returns the attribute walker of a k8s swagger/openapi object, or None if the payload is not one."""
+  payload_class = type(payload)
+  try:
+    return _k8s_attribute_walkers[payload_class]
+  except KeyError:
+    pass
+  for types_attribute in ['swagger_types', 'openapi_types']:
+    attribute_types = getattr(payload_class, types_attribute, None)
+    if isinstance(attribute_types, dict):
+      walker = _make_attribute_walker(attribute_types)
+      _k8s_attribute_walkers[payload_class] = walker
+      return walker
+  # The attribute types are only set on the instance, so the walker cannot be cached.
+  for types_attribute in ['swagger_types', 'openapi_types']:
+    attribute_types = getattr(payload, types_attribute, None)
+    if isinstance(attribute_types, dict):
+      return _make_attribute_walker(attribute_types)
+  _k8s_attribute_walkers[payload_class] = None
+  return None
+
+
 def extract_pipelineparams_from_any(payload) -> List['PipelineParam']:
-  """Recursively extract PipelineParam instances or serialized string from any object or list of objects.
+  """Extract PipelineParam instances or serialized string from any object or list of objects.
+
+  The payload is traversed once and the PipelineParams are deduplicated by their
+  op name and name. When a PipelineParam is found several times, the first one
+  in the traversal order is returned.
 
   Args:
     payload (str or k8_obj or list[str or k8_obj]): a string/a list 
@@ -91,49 +139,40 @@ def extract_pipelineparams_from_any(payload) -> List['PipelineParam']:
   Return:
     List[PipelineParam]
   """
-  if not payload:
-    return []
-
-  # PipelineParam
-  if isinstance(payload, PipelineParam):
-    return [payload]
- 
-  # str
-  if isinstance(payload, str):
-    return list(set(_extract_pipelineparams(payload)))
-  
-  # list or tuple
-  if isinstance(payload, list) or isinstance(payload, tuple):
-    pipeline_params = []
-    for item in payload:
-      pipeline_params += extract_pipelineparams_from_any(item)
-    return list(set(pipeline_params))
-
-  # dict
-  if isinstance(payload, dict):
-    pipeline_params = []
-    for item in payload.values():
-      pipeline_params += extract_pipelineparams_from_any(item)
-    return list(set(pipeline_params))
-
-  # k8s swagger object
-  if hasattr(payload, 'swagger_types') and isinstance(payload.swagger_types, dict):
-    pipeline_params = []
-    for key in payload.swagger_types.keys():
-      pipeline_params += extract_pipelineparams_from_any(getattr(payload, key))
-
-    return list(set(pipeline_params))
-
-  # k8s openapi object
-  if hasattr(payload, 'openapi_types') and isinstance(payload.openapi_types, dict):
-    pipeline_params = []
-    for key in payload.openapi_types.keys():
-      pipeline_params += extract_pipelineparams_from_any(getattr(payload, key))
-
-    return list(set(pipeline_params))
-
-  # return empty list  
-  return []
+  pipeline_params = {}
+  to_visit = [payload]
+  while to_visit:
+    item = to_visit.pop()
+    if not item:
+      continue
+
+    # PipelineParam
+    if isinstance(item, PipelineParam):
+      pipeline_params.setdefault((item.op_name, item.name), item)
+
+    # str
+    elif isinstance(item, str):
+      if _PIPELINEPARAM_MARKER not in item:
+        continue
+      for param in _extract_pipelineparams(item):
+        pipeline_params.setdefault((param.op_name, param.name), param)
+
+    # list or tuple
+    elif isinstance(item, (list, tuple)):
+      to_visit.extend(reversed(item))
+
+    # dict
+    elif isinstance(item, dict):
+      to_visit.extend(reversed(list(item.values())))
+
+    # k8s swagger or openapi object
+    else:
+      walker = _get_k8s_attribute_walker(item)
+      if walker:
+        # Most of the attributes of the k8s objects are not set, so they are not queued.
+        to_visit.extend(value for value in walker(item) if value)
+
+  return list(pipeline_params.values())
 
 
 class PipelineParam(object):
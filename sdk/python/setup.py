@@ -40,6 +40,10 @@ REQUIRES = [
     'Deprecated',
 ]
 
+EXTRAS_REQUIRE = {
+    'async': ['aiohttp>=3.5'],  #Used by kfp.AsyncClient
+}
+
 def find_version(*file_path_parts):
     here = os.path.abspath(os.path.dirname(__file__))
     with open(os.path.join(here, *file_path_parts), 'r') as fp:
@@ -61,6 +65,7 @@ setup(
     description='KubeFlow Pipelines SDK',
     author='google',
     install_requires=REQUIRES,
+    extras_require=EXTRAS_REQUIRE,
     packages=[
         'kfp',
         'kfp.cli',
@@ -0,0 +1,173 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import kfp.dsl as dsl
+from kfp.compiler import Compiler, CompileCache
+from kfp.compiler._compile_cache import compute_cache_key
+from kfp.compiler.main import _use_cache
+from kfp.components import ComponentStore, load_component_from_file, load_component_from_text, load_component_from_url
+
+
+_COMPONENT_TEXT = '''\
+name: Echo
+inputs:
+- {name: text, type: String}
+implementation:
+  container:
+    image: alpine
+    command: [echo, {inputValue: text}]
+'''
+
+echo_op = load_component_from_text(_COMPONENT_TEXT)
+
+_ECHO_PREFIX = 'hello '
+
+
+def _echo_text(text):
+  return '{}{}'.format(_ECHO_PREFIX, text)
+
+
+def echo_pipeline(text: str = 'world'):
+  echo_op(_echo_text(text))
+
+
+class TestCompileCache(unittest.TestCase):
+
+  def setUp(self):
+    self.cache_dir = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.cache_dir)
+
+  def test_cache_hit(self):
+    cache = CompileCache(self.cache_dir)
+    workflow = Compiler().create_workflow(echo_pipeline, cache=cache)
+    self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    with mock.patch.object(Compiler, '_create_pipeline_workflow') as create_pipeline_workflow:
+      cached_workflow = Compiler().create_workflow(echo_pipeline, cache=cache)
+    create_pipeline_workflow.assert_not_called()
+    self.assertEqual((cache.hits, cache.misses), (1, 1))
+    self.assertEqual(workflow, cached_workflow)
+
+  def test_compile_with_cache(self):
+    cache = CompileCache(self.cache_dir)
+    package_dir = tempfile.mkdtemp()
+    try:
+      for _ in range(2):
+        Compiler().compile(echo_pipeline, os.path.join(package_dir, 'pipeline.yaml'), cache=cache)
+      with open(os.path.join(package_dir, 'pipeline.yaml'), 'r') as f:
+        self.assertIn('hello ', f.read())
+    finally:
+      shutil.rmtree(package_dir)
+    self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+  def test_cache_key_changes(self):
+    global _ECHO_PREFIX, echo_op
+    key = compute_cache_key(echo_pipeline)
+    self.assertEqual(key, compute_cache_key(echo_pipeline))
+    self.assertNotEqual(key, compute_cache_key(echo_pipeline, pipeline_name='other-name'))
+    self.assertNotEqual(key, compute_cache_key(echo_pipeline, pipeline_conf=dsl.PipelineConf().set_timeout(10)))
+    retry_conf, other_retry_conf = dsl.PipelineConf(), dsl.PipelineConf()
+    retry_conf.add_op_transformer(lambda op: op.set_retry(1))
+    other_retry_conf.add_op_transformer(lambda op: op.set_retry(2))
+    self.assertNotEqual(
+        compute_cache_key(echo_pipeline, pipeline_conf=retry_conf),
+        compute_cache_key(echo_pipeline, pipeline_conf=other_retry_conf))
+
+    # A global value used by a helper function
+    old_echo_prefix = _ECHO_PREFIX
+    _ECHO_PREFIX = 'goodbye '
+    try:
+      self.assertNotEqual(key, compute_cache_key(echo_pipeline))
+    finally:
+      _ECHO_PREFIX = old_echo_prefix
+
+    # The component spec
+    old_echo_op = echo_op
+    echo_op = load_component_from_text(_COMPONENT_TEXT.replace('image: alpine', 'image: busybox'))
+    try:
+      self.assertNotEqual(key, compute_cache_key(echo_pipeline))
+    finally:
+      echo_op = old_echo_op
+    self.assertEqual(key, compute_cache_key(echo_pipeline))
+
+    # The argument defaults
+    def echo_pipeline_with_other_default(text: str = 'everyone'):
+      echo_op(_echo_text(text))
+    echo_pipeline_with_other_default.__name__ = echo_pipeline.__name__
+    self.assertNotEqual(key, compute_cache_key(echo_pipeline_with_other_default))
+
+  def test_component_file_changes(self):
+    component_path = os.path.join(self.cache_dir, 'echo.yaml')
+    def file_echo_pipeline():
+      load_component_from_file(component_path)('hello')
+
+    cache = CompileCache(os.path.join(self.cache_dir, 'cache'))
+    for image in ['alpine', 'alpine', 'busybox']:
+      with open(component_path, 'w') as f:
+        f.write(_COMPONENT_TEXT.replace('image: alpine', 'image: ' + image))
+      workflow = Compiler().create_workflow(file_echo_pipeline, cache=cache)
+      self.assertEqual([template['container']['image'] for template in workflow['spec']['templates'] if 'container' in template], [image])
+    # The workflow compiled with the old component file is not used.
+    self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+  def test_pipelines_loading_urls_are_not_cached(self):
+    def url_echo_pipeline():
+      load_component_from_url('https://example.com/echo.yaml')('hello')
+
+    cache = CompileCache(self.cache_dir)
+    with mock.patch.object(ComponentStore.default_store, '_fetch_url', return_value=_COMPONENT_TEXT.encode('utf-8')):
+      for _ in range(2):
+        Compiler().create_workflow(url_echo_pipeline, cache=cache)
+    self.assertEqual((cache.hits, cache.misses), (0, 2))
+    self.assertEqual(os.listdir(self.cache_dir), [])
+
+  def test_cli_cache_is_opt_in(self):
+    def use_cache(cache=False, no_cache=False, environ={}):
+      with mock.patch.dict(os.environ, environ, clear=True):
+        return _use_cache(argparse.Namespace(cache=cache, no_cache=no_cache))
+    self.assertFalse(use_cache())
+    self.assertTrue(use_cache(cache=True))
+    self.assertTrue(use_cache(environ={'KFP_COMPILE_CACHE_DIR': self.cache_dir}))
+    self.assertFalse(use_cache(no_cache=True, environ={'KFP_COMPILE_CACHE_DIR': self.cache_dir}))
+
+  def test_least_recently_used_workflows_are_evicted(self):
+    # Every cache file takes about 140 bytes.
+    cache = CompileCache(self.cache_dir, max_size=350)
+    workflow = {'data': 'x' * 100}
+    cache.put('first', workflow)
+    cache.put('second', workflow)
+    # Make the first workflow the most recently used one.
+    os.utime(os.path.join(self.cache_dir, 'second.json'), (0, 0))
+    self.assertEqual(cache.get('first'), workflow)
+    cache.put('third', workflow)
+
+    self.assertEqual(sorted(os.listdir(self.cache_dir)), ['first.json', 'third.json'])
+    self.assertIsNone(cache.get('second'))
+    self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    cache.clear()
+    self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -14,6 +14,7 @@
 
 import kfp
 import kfp.compiler as compiler
+import kfp.compiler.main
 import kfp.dsl as dsl
 import json
 import os
@@ -24,6 +25,7 @@ import zipfile
 import tarfile
 import tempfile
 import unittest
+from unittest import mock
 import yaml
 
 from kfp.dsl._component import component
@@ -786,6 +788,29 @@ implementation:
   def test_parallelfor_item_argument_resolving(self):
     self._test_py_compile_yaml('parallelfor_item_argument_resolving')
 
+  def test_parallelfor_sharding(self):
+    """Test that every iteration of a sharded loop gets the JSON lists of the items and of the used item attributes."""
+    def some_pipeline():
+      with dsl.ParallelFor([{'a': 1, 'b': 2}, {'a': 3, 'b': 4}, {'a': 5, 'b': 6}], shard_size=2) as item:
+        dsl.ContainerOp(name='op1', image='image', command=['echo', item.a])
+        dsl.ContainerOp(name='op2', image='image', command=['echo', item])
+      with dsl.ParallelFor(list(range(5)), max_shards=2) as item:
+        dsl.ContainerOp(name='op3', image='image', command=['echo', item])
+
+    workflow_dict = compiler.Compiler()._compile(some_pipeline)
+    loop_tasks = sorted(
+        (task for template in workflow_dict['spec']['templates'] for task in template.get('dag', {}).get('tasks', [])
+         if 'withItems' in task),
+        key=lambda task: isinstance(task['withItems'][0], dict))
+    self.assertEqual(loop_tasks[0]['withItems'], ['[0, 1, 2]', '[3, 4]'])
+    self.assertEqual(loop_tasks[1]['withItems'], [
+        {'a': '[1, 3]', 'kfp_shard_items': '[{"a": 1, "b": 2}, {"a": 3, "b": 4}]'},
+        {'a': '[5]', 'kfp_shard_items': '[{"a": 5, "b": 6}]'},
+    ])
+    self.assertEqual(
+        sorted(parameter['value'] for parameter in loop_tasks[1]['arguments']['parameters']),
+        ['{{item.a}}', '{{item.kfp_shard_items}}'])
+
   def test_py_input_artifact_raw_value(self):
     """Test pipeline input_artifact_raw_value."""
     self._test_py_compile_yaml('input_artifact_raw_value')
@@ -801,3 +826,229 @@ implementation:
     template_names = set(template['name'] for template in workflow_dict['spec']['templates'])
     self.assertGreater(len(template_names), 1)
     self.assertEqual(template_names, {'some-name', 'some-name-2'})
+
+  def test_shared_k8s_objects_are_not_modified(self):
+    """Test that compiling an op does not modify the k8s objects shared with other ops."""
+    from kubernetes.client.models import V1EnvVar
+    env_var = V1EnvVar(name='PARAMS')
+    def some_pipeline(param1='a', param2='b'):
+      env_var.value = '{} and {} and {}'.format(param1, param2, param1)
+      op1 = dsl.ContainerOp(name='op1', image='image').add_env_variable(env_var)
+      op2 = dsl.ContainerOp(name='op2', image='image').add_env_variable(env_var)
+
+    workflow_dict = compiler.Compiler()._compile(some_pipeline)
+    self.assertEqual(env_var.value, '{{pipelineparam:op=;name=param1}} and {{pipelineparam:op=;name=param2}} and {{pipelineparam:op=;name=param1}}')
+    templates = {template['name']: template for template in workflow_dict['spec']['templates']}
+    for name in ['op1', 'op2']:
+      self.assertEqual(
+        templates[name]['container']['env'],
+        [{'name': 'PARAMS', 'value': '{{inputs.parameters.param1}} and {{inputs.parameters.param2}} and {{inputs.parameters.param1}}'}])
+
+  def test_deduplicate_templates(self):
+    """Test that the templates which only differ by their name are shared when deduplication is enabled."""
+    def some_pipeline():
+      dsl.get_pipeline_conf().set_deduplicate_templates()
+      exit_op = dsl.ContainerOp(name='echo', image='alpine:latest', command=['echo', 'hello'])
+      with dsl.ExitHandler(exit_op):
+        for _ in range(3):
+          dsl.ContainerOp(name='echo', image='alpine:latest', command=['echo', 'hello'])
+        dsl.ContainerOp(name='other', image='alpine:latest', command=['echo', 'world'])
+
+    with self.assertLogs(level='INFO') as logs:
+      workflow_dict = compiler.Compiler()._compile(some_pipeline)
+    self.assertIn('from 7 templates', logs.output[0])
+    self.assertIn('to 4 templates', logs.output[0])
+
+    templates = {template['name']: template for template in workflow_dict['spec']['templates']}
+    self.assertEqual(set(templates), {'echo', 'exit-handler-1', 'other', 'some-pipeline'})
+    self.assertEqual(workflow_dict['spec']['onExit'], 'echo')
+    tasks = templates['exit-handler-1']['dag']['tasks']
+    self.assertEqual(
+      sorted((task['name'], task['template']) for task in tasks),
+      [('echo-2', 'echo'), ('echo-3', 'echo'), ('echo-4', 'echo'), ('other', 'other')])
+
+    # Deduplication is disabled by default.
+    def some_pipeline_without_deduplication():
+      for _ in range(3):
+        dsl.ContainerOp(name='echo', image='alpine:latest', command=['echo', 'hello'])
+    workflow_dict = compiler.Compiler()._compile(some_pipeline_without_deduplication)
+    self.assertEqual(len(workflow_dict['spec']['templates']), 4)
+
+  def test_workflow_size_report(self):
+    """Test the workflow size report."""
+    from kfp.compiler._workflow_size import analyze_workflow_size, check_workflow_size
+    def some_pipeline(param1='a'):
+      dsl.ContainerOp(name='small', image='alpine', command=['echo', param1])
+      dsl.ContainerOp(
+        name='big',
+        image='alpine',
+        command=['cat', '/tmp/inputs/text/data'],
+        artifact_argument_paths=[dsl.InputArgumentPath(argument='x' * 1000, path='/tmp/inputs/text/data')],
+      )
+
+    workflow_dict = compiler.Compiler()._compile(some_pipeline)
+    report = analyze_workflow_size(workflow_dict)
+    self.assertEqual(report.total, len(json.dumps(workflow_dict, separators=(',', ':'))))
+    self.assertEqual(set(report.templates), {'small', 'big', 'some-pipeline'})
+    self.assertGreater(report.templates['big'], 1000)
+    self.assertLess(report.templates['small'], 1000)
+    self.assertIn('pipelines.kubeflow.org/pipeline_spec', report.annotations)
+    self.assertEqual(report.arguments['workflow/param1'], len('"a"'))
+    self.assertIn('big: ', report.format(max_items=1))
+
+    with self.assertWarnsRegex(UserWarning, 'exceeds the 1000 bytes'):
+      check_workflow_size(workflow_dict, max_size=1000)
+    with self.assertWarnsRegex(UserWarning, 'The compiled workflow is 2000 bytes'):
+      check_workflow_size(workflow_dict, max_size=1000, json_size=2000)
+
+    # The workflow is not serialized again when its known size is far below the limit.
+    with mock.patch('kfp.compiler._workflow_size._json_size', side_effect=AssertionError('The workflow should not be serialized')):
+      check_workflow_size(workflow_dict, max_size=1000, yaml_size=400)
+      check_workflow_size(workflow_dict, max_size=1000, json_size=900)
+
+  def test_data_offloading(self):
+    """Test that the big raw artifact data is moved to the artifact location."""
+    uploaded_data = {}
+    def some_pipeline():
+      dsl.get_pipeline_conf().set_artifact_location(
+        dsl.ArtifactLocation.s3(bucket='foo', endpoint='minio-service:9000', insecure=True)
+      ).set_data_offloading(100, uploaded_data.__setitem__)
+      for name, data in [('small', 'x' * 10), ('big', 'x' * 1000), ('big-with-placeholder', '{{workflow.uid}}' + 'x' * 1000)]:
+        dsl.ContainerOp(
+          name=name,
+          image='alpine',
+          command=['cat', '/tmp/inputs/text/data'],
+          artifact_argument_paths=[dsl.InputArgumentPath(argument=data, path='/tmp/inputs/text/data')],
+        )
+
+    workflow_dict = compiler.Compiler()._compile(some_pipeline)
+    templates = {template['name']: template for template in workflow_dict['spec']['templates']}
+    self.assertEqual(templates['small']['inputs']['artifacts'][0]['raw'], {'data': 'x' * 10})
+    self.assertIn('raw', templates['big-with-placeholder']['inputs']['artifacts'][0])
+
+    [big_data_key] = uploaded_data.keys()
+    self.assertTrue(big_data_key.startswith('kfp-offloaded-data/'))
+    self.assertEqual(uploaded_data[big_data_key], 'x' * 1000)
+    big_artifact = templates['big']['inputs']['artifacts'][0]
+    self.assertNotIn('raw', big_artifact)
+    self.assertEqual(big_artifact['path'], '/tmp/inputs/text/data')
+    self.assertEqual(big_artifact['s3']['bucket'], 'foo')
+    self.assertEqual(big_artifact['s3']['key'], big_data_key)
+
+  def test_package_formats(self):
+    """Test that the workflow is written identically in all the package formats."""
+    test_data_dir = os.path.join(os.path.dirname(__file__), 'testdata')
+    sys.path.append(test_data_dir)
+    import basic
+    workflow = compiler.Compiler()._create_workflow(basic.save_most_frequent_word)
+    tmpdir = tempfile.mkdtemp()
+    try:
+      package_path = os.path.join(tmpdir, 'workflow')
+      compiler.Compiler._write_workflow(workflow, package_path + '.tar.gz')
+      compiler.Compiler._write_workflow(workflow, package_path + '.zip')
+      compiler.Compiler._write_workflow(workflow, package_path + '.yaml')
+      compiler.Compiler._write_workflow(workflow, package_path + '.json')
+      self.assertEqual(workflow, self._get_yaml_from_tar(package_path + '.tar.gz'))
+      self.assertEqual(workflow, self._get_yaml_from_zip(package_path + '.zip'))
+      with open(package_path + '.yaml', 'r') as f:
+        self.assertEqual(workflow, yaml.safe_load(f))
+      with open(package_path + '.json', 'r') as f:
+        self.assertEqual(workflow, json.load(f))
+      self.assertEqual(workflow, yaml.safe_load(compiler.Compiler._write_workflow(workflow)))
+
+      with self.assertRaises(ValueError):
+        compiler.Compiler._write_workflow(workflow, package_path + '.txt')
+    finally:
+      shutil.rmtree(tmpdir)
+
+  def test_unresolved_pipelineparam_is_detected(self):
+    """Test that no package is written when the workflow contains an unresolved PipelineParam."""
+    workflow = {'spec': {'templates': [{'name': 'foo', 'container': {'args': ['{{pipelineparam:op=;name=bar}}']}}]}}
+    tmpdir = tempfile.mkdtemp()
+    try:
+      for extension in ['.tar.gz', '.zip', '.yaml', '.json']:
+        package_path = os.path.join(tmpdir, 'workflow' + extension)
+        with self.assertRaises(RuntimeError):
+          compiler.Compiler._write_workflow(workflow, package_path)
+        self.assertFalse(os.path.exists(package_path))
+    finally:
+      shutil.rmtree(tmpdir)
+
+  def test_compile_profile(self):
+    """Test that the profiler records the compilation phases and the ops."""
+    test_data_dir = os.path.join(os.path.dirname(__file__), 'testdata')
+    sys.path.append(test_data_dir)
+    import basic
+    tmpdir = tempfile.mkdtemp()
+    try:
+      profiler = compiler.CompileProfiler()
+      compiler.Compiler().compile(basic.save_most_frequent_word, os.path.join(tmpdir, 'workflow.yaml'), profile=profiler)
+      profile_path = os.path.join(tmpdir, 'profile.json')
+      profiler.write(profile_path)
+      with open(profile_path, 'r') as f:
+        profile = json.load(f)
+    finally:
+      shutil.rmtree(tmpdir)
+
+    self.assertGreater(profile['total']['wall_time'], 0)
+    self.assertGreater(profile['total']['peak_memory'], 0)
+    for phase in ['pipeline_func', 'sanitize_and_inject_artifact', 'create_dag_templates', 'op_transformers',
+                  'op_to_template', 'fix_big_data_passing', 'write_workflow']:
+      self.assertEqual(profile['phases'][phase]['calls'], 1)
+      self.assertIn('wall_time', profile['phases'][phase])
+      self.assertIn('memory_allocated', profile['phases'][phase])
+      self.assertIn('objects_created', profile['phases'][phase])
+    self.assertEqual(
+        sorted(profile['ops']),
+        ['exiting', 'get-frequent', 'save'])
+    self.assertEqual(list(profile['ops']['save']), ['op_transformers', 'op_to_template'])
+
+    # Profiling is disabled after the compilation.
+    self.assertIs(compiler.Compiler()._profiler, compiler.compiler.NULL_PROFILER)
+
+  def test_compile_directory(self):
+    """Test compiling all the pipelines of a directory with a process pool."""
+    tmpdir = tempfile.mkdtemp()
+    try:
+      source_dir = os.path.join(tmpdir, 'pipelines')
+      os.makedirs(os.path.join(source_dir, 'mypackage'))
+      pipeline_code = (
+          'import kfp.dsl as dsl\n'
+          '@dsl.pipeline(name="{name}")\n'
+          'def {name}():\n'
+          '  dsl.ContainerOp(name="echo", image="alpine", command=["echo", "{name}"])\n')
+      with open(os.path.join(source_dir, 'two_pipelines.py'), 'w') as f:
+        f.write(pipeline_code.format(name='first') + pipeline_code.format(name='second'))
+      with open(os.path.join(source_dir, 'broken_pipeline.py'), 'w') as f:
+        f.write(pipeline_code.format(name='broken') + 'raise ValueError("broken")\n')
+      with open(os.path.join(source_dir, 'not_a_pipeline.py'), 'w') as f:
+        f.write('raise ValueError("must not be imported")\n')
+      with open(os.path.join(source_dir, 'mypackage', '__init__.py'), 'w') as f:
+        f.write('')
+      with open(os.path.join(source_dir, 'mypackage', 'names.py'), 'w') as f:
+        f.write('NAME = "third"\n')
+      with open(os.path.join(source_dir, 'mypackage', 'relative_import.py'), 'w') as f:
+        f.write('from .names import NAME\n' + pipeline_code.format(name='third').replace('"third"', 'NAME'))
+
+      output_dir = os.path.join(tmpdir, 'output')
+      summary = kfp.compiler.main.compile_directory(source_dir, output_dir, True, output_format='json', jobs=2)
+      self.assertEqual(summary['modules'], 3)
+      results = [(os.path.relpath(result['module'], source_dir), result['pipeline'], result['error'] is None)
+                 for result in summary['pipelines']]
+      self.assertEqual(results, [
+          ('broken_pipeline.py', None, False),
+          (os.path.join('mypackage', 'relative_import.py'), 'third', True),
+          ('two_pipelines.py', 'first', True),
+          ('two_pipelines.py', 'second', True),
+      ])
+      self.assertIn('ValueError: broken', summary['pipelines'][0]['error'])
+      self.assertEqual(sorted(os.listdir(output_dir)), [
+          'mypackage.relative_import.third.json',
+          'two_pipelines.first.json',
+          'two_pipelines.second.json',
+      ])
+      with open(os.path.join(output_dir, 'two_pipelines.second.json'), 'r') as f:
+        workflow = json.load(f)
+      self.assertEqual(workflow['spec']['templates'][0]['container']['command'], ['echo', 'second'])
+    finally:
+      shutil.rmtree(tmpdir)
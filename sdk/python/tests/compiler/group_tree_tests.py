@@ -0,0 +1,81 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import kfp.dsl as dsl
+from kfp.compiler._group_tree import GroupTree
+
+
+class TestGroupTree(unittest.TestCase):
+
+  def _build_pipeline(self, depth):
+    """Builds a pipeline with a chain of depth nested conditions and one op at each level."""
+    with dsl.Pipeline('somename') as p:
+      root_op = dsl.ContainerOp(name='root-op', image='image')
+      groups = []
+      for level in range(depth):
+        group = dsl.Condition(root_op.output == str(level))
+        group.__enter__()
+        groups.append(group)
+        dsl.ContainerOp(name='op-{}'.format(level), image='image')
+      for group in reversed(groups):
+        group.__exit__()
+    return p, groups
+
+  def test_ancestors(self):
+    p, groups = self._build_pipeline(3)
+    tree = GroupTree(p.groups[0])
+    root_name = p.groups[0].name
+    self.assertEqual(tree.ancestors('root-op'), [root_name, 'root-op'])
+    self.assertEqual(
+        tree.ancestors('op-2'),
+        [root_name] + [group.name for group in groups] + ['op-2'])
+    self.assertEqual(tree.depth('op-2'), 4)
+    self.assertEqual(tree.parent('op-1'), groups[1].name)
+    self.assertEqual(tree.ancestor_at_depth('op-2', 1), groups[0].name)
+    with self.assertRaises(ValueError):
+      tree.ancestors('missing-op')
+
+  def test_uncommon_ancestors(self):
+    p, groups = self._build_pipeline(3)
+    tree = GroupTree(p.groups[0])
+    self.assertEqual(tree.lowest_common_ancestor('op-0', 'op-2'), groups[0].name)
+    self.assertEqual(
+        tree.uncommon_ancestors('op-0', 'op-2'),
+        (['op-0'], [groups[1].name, groups[2].name, 'op-2']))
+    self.assertEqual(
+        tree.uncommon_ancestors('root-op', 'op-1'),
+        (['root-op'], [groups[0].name, groups[1].name, 'op-1']))
+    self.assertEqual(tree.first_uncommon_ancestors('op-2', 'op-0'), (groups[1].name, 'op-0'))
+
+  def test_deep_tree_matches_ancestor_lists(self):
+    p, groups = self._build_pipeline(37)
+    tree = GroupTree(p.groups[0])
+    names = ['root-op'] + ['op-{}'.format(level) for level in range(37)]
+    for name1 in names:
+      for name2 in names:
+        if name1 == name2:
+          continue
+        ancestors1 = tree.ancestors(name1)
+        ancestors2 = tree.ancestors(name2)
+        common_len = 0
+        while ancestors1[common_len] == ancestors2[common_len]:
+          common_len += 1
+        self.assertEqual(
+            tree.uncommon_ancestors(name1, name2),
+            (ancestors1[common_len:], ancestors2[common_len:]))
+        self.assertEqual(
+            tree.first_uncommon_ancestors(name1, name2),
+            (ancestors1[common_len], ancestors2[common_len]))
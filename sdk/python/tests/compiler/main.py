@@ -16,17 +16,21 @@
 import sys
 import unittest
 
+import compile_cache_tests
 import compiler_tests
 import component_builder_test
 import container_builder_test
+import group_tree_tests
 import k8s_helper_tests
 
 
 if __name__ == '__main__':
   suite = unittest.TestSuite()
+  suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(compile_cache_tests))
   suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(compiler_tests))
   suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(component_builder_test))
   suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(container_builder_test))
+  suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(group_tree_tests))
   suite.addTests(unittest.defaultTestLoader.loadTestsFromModule(k8s_helper_tests))
   runner = unittest.TextTestRunner()
   if not runner.run(suite).wasSuccessful():
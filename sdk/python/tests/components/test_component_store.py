@@ -0,0 +1,162 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+
+from kfp.components import ComponentCache, ComponentStore
+
+
+_COMPONENT_TEXT = b'''\
+name: Echo
+inputs:
+- {name: text, type: String}
+implementation:
+  container:
+    image: alpine
+    command: [echo, {inputValue: text}]
+'''
+_COMPONENT_DIGEST = hashlib.sha256(_COMPONENT_TEXT).hexdigest()
+_URL_PREFIX = 'https://example.com/components/'
+
+
+class _FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+
+class _FakeServer:
+    '''Serves the component files and supports the ETag revalidation.'''
+    def __init__(self, files):
+        self.files = files
+        self.requests = []
+
+    def get(self, url, headers=None):
+        headers = headers or {}
+        self.requests.append((url, headers))
+        if url not in self.files:
+            return _FakeResponse(404)
+        content = self.files[url]
+        etag = '"' + hashlib.sha256(content).hexdigest() + '"'
+        if headers.get('If-None-Match') == etag:
+            return _FakeResponse(304)
+        return _FakeResponse(200, content, {'ETag': etag})
+
+
+class ComponentStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.server = _FakeServer({
+            _URL_PREFIX + 'echo/component.yaml': _COMPONENT_TEXT,
+            _URL_PREFIX + 'echo/versions/sha256/' + _COMPONENT_DIGEST: _COMPONENT_TEXT,
+        })
+        patcher = mock.patch.object(requests.Session, 'get', side_effect=self.server.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _create_store(self, **cache_args):
+        cache = ComponentCache(self.cache_dir, **cache_args)
+        return ComponentStore(local_search_paths=[self.cache_dir], url_search_prefixes=[_URL_PREFIX], cache=cache)
+
+    def test_fresh_urls_are_loaded_from_the_cache(self):
+        store = self._create_store()
+        task_factory = store.load_component('echo')
+        self.assertEqual(task_factory.component_spec.name, 'Echo')
+        store.load_component('echo')
+        store.load_component_from_url(_URL_PREFIX + 'echo/component.yaml')
+        self.assertEqual(len(self.server.requests), 1)
+
+        # Other stores share the cache directory.
+        self._create_store().load_component('echo')
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_expired_urls_are_revalidated(self):
+        store = self._create_store(ttl=0)
+        store.load_component('echo')
+        task_factory = store.load_component('echo')
+        self.assertEqual(task_factory.component_spec.name, 'Echo')
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[1][1], {'If-None-Match': '"' + _COMPONENT_DIGEST + '"'})
+
+        # Changed content
+        self.server.files[_URL_PREFIX + 'echo/component.yaml'] = _COMPONENT_TEXT.replace(b'Echo', b'Echo 2')
+        task_factory = store.load_component('echo')
+        self.assertEqual(task_factory.component_spec.name, 'Echo 2')
+
+    def test_digest_lookups_do_not_use_the_network(self):
+        store = self._create_store(ttl=0)
+        store.load_component('echo', digest=_COMPONENT_DIGEST)
+        task_factory = store.load_component('echo', digest=_COMPONENT_DIGEST)
+        self.assertEqual(task_factory.component_spec.name, 'Echo')
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(store.cache.get(_COMPONENT_DIGEST), _COMPONENT_TEXT)
+
+    def test_store_without_cache(self):
+        store = ComponentStore(local_search_paths=[self.cache_dir], url_search_prefixes=[_URL_PREFIX])
+        store.load_component('echo')
+        store.load_component('echo')
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+        with self.assertRaises(RuntimeError):
+            store.load_component('missing')
+
+    def test_unusable_cache_directory(self):
+        # A cache directory under a file cannot be created, even by root.
+        blocking_file_path = os.path.join(self.cache_dir, 'file')
+        with open(blocking_file_path, 'w') as f:
+            f.write('')
+        cache = ComponentCache(os.path.join(blocking_file_path, 'cache'))
+        store = ComponentStore(local_search_paths=[], url_search_prefixes=[_URL_PREFIX], cache=cache)
+        with self.assertLogs('kfp.components._component_cache', level='WARNING'):
+            task_factory = store.load_component('echo')
+        self.assertEqual(task_factory.component_spec.name, 'Echo')
+        task_factory = store.load_component('echo', digest=_COMPONENT_DIGEST)
+        self.assertEqual(task_factory.component_spec.name, 'Echo')
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_least_recently_used_files_are_evicted(self):
+        cache = ComponentCache(self.cache_dir, max_size=250)
+        first_digest = cache.put(b'1' * 100)
+        second_digest = cache.put(b'2' * 100)
+        # Make the first file the most recently used one.
+        os.utime(os.path.join(self.cache_dir, 'sha256', second_digest), (0, 0))
+        self.assertIsNotNone(cache.get(first_digest))
+        third_digest = cache.put(b'3' * 100)
+
+        self.assertIsNone(cache.get(second_digest))
+        self.assertEqual(cache.get(first_digest), b'1' * 100)
+        self.assertEqual(cache.get(third_digest), b'3' * 100)
+
+        cache.clear()
+        self.assertIsNone(cache.get(first_digest))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,11 +17,13 @@ import sys
 import unittest
 from contextlib import contextmanager
 from pathlib import Path
+from unittest import mock
 
 
 import kfp
 import kfp.components as comp
-from kfp.components._yaml_utils import load_yaml
+from kfp.components._yaml_utils import dump_yaml, load_yaml
+from kfp.components.structures import ComponentReference
 from kfp.dsl.types import InconsistentTypeException
 
 
@@ -267,6 +269,57 @@ implementation:
         with self.assertRaises(TypeError):
             comp.load_component_from_text(None)
 
+    def test_load_same_component_twice_reuses_task_factory(self):
+        component_text = '''\
+name: Component
+inputs:
+- {name: in1}
+implementation:
+  container:
+    image: busybox
+    command: [echo, {inputValue: in1}]
+'''
+        task_factory1 = comp.load_component_from_text(component_text)
+        with mock.patch.object(comp._components, 'load_yaml') as load_yaml_mock:
+            task_factory2 = comp.load_component_from_text(component_text)
+        load_yaml_mock.assert_not_called()
+        self.assertIs(task_factory1, task_factory2)
+        self.assertIs(task_factory1.component_spec, task_factory2.component_spec)
+
+        # The factories of the components loaded from different locations keep their own references
+        url1 = 'https://example.com/component1.yaml'
+        url2 = 'https://example.com/component2.yaml'
+        task_factory3 = comp._components._load_component_from_yaml_or_zip_bytes(component_text.encode('utf-8'), url1, ComponentReference(url=url1))
+        task_factory4 = comp._components._load_component_from_yaml_or_zip_bytes(component_text.encode('utf-8'), url2, ComponentReference(url=url2))
+        self.assertIsNot(task_factory3, task_factory4)
+        with mock.patch.object(comp._components, '_container_task_constructor', comp._components._default_container_task_constructor):
+            self.assertEqual(task_factory3('a').component_ref.url, url1)
+            self.assertEqual(task_factory4('a').component_ref.url, url2)
+            self.assertIsNone(task_factory1('a').component_ref.url)
+
+    def test_yaml_round_trip_preserves_order_and_multi_line_style(self):
+        text = '''\
+name: Component
+inputs:
+- {name: b}
+- {name: a}
+implementation:
+  container:
+    image: busybox
+    command:
+    - sh
+    - -c
+    - |
+      echo "$0"
+      echo done
+'''
+        struct = load_yaml(text)
+        self.assertEqual(list(struct.keys()), ['name', 'inputs', 'implementation'])
+        dumped_text = dump_yaml(struct)
+        self.assertIn('- |\n', dumped_text)
+        self.assertLess(dumped_text.index('name: b'), dumped_text.index('name: a'))
+        self.assertEqual(load_yaml(dumped_text), struct)
+
     def test_input_value_resolving(self):
         component_text = '''\
 inputs:
@@ -14,8 +14,11 @@
 
 import os
 import sys
+import threading
+import time
 import unittest
 from pathlib import Path
+from unittest import mock
 
 
 import kfp.components as comp
@@ -335,6 +338,98 @@ implementation:
         self.assertEqual(task.outputs['graph out 3'], 'graph 2')
         self.assertEqual(task.outputs['graph out 4'], '42')
 
+    def test_prefetch_component_references_concurrently(self):
+        container_component_text = '''\
+name: {name}
+inputs:
+- {{name: in_1}}
+outputs:
+- {{name: out_1}}
+implementation:
+  container:
+    image: busybox
+    command: [sh, -c, 'echo "$0" > $1', {{inputValue: in_1}}, {{outputPath: out_1}}]
+'''
+        nested_graph_component_text = '''\
+name: Nested graph
+inputs:
+- {name: in_1}
+outputs:
+- {name: out_1}
+implementation:
+  graph:
+    tasks:
+      nested task:
+        componentRef: {name: component c}
+        arguments:
+          in_1: {graphInput: {inputName: in_1}}
+    outputValues:
+      out_1: {taskOutput: {taskId: nested task, outputName: out_1}}
+'''
+        graph_component_text = '''\
+inputs:
+- {name: graph in}
+outputs:
+- {name: graph out}
+implementation:
+  graph:
+    tasks:
+      task 4:
+        componentRef: {name: component a}
+        arguments:
+          in_1: {taskOutput: {taskId: task 3, outputName: out_1}}
+      task 3:
+        componentRef: {name: nested graph}
+        arguments:
+          in_1: {taskOutput: {taskId: task 2, outputName: out_1}}
+      task 2:
+        componentRef: {name: component b}
+        arguments:
+          in_1: {taskOutput: {taskId: task 1, outputName: out_1}}
+      task 1:
+        componentRef: {name: component a}
+        arguments:
+          in_1: {graphInput: {inputName: graph in}}
+    outputValues:
+      graph out: {taskOutput: {taskId: task 4, outputName: out_1}}
+'''
+        component_texts = {
+            'component a': container_component_text.format(name='Component A'),
+            'component b': container_component_text.format(name='Component B'),
+            'component c': container_component_text.format(name='Component C'),
+            'nested graph': nested_graph_component_text,
+        }
+        loaded_names = []
+        active_loads = [0, 0] # Current and maximum number of concurrent loads
+        lock = threading.Lock()
+
+        class FakeComponentStore(comp.ComponentStore):
+            def load_component(self, name, digest=None, tag=None):
+                with lock:
+                    loaded_names.append(name)
+                    active_loads[0] += 1
+                    active_loads[1] = max(active_loads)
+                time.sleep(0.1)
+                with lock:
+                    active_loads[0] -= 1
+                return comp.load_component_from_text(component_texts[name])
+
+        constructed_task_names = []
+        default_container_task_constructor = comp._components._default_container_task_constructor
+        def container_task_constructor(component_spec, arguments, component_ref):
+            constructed_task_names.append(component_spec.name)
+            return default_container_task_constructor(component_spec, arguments, component_ref)
+
+        op = comp.load_component_from_text(graph_component_text)
+        with mock.patch.object(comp.ComponentStore, 'default_store', FakeComponentStore()), \
+                mock.patch.object(comp._components, '_container_task_constructor', container_task_constructor):
+            task = op('graph value')
+
+        self.assertEqual(sorted(loaded_names), ['component a', 'component b', 'component c', 'nested graph'])
+        self.assertGreater(active_loads[1], 1)
+        self.assertEqual(constructed_task_names, ['Component A', 'Component B', 'Component C', 'Component A'])
+        self.assertIn('out_1', str(task.outputs['graph out']))
+
 #TODO: Test task name conversion to Argo-compatible names
 
 if __name__ == '__main__':
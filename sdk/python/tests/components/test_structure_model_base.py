@@ -244,6 +244,41 @@ class StructureModelBaseTestCase(unittest.TestCase):
         
         self.assertNotEqual(A(1, 2), B(1, 2))
 
+    def test_handle_unknown_keys(self):
+        with self.assertRaises(TypeError):
+            TestModel1.from_dict({'prop_0': '', 'prop_6': 'value'})
+
+        # The pythonic name of a serialized field is not accepted either.
+        with self.assertRaises(ValueError):
+            TestModel1.from_dict({'prop_0': '', 'prop_1': 'value'})
+
+    def test_handle_union_with_bare_generic_types(self):
+        # On Python 3.9+ the bare typing.Dict and typing.List have no __args__.
+        class A(ModelBase):
+            def __init__(self, a: Union[str, Dict, List, None] = None):
+                super().__init__(locals())
+
+        self.assertEqual(A('value').a, 'value')
+        self.assertEqual(A.from_dict({'a': 'value'}).a, 'value')
+        self.assertEqual(A.from_dict({'a': {'key': 'value'}}).a, {'key': 'value'})
+        self.assertEqual(A.from_dict({'a': ['value']}).a, ['value'])
+
+    def test_union_errors_list_all_types(self):
+        with self.assertRaises(TypeError) as context:
+            TestModel1.from_dict({'prop_0': '', 'prop 2': 1.5})
+        message = str(context.exception)
+        self.assertIn('Structure "1.5" is incompatible with type "<class \'int\'>"', message)
+        self.assertIn('Structure "1.5" is incompatible with type "<class \'str\'>"', message)
+        self.assertIn('none of the types in Union are compatible', message)
+
+    def test_parsed_objects_are_verified_once(self):
+        obj = TestModel1.from_dict({'prop_0': 'value 0', 'prop_5': [{'prop_0': 'value 1'}]})
+        self.assertEqual(obj.prop_5[0].prop_0, 'value 1')
+
+        # The objects that are constructed directly are still verified, including the nested ones.
+        with self.assertRaises(TypeError):
+            TestModel1(prop_0='value 0', prop_5=[obj, 'value'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -98,3 +98,21 @@ class TestContainerOp(unittest.TestCase):
     self.assertEqual(pvolume.dependent_names, [])
     self.assertEqual(op.pvolume.dependent_names, [op.name])
     self.assertEqual(op.volumes[0].dependent_names, [op.name])
+
+  def test_optional_collections_are_created_on_access(self):
+    op = ContainerOp(name='op1', image='image')
+    self.assertFalse(hasattr(op, '__dict__') and op.__dict__)
+    self.assertIsNone(op._get_attr_value('volumes'))
+    self.assertIsNone(op._get_attr_value('pod_labels'))
+
+    op.add_pod_label('key', 'value')
+    op.volumes.append('volume')
+    self.assertEqual(op._get_attr_value('pod_labels'), {'key': 'value'})
+    self.assertEqual(op.volumes, ['volume'])
+    self.assertEqual(op.tolerations, [])
+
+    # Ops can still be extended with new attributes.
+    op.custom_attribute = 'value'
+    self.assertEqual(op.custom_attribute, 'value')
+    with self.assertRaises(AttributeError):
+      op.not_a_container_method
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import kfp.dsl as dsl
-from kfp.dsl import Pipeline, PipelineParam, ContainerOp, ExitHandler, OpsGroup
+from kfp.dsl import Pipeline, PipelineParam, ContainerOp, ExitHandler, OpsGroup, ParallelFor
 import unittest
 
 
@@ -105,3 +105,36 @@ class TestExitHandler(unittest.TestCase):
         exit_op.after(op1)
         with ExitHandler(exit_op=exit_op):
           pass
+
+
+class TestParallelFor(unittest.TestCase):
+
+  def test_sharding(self):
+    """Test that the static items are grouped into shards."""
+    with Pipeline('somename') as p:
+      loop = ParallelFor(list(range(5)), shard_size=2)
+    self.assertEqual(['[0, 1]', '[2, 3]', '[4]'], loop.loop_args.to_sharded_list_for_task_yaml())
+
+    with Pipeline('somename') as p:
+      loop = ParallelFor([{'a': 1, 'b': 2}, {'a': 3, 'b': 4}, {'a': 5, 'b': 6}], max_shards=2)
+    self.assertEqual(2, loop.loop_args.shard_size)
+    self.assertEqual(
+        [{'a': '[1, 3]'}, {'a': '[5]'}],
+        loop.loop_args.to_sharded_list_for_task_yaml(['a'], include_shard_items=False))
+
+  def test_invalid_sharding(self):
+    with Pipeline('somename') as p:
+      with self.assertRaises(ValueError):
+        ParallelFor(PipelineParam('items'), shard_size=2)
+      with self.assertRaises(ValueError):
+        ParallelFor([1, 2, 3], shard_size=2, max_shards=2)
+      with self.assertRaises(ValueError):
+        ParallelFor([1, 2, 3], shard_size=0)
+      with self.assertRaises(ValueError):
+        ParallelFor([{'kfp_shard_items': 1}], shard_size=1)
+      with self.assertRaisesRegex(ValueError, 'empty'):
+        ParallelFor([], shard_size=2)
+
+      loop = ParallelFor([{'a': 1}, {'a': 2}], shard_size=2)
+      with self.assertRaisesRegex(ValueError, "Item 0 of the loop does not have the keys \\['b'\\]"):
+        loop.loop_args.to_sharded_list_for_task_yaml(['a', 'b'])
@@ -79,3 +79,20 @@ class TestPipelineParam(unittest.TestCase):
     payload = [str(p1) + stuff_chars + str(p2), str(p2) + stuff_chars + str(p3)]
     params = _extract_pipelineparams(payload)
     self.assertListEqual([p1, p2, p3], params)
+
+  def test_extract_pipelineparams_from_any_dedup(self):
+    """Test extract_pipelineparams_from_any returns every PipelineParam once, in the traversal order."""
+    p1 = PipelineParam(name='param1', op_name='op1')
+    p2 = PipelineParam(name='param2', param_type='customized_type_b')
+    p3 = PipelineParam(name='param3')
+    payload = [
+        'no params here',
+        {'a': p2, 'b': (str(p1), 'suffix ' + str(p2))},
+        V1Container(name='container', env=[V1EnvVar(name='foo', value=str(p3)), V1EnvVar(name='bar', value=str(p1))]),
+        p3,
+    ]
+    params = extract_pipelineparams_from_any(payload)
+    self.assertEqual([(p.op_name, p.name) for p in params], [(None, 'param2'), ('op1', 'param1'), (None, 'param3')])
+    # The PipelineParam instance is kept rather than the one parsed from the later string.
+    self.assertIs(params[0], p2)
+    self.assertEqual(extract_pipelineparams_from_any(['', None, [], {}]), [])
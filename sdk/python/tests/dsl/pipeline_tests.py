@@ -33,6 +33,21 @@ class TestPipeline(unittest.TestCase):
     self.assertEqual(p.ops['op1'].name, 'op1')
     self.assertEqual(p.ops['op2'].name, 'op2')
 
+  def test_unique_op_names(self):
+    """Test that ops with the same name get unique names with increasing indices."""
+    with Pipeline('somename') as p:
+      op1 = ContainerOp(name='op', image='image')
+      op2 = ContainerOp(name='op', image='image')
+      op3 = ContainerOp(name='op 4', image='image')
+      op4 = ContainerOp(name='op', image='image')
+      op5 = ContainerOp(name='op', image='image')
+      op6 = ContainerOp(name='op 2', image='image')
+
+    self.assertEqual(
+      [op.name for op in [op1, op2, op3, op4, op5, op6]],
+      ['op', 'op 2', 'op 4', 'op 3', 'op 5', 'op 2 2'])
+    self.assertEqual(list(p.ops.keys()), ['op', 'op 2', 'op 4', 'op 3', 'op 5', 'op 2 2'])
+
   def test_nested_pipelines(self):
     """Test nested pipelines"""
     with self.assertRaises(Exception):
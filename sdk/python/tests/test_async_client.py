@@ -0,0 +1,285 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+import kfp
+import kfp_server_api
+from kfp import dsl
+from kfp.compiler import Compiler
+
+try:
+    from aiohttp import web
+except ImportError:
+    raise unittest.SkipTest('AsyncClient requires aiohttp')
+
+
+@dsl.pipeline(name='Echo pipeline')
+def _echo_pipeline(text='hello'):
+    dsl.ContainerOp(name='echo', image='library/bash:4.4.23', command=['echo', text])
+
+
+class _StubPipelineServer:
+    '''Serves the subset of the Kubeflow Pipelines API used by AsyncClient.
+
+    Every run succeeds after the number of list_runs polls specified by its "polls" parameter.
+    '''
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.experiments = {}
+        self.runs = {}
+        self.run_polls = {}
+        self.polls = 0
+        self.filtered_run_ids = []
+        self.experiment_list_requests = 0
+        self.uploads = []
+        self.requests = []
+        self.active_requests = 0
+        self.max_active_requests = 0
+
+        app = web.Application(middlewares=[self._track_requests])
+        app.router.add_post('/apis/v1beta1/experiments', self.create_experiment)
+        app.router.add_get('/apis/v1beta1/experiments', self.list_experiments)
+        app.router.add_get('/apis/v1beta1/experiments/{id}', self.get_experiment)
+        app.router.add_post('/apis/v1beta1/runs', self.create_run)
+        app.router.add_get('/apis/v1beta1/runs', self.list_runs)
+        app.router.add_get('/apis/v1beta1/runs/{run_id}', self.get_run)
+        app.router.add_post('/apis/v1beta1/pipelines/upload', self.upload_pipeline)
+        self._runner = web.AppRunner(app)
+
+    async def start(self):
+        await self._runner.setup()
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        self.host = 'http://127.0.0.1:{}'.format(sock.getsockname()[1])
+        await web.SockSite(self._runner, sock).start()
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    @web.middleware
+    async def _track_requests(self, request, handler):
+        self.requests.append(request)
+        self.active_requests += 1
+        self.max_active_requests = max(self.max_active_requests, self.active_requests)
+        try:
+            await asyncio.sleep(self.delay)
+            return await handler(request)
+        finally:
+            self.active_requests -= 1
+
+    def _run_status(self, run_id):
+        return 'Succeeded' if self.polls >= self.run_polls[run_id] else 'Running'
+
+    async def create_experiment(self, request):
+        experiment = await request.json()
+        experiment['id'] = 'experiment-{}'.format(len(self.experiments))
+        self.experiments[experiment['id']] = experiment
+        return web.json_response(experiment)
+
+    async def list_experiments(self, request):
+        self.experiment_list_requests += 1
+        experiments = list(self.experiments.values())
+        if 'filter' in request.query:
+            name = json.loads(request.query['filter'])['predicates'][0]['string_value']
+            experiments = [experiment for experiment in experiments if experiment['name'] == name]
+        return web.json_response({'experiments': experiments})
+
+    async def get_experiment(self, request):
+        experiment = self.experiments.get(request.match_info['id'])
+        if experiment is None:
+            return web.json_response({'error': 'Not found'}, status=404)
+        return web.json_response(experiment)
+
+    async def create_run(self, request):
+        run = await request.json()
+        parameters = {parameter['name']: parameter['value'] for parameter in run['pipeline_spec'].get('parameters', [])}
+        if parameters.get('text') == 'fail':
+            return web.json_response({'error': 'Bad request'}, status=400)
+        run['id'] = 'run-{}'.format(len(self.runs))
+        self.runs[run['id']] = run
+        self.run_polls[run['id']] = int(parameters.get('polls', 0))
+        return web.json_response({'run': run})
+
+    async def list_runs(self, request):
+        # The backend accepts '', 'field_name', 'field_name asc' or 'field_name desc'.
+        sort_by = request.query.get('sort_by', '').split()
+        if len(sort_by) > 2 or (len(sort_by) == 2 and sort_by[1] not in ('asc', 'desc')):
+            return web.json_response({'error': 'Invalid sorting order'}, status=400)
+        experiment_id = request.query.get('resource_reference_key.id')
+        run_ids = self.runs
+        if 'filter' in request.query:
+            run_ids = json.loads(request.query['filter'])['predicates'][0]['string_values']['values']
+            self.filtered_run_ids.append(run_ids)
+        else:
+            self.polls += 1
+        runs = [
+            dict(run, status=self._run_status(run_id)) for run_id, run in self.runs.items()
+            if run_id in run_ids and (experiment_id is None or any(reference['key']['id'] == experiment_id for reference in run['resource_references']))
+        ]
+        start = int(request.query.get('page_token') or 0)
+        end = start + int(request.query.get('page_size') or 10)
+        response = {'runs': runs[start:end], 'total_size': len(runs)}
+        if end < len(runs):
+            response['next_page_token'] = str(end)
+        return web.json_response(response)
+
+    async def get_run(self, request):
+        run_id = request.match_info['run_id']
+        if run_id not in self.runs:
+            return web.json_response({'error': 'Not found'}, status=404)
+        run = dict(self.runs[run_id], status=self._run_status(run_id))
+        return web.json_response({'run': run, 'pipeline_runtime': {'workflow_manifest': run['pipeline_spec'].get('workflow_manifest')}})
+
+    async def upload_pipeline(self, request):
+        form = await request.post()
+        uploaded_file = form['uploadfile']
+        with uploaded_file.file:
+            self.uploads.append((request.query.get('name'), uploaded_file.filename, uploaded_file.file.read()))
+        return web.json_response({'id': 'pipeline-0', 'name': request.query.get('name')})
+
+
+class AsyncClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.loop = asyncio.new_event_loop()
+        self.server = _StubPipelineServer()
+        self.loop.run_until_complete(self.server.start())
+        self.client = kfp.AsyncClient(host=self.server.host)
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.client.close())
+        self.loop.run_until_complete(self.server.stop())
+        self.loop.close()
+        shutil.rmtree(self.temp_dir)
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_create_run_from_pipeline_func(self):
+        result = self.run_async(self.client.create_run_from_pipeline_func(_echo_pipeline, {'text': 'world'}, run_name='run 1', experiment_name='Experiment'))
+        self.assertEqual(result.run_id, 'run-0')
+        self.assertEqual(self.server.experiments['experiment-0']['name'], 'Experiment')
+        run = self.server.runs['run-0']
+        self.assertEqual(run['name'], 'run 1')
+        self.assertEqual(run['pipeline_spec']['parameters'], [{'name': 'text', 'value': 'world'}])
+        self.assertEqual(json.loads(run['pipeline_spec']['workflow_manifest'])['kind'], 'Workflow')
+
+        run_detail = self.run_async(result.wait_for_run_completion(timeout=10))
+        self.assertIsInstance(run_detail, kfp_server_api.models.ApiRunDetail)
+        self.assertEqual(run_detail.run.status, 'Succeeded')
+
+        # The existing experiment is reused. Its ID is cached, so the experiments are not listed again.
+        self.run_async(self.client.create_run_from_pipeline_func(_echo_pipeline, {}, experiment_name='Experiment'))
+        self.assertEqual(len(self.server.experiments), 1)
+        self.assertEqual(self.server.experiment_list_requests, 1)
+
+    def test_run_pipeline_and_upload_pipeline(self):
+        package_path = os.path.join(self.temp_dir, 'pipeline.yaml')
+        Compiler().compile(_echo_pipeline, package_path)
+        experiment = self.run_async(self.client.create_experiment('Experiment'))
+        run = self.run_async(self.client.run_pipeline(experiment.id, 'run', package_path, params={'text': 'a'}))
+        self.assertIsInstance(run, kfp_server_api.models.ApiRun)
+        self.assertEqual(self.run_async(self.client.get_run(run.id)).run.name, 'run')
+
+        pipeline = self.run_async(self.client.upload_pipeline(package_path, pipeline_name='Echo'))
+        self.assertEqual(pipeline.id, 'pipeline-0')
+        with open(package_path, 'rb') as f:
+            self.assertEqual(self.server.uploads, [('Echo', 'pipeline.yaml', f.read())])
+
+        # The API server does not accept .json files. JSON is valid YAML, so the package is uploaded as a .yaml file.
+        json_package_path = os.path.join(self.temp_dir, 'echo.json')
+        Compiler().compile(_echo_pipeline, json_package_path)
+        self.run_async(self.client.upload_pipeline(json_package_path, pipeline_name='Echo JSON'))
+        with open(json_package_path, 'rb') as f:
+            self.assertEqual(self.server.uploads[1], ('Echo JSON', 'echo.yaml', f.read()))
+
+    def test_errors_and_authorization(self):
+        self.client._api_client.configuration.api_key['authorization'] = 'token'
+        self.client._api_client.configuration.api_key_prefix['authorization'] = 'Bearer'
+        with self.assertRaises(kfp_server_api.rest.ApiException) as context:
+            self.run_async(self.client.get_run('no-such-run'))
+        self.assertEqual(context.exception.status, 404)
+        self.assertEqual(self.server.requests[-1].headers['Authorization'], 'Bearer token')
+
+    def test_create_runs_concurrently(self):
+        self.server.delay = 0.02
+        arguments_list = [{'text': str(i)} for i in range(40)]
+        arguments_list[3] = {'text': 'fail'}
+        results = self.run_async(self.client.create_runs(arguments_list, pipeline_func=_echo_pipeline, max_concurrent_runs=8))
+
+        self.assertEqual([result.arguments for result in results], arguments_list)
+        self.assertFalse(results[3].succeeded)
+        self.assertEqual(results[3].error.status, 400)
+        self.assertEqual(sum(result.succeeded for result in results), 39)
+        self.assertEqual(len(self.server.runs), 39)
+        self.assertGreater(self.server.max_active_requests, 1)
+        self.assertLessEqual(self.server.max_active_requests, 8)
+
+    def test_wait_for_runs(self):
+        results = self.run_async(self.client.create_runs([{'polls': 3}, {'polls': 1}, {'polls': 2}], pipeline_id='pipeline-id'))
+        run_ids = [result.run_id for result in results]
+
+        async def wait_for_runs():
+            run_details = []
+            async for run_detail in self.client.wait_for_runs(run_ids, min_poll_interval=0.01):
+                run_details.append(run_detail)
+            return run_details
+
+        run_details = self.run_async(wait_for_runs())
+        self.assertEqual([run_detail.run.id for run_detail in run_details], ['run-1', 'run-2', 'run-0'])
+        self.assertEqual(self.server.polls, 3)
+        # The experiments are found by listing the runs filtered by ID, not with get_run.
+        self.assertEqual(self.server.filtered_run_ids, [run_ids])
+        self.assertEqual([request.path for request in self.server.requests if request.path.startswith('/apis/v1beta1/runs/')], ['/apis/v1beta1/runs/' + run_id for run_id in ['run-1', 'run-2', 'run-0']])
+
+        self.run_async(self.client.create_runs([{'polls': 100}], pipeline_id='pipeline-id'))
+        with self.assertRaises(TimeoutError):
+            self.run_async(self.client.wait_for_runs(['run-3'], experiment_id='experiment-0', timeout=0.05, min_poll_interval=0.01).__anext__())
+
+    def test_wait_for_unknown_runs(self):
+        self.run_async(self.client.create_runs([{'polls': 0}], pipeline_id='pipeline-id', experiment_name='Experiment'))
+        with self.assertRaisesRegex(ValueError, 'Runs run-9 were not found in experiment experiment-0'):
+            self.run_async(self.client.wait_for_runs(['run-0', 'run-9'], experiment_id='experiment-0', min_poll_interval=0.01).__anext__())
+
+        with self.assertRaises(kfp_server_api.rest.ApiException) as context:
+            self.run_async(self.client.list_runs(sort_by='created_at des'))
+        self.assertEqual(context.exception.status, 400)
+
+    def test_iter_runs_and_experiments(self):
+        self.run_async(self.client.create_runs([{'text': str(i)} for i in range(25)], pipeline_id='pipeline-id', experiment_name='Experiment'))
+
+        async def collect(async_iterator):
+            items = []
+            async for item in async_iterator:
+                items.append(item)
+            return items
+
+        runs = self.run_async(collect(self.client.iter_runs(page_size=10)))
+        self.assertEqual([run.id for run in runs], ['run-{}'.format(i) for i in range(25)])
+        runs = self.run_async(collect(self.client.iter_runs(experiment_id='experiment-0', page_size=10, prefetch=False)))
+        self.assertEqual(len(runs), 25)
+
+        experiments = self.run_async(collect(self.client.iter_experiments(filter={'predicates': [{'key': 'name', 'op': 'EQUALS', 'string_value': 'Experiment'}]})))
+        self.assertEqual([experiment.id for experiment in experiments], ['experiment-0'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,402 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from collections import OrderedDict
+from unittest import mock
+
+import kfp
+import kfp_server_api
+import yaml
+from kfp import dsl
+from kfp._client import _RateLimiter
+from kfp.compiler import Compiler
+from kfp.dsl.types import GCSPath, InconsistentTypeException, Integer
+
+
+def _echo_op(text):
+    return dsl.ContainerOp(
+        name='echo',
+        image='library/bash:4.4.23',
+        command=['sh', '-c'],
+        arguments=['echo "$0" | tee /tmp/out', text],
+        file_outputs={'out': '/tmp/out'},
+    )
+
+
+@dsl.pipeline(name='Echo pipeline')
+def _echo_pipeline(text='hello'):
+    _echo_op(_echo_op(text).output)
+
+
+def _check_sort_by(sort_by):
+    # The backend accepts '', 'field_name', 'field_name asc' or 'field_name desc'.
+    words = sort_by.split()
+    if len(words) > 2 or (len(words) == 2 and words[1] not in ('asc', 'desc')):
+        raise kfp_server_api.rest.ApiException(status=400, reason='Invalid sorting order {!r}'.format(sort_by))
+
+
+@dsl.component
+def _list_op(path: GCSPath()):
+    return dsl.ContainerOp(name='list', image='google/cloud-sdk', command=['gsutil', 'ls', path])
+
+
+@dsl.pipeline(name='Mistyped pipeline')
+def _mistyped_pipeline(count: Integer() = 1):
+    _list_op(count)
+
+
+class _FakeRunServiceApi:
+    def __init__(self, delay=0):
+        self.created_runs = []
+        self.delay = delay
+        self.active_requests = 0
+        self.max_active_requests = 0
+        self._lock = threading.Lock()
+
+    def create_run(self, body):
+        with self._lock:
+            self.active_requests += 1
+            self.max_active_requests = max(self.max_active_requests, self.active_requests)
+        try:
+            time.sleep(self.delay)
+            for parameter in body.pipeline_spec.parameters:
+                if parameter.value == 'fail':
+                    raise kfp_server_api.rest.ApiException(status=400, reason='Bad request')
+            with self._lock:
+                run = kfp_server_api.models.ApiRun(id='run-{}'.format(len(self.created_runs)), name=body.name, pipeline_spec=body.pipeline_spec, resource_references=body.resource_references)
+                self.created_runs.append(run)
+            return kfp_server_api.models.ApiRunDetail(run=run)
+        finally:
+            with self._lock:
+                self.active_requests -= 1
+
+
+class _FakeRunStatusServiceApi:
+    '''Serves runs whose statuses change after the specified numbers of list_runs calls.'''
+    def __init__(self, finish_after_polls, experiment_id='experiment-id', page_size=None):
+        self.finish_after_polls = finish_after_polls
+        self.experiment_id = experiment_id
+        self.page_size = page_size
+        self.polls = 0
+        self.list_runs_calls = 0
+        self.filtered_run_ids = []
+        self.get_run_calls = []
+
+    def _create_run(self, run_id):
+        finish_after_polls = self.finish_after_polls[run_id]
+        status = 'Succeeded' if finish_after_polls is not None and self.polls >= finish_after_polls else 'Running'
+        experiment_reference = kfp_server_api.models.ApiResourceReference(
+            key=kfp_server_api.models.ApiResourceKey(id=self.experiment_id, type=kfp_server_api.models.ApiResourceType.EXPERIMENT),
+        )
+        return kfp_server_api.models.ApiRun(id=run_id, status=status, resource_references=[experiment_reference])
+
+    def list_runs(self, page_token, page_size, sort_by, resource_reference_key_type=None, resource_reference_key_id=None, filter=None):
+        _check_sort_by(sort_by)
+        run_ids = sorted(self.finish_after_polls)
+        if filter is not None:
+            # Lists the runs with the IDs, like the backend does for a {key: id, op: IN} predicate.
+            self.filtered_run_ids.append(json.loads(filter)['predicates'][0]['string_values']['values'])
+            run_ids = [run_id for run_id in run_ids if run_id in self.filtered_run_ids[-1]]
+        else:
+            self.list_runs_calls += 1
+            if not page_token:
+                self.polls += 1
+        start = int(page_token or 0)
+        end = start + (self.page_size or page_size)
+        runs = [self._create_run(run_id) for run_id in run_ids[start:end]]
+        return kfp_server_api.models.ApiListRunsResponse(runs=runs, next_page_token=str(end) if end < len(run_ids) else '')
+
+    def get_run(self, run_id):
+        self.get_run_calls.append(run_id)
+        return kfp_server_api.models.ApiRunDetail(run=self._create_run(run_id))
+
+
+class _FakeExperimentServiceApi:
+    def __init__(self, experiment_names, supports_filter=True):
+        self.experiments = [kfp_server_api.models.ApiExperiment(id='experiment-{}'.format(i), name=name) for i, name in enumerate(experiment_names)]
+        self.supports_filter = supports_filter
+        self.list_calls = []
+        self.get_calls = []
+
+    def list_experiment(self, page_token, page_size, sort_by, filter=None):
+        _check_sort_by(sort_by)
+        self.list_calls.append((page_token, filter))
+        experiments = self.experiments
+        if filter and self.supports_filter:
+            name = json.loads(filter)['predicates'][0]['string_value']
+            experiments = [experiment for experiment in experiments if experiment.name == name]
+        start = int(page_token or 0)
+        end = start + page_size
+        return kfp_server_api.models.ApiListExperimentsResponse(experiments=experiments[start:end], next_page_token=str(end) if end < len(experiments) else None)
+
+    def get_experiment(self, id):
+        self.get_calls.append(id)
+        for experiment in self.experiments:
+            if experiment.id == id:
+                return experiment
+        raise kfp_server_api.rest.ApiException(status=404, reason='Not found')
+
+    def create_experiment(self, body):
+        body.id = 'experiment-{}'.format(len(self.experiments))
+        self.experiments.append(body)
+        return body
+
+
+class _FakePagedRunServiceApi:
+    def __init__(self, run_count):
+        self.run_ids = ['run-{}'.format(i) for i in range(run_count)]
+        self.requested_page_tokens = []
+        self.page_requested = {}
+
+    def list_runs(self, page_token, page_size, sort_by, **kwargs):
+        _check_sort_by(sort_by)
+        self.requested_page_tokens.append(page_token)
+        self.page_requested.setdefault(page_token, threading.Event()).set()
+        start = int(page_token or 0)
+        end = start + page_size
+        runs = [kfp_server_api.models.ApiRun(id=run_id) for run_id in self.run_ids[start:end]]
+        return kfp_server_api.models.ApiListRunsResponse(runs=runs, next_page_token=str(end) if end < len(self.run_ids) else None)
+
+
+def _create_client():
+    client = kfp.Client(host='http://127.0.0.1:1')
+    client._run_api = _FakeRunServiceApi()
+    client.create_experiment = mock.Mock(return_value=kfp_server_api.models.ApiExperiment(id='experiment-id', name='Default'))
+    return client
+
+
+class ClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_create_run_from_pipeline_func_without_package_file(self):
+        client = _create_client()
+        with mock.patch.object(Compiler, 'compile', side_effect=AssertionError('No package should be written')), \
+                mock.patch.object(client, '_extract_pipeline_yaml', side_effect=AssertionError('No package should be read')):
+            result = client.create_run_from_pipeline_func(_echo_pipeline, {'text': 'world'}, run_name='run 1')
+        self.assertEqual(result.run_id, 'run-0')
+
+        package_path = os.path.join(self.temp_dir, 'pipeline.zip')
+        Compiler().compile(_echo_pipeline, package_path)
+        client.create_run_from_pipeline_package(package_path, {'text': 'world'}, run_name='run 2')
+
+        run1, run2 = client._run_api.created_runs
+        self.assertEqual(run1.name, 'run 1')
+        self.assertEqual(json.loads(run1.pipeline_spec.workflow_manifest), json.loads(run2.pipeline_spec.workflow_manifest))
+        self.assertEqual([(parameter.name, parameter.value) for parameter in run1.pipeline_spec.parameters], [('text', 'world')])
+        self.assertEqual(run1.resource_references[0].key.id, 'experiment-id')
+
+    def test_create_run_from_pipeline_func_checks_types(self):
+        client = _create_client()
+        type_check_old_value = kfp.TYPE_CHECK
+        kfp.TYPE_CHECK = False
+        try:
+            # The types are checked like in Compiler.compile(type_check=True), whatever the global setting is.
+            with self.assertRaises(InconsistentTypeException):
+                client.create_run_from_pipeline_func(_mistyped_pipeline, {})
+            with self.assertRaises(InconsistentTypeException):
+                client.create_runs([{}], pipeline_func=_mistyped_pipeline)
+            self.assertFalse(kfp.TYPE_CHECK)
+        finally:
+            kfp.TYPE_CHECK = type_check_old_value
+        self.assertEqual(client._run_api.created_runs, [])
+
+    def test_upload_json_pipeline_package(self):
+        client = _create_client()
+        uploads = []
+        def upload_pipeline(uploadfile, name=None):
+            with open(uploadfile, 'rb') as f:
+                uploads.append((os.path.basename(uploadfile), name, f.read()))
+            return kfp_server_api.models.ApiPipeline(id='pipeline-0', name=name)
+        client._upload_api = mock.Mock(upload_pipeline=upload_pipeline)
+
+        package_path = os.path.join(self.temp_dir, 'echo.json')
+        Compiler().compile(_echo_pipeline, package_path)
+        client.upload_pipeline(package_path, 'Echo')
+        yaml_package_path = os.path.join(self.temp_dir, 'echo.yaml')
+        Compiler().compile(_echo_pipeline, yaml_package_path)
+        client.upload_pipeline(yaml_package_path, 'Echo')
+
+        # The API server only accepts YAML, zip and tar.gz packages, so the JSON package is uploaded as a .yaml file.
+        with open(package_path, 'rb') as f:
+            self.assertEqual(uploads[0], ('echo.yaml', 'Echo', f.read()))
+        self.assertEqual(uploads[1][0], 'echo.yaml')
+        self.assertEqual(yaml.safe_load(uploads[0][2]), yaml.safe_load(uploads[1][2]))
+
+    def test_create_runs(self):
+        client = _create_client()
+        client._run_api.delay = 0.05
+        arguments_list = [{'text': str(i)} for i in range(8)]
+        arguments_list[3] = {'text': 'fail'}
+        with mock.patch.object(Compiler, '_create_workflow', autospec=True, side_effect=Compiler._create_workflow) as create_workflow_mock:
+            results = client.create_runs(arguments_list, pipeline_func=_echo_pipeline, max_concurrent_runs=4)
+
+        create_workflow_mock.assert_called_once()
+        client.create_experiment.assert_called_once_with(name='Default')
+        self.assertEqual([result.arguments for result in results], arguments_list)
+        self.assertEqual([result.succeeded for result in results], [True, True, True, False, True, True, True, True])
+        self.assertIsInstance(results[3].error, kfp_server_api.rest.ApiException)
+        self.assertIsNone(results[3].run_id)
+        self.assertEqual(len(client._run_api.created_runs), 7)
+        self.assertEqual(len(set(result.run_name for result in results)), 8)
+        self.assertGreater(client._run_api.max_active_requests, 1)
+        self.assertLessEqual(client._run_api.max_active_requests, 4)
+        for result in results:
+            if result.succeeded:
+                run = next(run for run in client._run_api.created_runs if run.id == result.run_id)
+                self.assertEqual(run.pipeline_spec.parameters[0].value, result.arguments['text'])
+
+    def test_create_runs_from_pipeline_id(self):
+        client = _create_client()
+        results = client.create_runs([{'text': 'a'}, {'text': 'b'}], pipeline_id='pipeline-id', run_names=['a', 'b'])
+        self.assertEqual([result.run_name for result in results], ['a', 'b'])
+        for run in client._run_api.created_runs:
+            self.assertEqual(run.pipeline_spec.pipeline_id, 'pipeline-id')
+            self.assertIsNone(run.pipeline_spec.workflow_manifest)
+
+        with self.assertRaises(ValueError):
+            client.create_runs([{}], pipeline_id='pipeline-id', pipeline_func=_echo_pipeline)
+        with self.assertRaises(ValueError):
+            client.create_runs([{}])
+
+    def test_rate_limiter(self):
+        rate_limiter = _RateLimiter(50)
+        start_time = time.monotonic()
+        for _ in range(6):
+            rate_limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.09)
+
+    def test_wait_for_runs(self):
+        client = _create_client()
+        client._run_api = _FakeRunStatusServiceApi({'run-a': 4, 'run-b': 1, 'run-c': 4, 'run-d': 6}, page_size=3)
+        with mock.patch('kfp._client.time.sleep') as sleep_mock:
+            run_details = list(client.wait_for_runs(['run-a', 'run-b', 'run-c', 'run-d'], experiment_id='experiment-id', min_poll_interval=1, max_poll_interval=3))
+
+        self.assertEqual([run_detail.run.id for run_detail in run_details], ['run-b', 'run-a', 'run-c', 'run-d'])
+        self.assertTrue(all(run_detail.run.status == 'Succeeded' for run_detail in run_details))
+        # Only the finished runs are fetched.
+        self.assertEqual(sorted(client._run_api.get_run_calls), ['run-a', 'run-b', 'run-c', 'run-d'])
+        self.assertEqual(client._run_api.polls, 6)
+        # The interval backs off while no run finishes and is reset when one does.
+        self.assertEqual([call[0][0] for call in sleep_mock.call_args_list], [1, 2, 3, 1, 2])
+
+    def test_wait_for_runs_finds_the_experiments(self):
+        client = _create_client()
+        client._run_api = _FakeRunStatusServiceApi({'run-a': 1, 'run-b': 2})
+        with mock.patch('kfp._client.time.sleep'):
+            runs = list(client.wait_for_runs(['run-a', 'run-b'], fetch_run_details=False))
+        self.assertEqual([run.id for run in runs], ['run-a', 'run-b'])
+        # The experiments are found by listing the runs filtered by ID. No workflow is fetched with get_run.
+        self.assertEqual(client._run_api.filtered_run_ids, [['run-a', 'run-b']])
+        self.assertEqual(client._run_api.get_run_calls, [])
+
+        run_ids = ['run-{:03}'.format(i) for i in range(250)]
+        client._run_api = _FakeRunStatusServiceApi({run_id: 0 for run_id in run_ids})
+        self.assertEqual(len(list(client.wait_for_runs(run_ids, fetch_run_details=False))), 250)
+        self.assertEqual([len(filtered_run_ids) for filtered_run_ids in client._run_api.filtered_run_ids], [100, 100, 50])
+
+        client._run_api = _FakeRunStatusServiceApi({'run-a': 1})
+        with self.assertRaisesRegex(ValueError, 'Run run-c was not found'):
+            next(client.wait_for_runs(['run-a', 'run-c']))
+
+    def test_wait_for_runs_timeout(self):
+        client = _create_client()
+        client._run_api = _FakeRunStatusServiceApi({'run-a': 1, 'run-b': None})
+        runs = client.wait_for_runs(['run-a', 'run-b'], experiment_id='experiment-id', timeout=0)
+        self.assertEqual(next(runs).run.id, 'run-a')
+        with self.assertRaises(TimeoutError):
+            next(runs)
+
+    def test_wait_for_runs_with_unknown_run(self):
+        client = _create_client()
+        client._run_api = _FakeRunStatusServiceApi({'run-a': 1, 'run-b': None}, page_size=1)
+        runs = client.wait_for_runs(['run-a', 'run-c', 'run-b', 'run-d'], experiment_id='experiment-id')
+        with self.assertRaisesRegex(ValueError, 'Runs run-c, run-d were not found in experiment experiment-id'):
+            next(runs)
+        # All the pages were read before giving up.
+        self.assertEqual(client._run_api.list_runs_calls, 2)
+
+    def test_wait_for_runs_in_background(self):
+        client = _create_client()
+        client._run_api = _FakeRunStatusServiceApi({'run-a': 3, 'run-b': 2})
+        future = client.wait_for_runs_in_background(['run-a', 'run-b'], experiment_id='experiment-id', min_poll_interval=0.01)
+        finished_runs = future.result(timeout=10)
+        self.assertIsInstance(finished_runs, OrderedDict)
+        self.assertEqual(list(finished_runs), ['run-b', 'run-a'])
+        self.assertEqual(finished_runs['run-a'].run.id, 'run-a')
+
+        client._run_api = _FakeRunStatusServiceApi({'run-a': None})
+        future = client.wait_for_runs_in_background(['run-a'], experiment_id='experiment-id', timeout=0.05, min_poll_interval=0.01)
+        with self.assertRaises(TimeoutError):
+            future.result(timeout=10)
+
+    def test_get_experiment_by_name_is_cached(self):
+        client = kfp.Client(host='http://127.0.0.1:1')
+        client._experiment_api = _FakeExperimentServiceApi(['experiment {}'.format(i) for i in range(250)])
+        experiment = client.get_experiment(experiment_name='experiment 200')
+        self.assertEqual(experiment.id, 'experiment-200')
+        # The server-side filter returns the experiment in the first page.
+        self.assertEqual(len(client._experiment_api.list_calls), 1)
+        self.assertEqual(json.loads(client._experiment_api.list_calls[0][1])['predicates'][0]['string_value'], 'experiment 200')
+
+        self.assertEqual(client.get_experiment(experiment_name='experiment 200').id, 'experiment-200')
+        self.assertEqual(client.create_experiment('experiment 200').id, 'experiment-200')
+        self.assertEqual(len(client._experiment_api.list_calls), 1)
+        self.assertEqual(client._experiment_api.get_calls, ['experiment-200', 'experiment-200'])
+
+        # The created experiments are cached as well.
+        new_experiment = client.create_experiment('new experiment')
+        self.assertEqual(client.get_experiment(experiment_name='new experiment').id, new_experiment.id)
+        self.assertEqual(len(client._experiment_api.list_calls), 2)
+
+        # Deleted experiments are looked up again.
+        del client._experiment_api.experiments[200]
+        with self.assertRaises(ValueError):
+            client.get_experiment(experiment_name='experiment 200')
+
+    def test_get_experiment_by_name_without_server_side_filter(self):
+        client = kfp.Client(host='http://127.0.0.1:1')
+        client._experiment_api = _FakeExperimentServiceApi(['experiment {}'.format(i) for i in range(250)], supports_filter=False)
+        self.assertEqual(client.get_experiment(experiment_name='experiment 249').id, 'experiment-249')
+        self.assertEqual([page_token for page_token, _ in client._experiment_api.list_calls], ['', '100', '200'])
+
+    def test_iter_runs_prefetches_the_next_page(self):
+        client = _create_client()
+        client._run_api = _FakePagedRunServiceApi(25)
+        runs = client.iter_runs(page_size=10)
+        self.assertEqual(next(runs).id, 'run-0')
+        # The second page is requested while the first one is consumed.
+        self.assertTrue(client._run_api.page_requested.setdefault('10', threading.Event()).wait(10))
+        self.assertEqual(['run-0'] + [run.id for run in runs], client._run_api.run_ids)
+        self.assertEqual(client._run_api.requested_page_tokens, ['', '10', '20'])
+
+        client._run_api = _FakePagedRunServiceApi(25)
+        runs = client.iter_runs(page_size=10, prefetch=False)
+        next(runs)
+        self.assertEqual(client._run_api.requested_page_tokens, [''])
+        self.assertEqual(len(list(runs)), 24)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import importlib
+import os
+import subprocess
+import sys
+import unittest
+
+_SDK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The budgets are generous so that the test does not fail on slow machines.
+# They are meant to catch the heavy modules being imported eagerly again.
+_KFP_IMPORT_BUDGET_SECONDS = 0.2
+_KFP_COMPONENTS_IMPORT_BUDGET_SECONDS = 0.2
+# kfp.dsl needs the kubernetes models. Only the time spent in the kfp modules themselves is counted.
+_KFP_DSL_SELF_IMPORT_BUDGET_SECONDS = 0.3
+
+_HEAVY_MODULES = ['kubernetes', 'kfp_server_api', 'argo', 'yaml', 'requests', 'kfp.compiler', 'kfp._client']
+
+
+def _get_import_times(statement):
+    '''Runs the statement in a new interpreter with -X importtime and returns the (self time, cumulative time) in seconds of every imported module.'''
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([_SDK_DIR] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    ).stderr.decode('utf-8')
+    import_times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, cumulative_time, module_name = line[len('import time:'):].split('|')
+        if not self_time.strip().isdigit():
+            # Header line
+            continue
+        import_times[module_name.strip()] = (int(self_time) / 1e6, int(cumulative_time) / 1e6)
+    return import_times
+
+
+def _is_module_or_submodule(module_name, parent_name):
+    return module_name == parent_name or module_name.startswith(parent_name + '.')
+
+
+@unittest.skipIf(sys.version_info < (3, 7), 'The lazy imports and -X importtime require Python 3.7+')
+class ImportTimeTestCase(unittest.TestCase):
+    def assertNotImported(self, import_times, module_names):
+        imported_modules = sorted(
+            name for name in import_times
+            if any(_is_module_or_submodule(name, module_name) for module_name in module_names)
+        )
+        self.assertEqual(imported_modules, [])
+
+    def test_import_kfp(self):
+        import_times = _get_import_times('import kfp')
+        self.assertNotImported(import_times, _HEAVY_MODULES + ['kfp.dsl', 'kfp.components'])
+        self.assertLess(import_times['kfp'][1], _KFP_IMPORT_BUDGET_SECONDS)
+
+    def test_import_kfp_components(self):
+        import_times = _get_import_times('import kfp.components')
+        self.assertNotImported(import_times, _HEAVY_MODULES)
+        self.assertLess(import_times['kfp'][1], _KFP_COMPONENTS_IMPORT_BUDGET_SECONDS)
+
+    def test_import_kfp_dsl(self):
+        import_times = _get_import_times('import kfp.dsl')
+        self.assertNotImported(import_times, ['kfp_server_api', 'argo', 'kfp.compiler', 'kfp._client', 'kfp.components._python_op'])
+        kfp_self_time = sum(self_time for name, (self_time, _) in import_times.items() if _is_module_or_submodule(name, 'kfp'))
+        self.assertLess(kfp_self_time, _KFP_DSL_SELF_IMPORT_BUDGET_SECONDS)
+
+    def test_lazy_attributes(self):
+        import kfp
+        import kfp.components
+        self.assertIs(kfp.components.load_component_from_text, kfp.components._components.load_component_from_text)
+        self.assertEqual(kfp.Client.__name__, 'Client')
+        self.assertTrue(callable(kfp.run_pipeline_func_on_cluster))
+        self.assertIn('Client', dir(kfp))
+        with self.assertRaises(AttributeError):
+            kfp.components.no_such_attribute
+
+        # The lazy names must match the __all__ lists of the modules.
+        for module_name in set(kfp.components._lazy_attributes.values()):
+            module = importlib.import_module(module_name, 'kfp.components')
+            lazy_names = [name for name, lazy_module_name in kfp.components._lazy_attributes.items() if lazy_module_name == module_name]
+            self.assertEqual(sorted(lazy_names), sorted(module.__all__))
+
+    def test_submodule_attributes(self):
+        # The submodules stay accessible as attributes like they were when the packages imported them eagerly.
+        statement = '; '.join([
+            'import kfp.components',
+            'assert kfp.components.structures.ComponentSpec',
+            'assert kfp.components._components._outputs_dir',
+            'assert kfp.components._python_op and kfp.components.modelbase and kfp.components._yaml_utils',
+            'assert kfp._client.Client is kfp.Client',
+            'assert not hasattr(kfp.components, "_module_name")',
+            'assert not hasattr(kfp, "no_such_module")',
+        ])
+        _get_import_times(statement)